@@ -26,53 +26,121 @@ Setup:
 3. chmod +x /root/Auto-Edu/auto_edu.py
 4. Test manual: python3 /root/Auto-Edu/auto_edu.py
 5. Setup crontab berdasarkan mode pilihan
+   ATAU jalankan sebagai daemon: python3 /root/Auto-Edu/auto_edu.py --daemon
 """
 
+import os
 import re
+import sys
+import json
 import time
+import signal
+import select
+import struct
+import marshal
+import threading
+import functools
 import subprocess
-import urllib.parse
-import sys
-from datetime import datetime
+from collections import OrderedDict, deque
 from pathlib import Path
 
+# Modul yang hanya dipakai sebagian jalur (ssl/http.client/urllib.parse untuk
+# Telegram, socket untuk ADB_BACKEND=socket, gzip untuk rotasi log, html
+# untuk respon USSD, sqlite3 untuk riwayat) diimpor saat pertama dibutuhkan:
+# cron membayar waktu import setiap menit, padahal kebanyakan tick tidak
+# mengirim notifikasi sama sekali.
+#
+# argparse (~3 ms) hanya dimuat jika ada argumen command line, datetime
+# (~2 ms) hanya untuk `logs --since <tanggal>`, dan regex dikompilasi saat
+# pertama dipakai (lihat fungsi _re_*()).
+#
+# Yang di atas sengaja tetap di-import di awal (-X importtime, OpenWrt):
+# - json, re: state.json dibaca/ditulis setiap tick, dan json sendiri
+#   meng-import re, jadi re tidak menambah waktu
+# - threading: lock/threading.local() dibuat saat modul dimuat
+# - struct (~0.3 ms): setiap flush log menulis record index (Logger._flush)
+# - subprocess: dipakai setiap tick oleh backend exec/session (default), dan
+#   subprocess.TimeoutExpired ada di banyak klausa except yang harus bisa
+#   dievaluasi walau backend socket belum pernah menjalankan proses
+# - select, signal: subprocess sendiri meng-import keduanya (juga threading),
+#   jadi menundanya tidak menghemat apa pun
+# - marshal, functools: marshal builtin, functools sudah dimuat oleh re
+sqlite3 = None
+
+
+def format_waktu(fmt, waktu=None):
+    """strftime untuk epoch detik (default: sekarang) tanpa modul datetime"""
+    return time.strftime(fmt, time.localtime(waktu))
+
 # ============================================================================
 # KONFIGURASI - JANGAN EDIT LANGSUNG DI SINI!
 # Edit file .env atau jalankan setup.sh untuk konfigurasi
 # ============================================================================
 
-import os
-from pathlib import Path
-
 # Path untuk .env file
 ENV_FILE = os.getenv('AUTO_EDU_ENV')
-if not ENV_FILE or not Path(ENV_FILE).exists():
+if not ENV_FILE or not os.path.exists(ENV_FILE):
+    # Dari bundle .pyz, __file__ ada di dalam arsip: pakai folder arsipnya
+    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+    if os.path.isfile(SCRIPT_DIR):
+        SCRIPT_DIR = os.path.dirname(SCRIPT_DIR)
     possible_paths = [
         '/root/Auto-Edu/auto_edu.env',
         '/root/.auto_edu.env',
-        str(Path(__file__).parent / 'auto_edu.env'),
+        os.path.join(SCRIPT_DIR, 'auto_edu.env'),
     ]
     for path in possible_paths:
-        if Path(path).exists():
+        if os.path.exists(path):
             ENV_FILE = path
             break
     else:
         ENV_FILE = '/root/Auto-Edu/auto_edu.env'
 
-def load_env():
-    """Load configuration from .env file"""
+# Cache hasil parse .env (marshal, di tmpfs), valid selama mtime/ukuran
+# .env tidak berubah
+ENV_CACHE_FILE = os.getenv('AUTO_EDU_ENV_CACHE', '/tmp/auto_edu_env.cache')
+
+
+def parse_env(path):
+    """Parse file .env menjadi dict"""
     config = {}
-    env_path = Path(ENV_FILE)
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                value = value.strip().strip('"').strip("'")
+                config[key.strip()] = value
+    return config
+
+
+def load_env():
+    """Load configuration from .env file (lewat cache jika .env tidak berubah)"""
+    try:
+        st = os.stat(ENV_FILE)
+    except OSError:
+        return {}
+    kunci = (ENV_FILE, st.st_mtime_ns, st.st_size)
     
-    if env_path.exists():
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    value = value.strip().strip('"').strip("'")
-                    config[key.strip()] = value
+    if ENV_CACHE_FILE and ENV_CACHE_FILE.lower() != 'none':
+        try:
+            with open(ENV_CACHE_FILE, 'rb') as f:
+                cache_kunci, config = marshal.loads(f.read())
+            if cache_kunci == kunci:
+                return config
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
     
+    config = parse_env(ENV_FILE)
+    if ENV_CACHE_FILE and ENV_CACHE_FILE.lower() != 'none':
+        try:
+            tmp = f"{ENV_CACHE_FILE}.{os.getpid()}.tmp"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(marshal.dumps((kunci, config)))
+            os.replace(tmp, ENV_CACHE_FILE)
+        except OSError:
+            pass
     return config
 
 # Load dari .env
@@ -82,17 +150,94 @@ env_config = load_env()
 BOT_TOKEN = env_config.get('BOT_TOKEN', 'BOT_TOKEN')
 CHAT_ID = env_config.get('CHAT_ID', 'CHAT_ID')
 
+# Base URL Bot API (bisa diarahkan ke server lokal untuk testing)
+TELEGRAM_API_URL = env_config.get('TELEGRAM_API_URL', 'https://api.telegram.org').rstrip('/')
+
+# Notifikasi lewat outbox persisten + thread pengirim (tidak memblokir renewal)
+TELEGRAM_ASYNC = env_config.get('TELEGRAM_ASYNC', 'true').lower() == 'true'
+TELEGRAM_OUTBOX_FILE = env_config.get('TELEGRAM_OUTBOX_FILE', '/tmp/auto_edu_outbox.jsonl')
+# Batas tunggu pengiriman outbox saat proses selesai (sisanya dikirim run berikutnya)
+TELEGRAM_FLUSH_TIMEOUT = int(env_config.get('TELEGRAM_FLUSH_TIMEOUT', '20'))
+# Batas yang sama saat daemon dihentikan (SIGTERM): procd/restart tidak menunggu lama
+TELEGRAM_FLUSH_TIMEOUT_STOP = int(env_config.get('TELEGRAM_FLUSH_TIMEOUT_STOP', '5'))
+
+# Satu pesan status (di-pin) yang di-edit, bukan pesan baru per event
+TELEGRAM_LIVE_STATUS = env_config.get('TELEGRAM_LIVE_STATUS', 'false').lower() == 'true'
+# message_id pesan status per chat (disimpan antar run, satu file per device).
+# Di /tmp supaya tidak menulis flash; setelah reboot pesan status baru di-pin
+TELEGRAM_LIVE_FILE = env_config.get('TELEGRAM_LIVE_FILE', '/tmp/auto_edu_live_msg.json')
+
 # Kode USSD
 KODE_UNREG = env_config.get('KODE_UNREG', '*808*5*2*1*1#')
 KODE_BELI = env_config.get('KODE_BELI', '*808*4*1*1*1*1#')
 
 # Pengaturan timing (dalam detik)
+# JEDA_USSD: batas tunggu respon USSD (tanpa deteksi dialog: jeda tetap)
 JEDA_USSD = int(env_config.get('JEDA_USSD', '10'))
+# Deteksi dialog respon USSD di device (dumpsys window + uiautomator dump),
+# lanjut begitu respon muncul alih-alih selalu menunggu JEDA_USSD
+USSD_DETEKSI = env_config.get('USSD_DETEKSI', 'true').lower() == 'true'
+USSD_POLL_INTERVAL = float(env_config.get('USSD_POLL_INTERVAL', '0.5'))
+# Batas tunggu SMS konfirmasi aktivasi setelah beli paket
+KONFIRMASI_TIMEOUT = int(env_config.get('KONFIRMASI_TIMEOUT', '90'))
+# Window fokus yang dianggap dialog USSD (regex)
+USSD_DIALOG_PATTERN = env_config.get(
+    'USSD_DIALOG_PATTERN', r'com\.android\.phone|telephonyui|[Uu]ssd|MMI'
+)
 TIMEOUT_ADB = int(env_config.get('TIMEOUT_ADB', '15'))
 
+# Binary ADB (bisa diarahkan ke fake adb untuk testing/benchmark)
+ADB_BIN = env_config.get('ADB_BIN', 'adb')
+
+# Satu sesi `adb shell` dipakai bersama semua perintah (hemat fork/exec)
+ADB_PERSISTENT_SHELL = env_config.get('ADB_PERSISTENT_SHELL', 'true').lower() == 'true'
+
+# Backend ADB:
+# - session : satu sesi `adb shell` persisten (default)
+# - exec    : satu proses adb per perintah (perilaku lama)
+# - socket  : protokol adb server langsung lewat TCP, tanpa exec binary adb
+ADB_BACKEND = env_config.get('ADB_BACKEND', 'session' if ADB_PERSISTENT_SHELL else 'exec').lower()
+ADB_SERVER_HOST = env_config.get('ADB_SERVER_HOST', '127.0.0.1')
+ADB_SERVER_PORT = int(env_config.get('ADB_SERVER_PORT', '5037'))
+ADB_SERIAL = env_config.get('ADB_SERIAL', '')
+
+# Beberapa HP/SIM dalam satu router: DEVICES=hp1,hp2 lalu config per device
+# dengan prefix nama, mis. hp1.ADB_SERIAL=R58M12345, hp1.CHAT_ID=...,
+# hp2.KODE_BELI=... (lihat Perangkat.KUNCI). Tanpa <nama>.ADB_SERIAL, nama
+# dipakai sebagai serial. Kosong = satu device (ADB_SERIAL, perilaku lama).
+DEVICES = [nama.strip() for nama in env_config.get('DEVICES', '').split(',') if nama.strip()]
+
+# Kesehatan ADB: hasil cek "terhubung" dipakai ulang selama ADB_HEALTH_TTL
+# detik (tanpa spawn `adb devices`). Jika putus: coba `adb connect` (serial
+# host:port) / `adb reconnect` + `wait-for-device` maks ADB_RECONNECT_TIMEOUT,
+# lalu circuit breaker terbuka: tick dilewati tanpa spawn & tanpa notifikasi
+# sampai backoff ADB_BACKOFF_MIN..ADB_BACKOFF_MAX (naik 2x setiap gagal).
+ADB_HEALTH_TTL = int(env_config.get('ADB_HEALTH_TTL', '120'))
+ADB_RECONNECT_TIMEOUT = int(env_config.get('ADB_RECONNECT_TIMEOUT', '10'))
+ADB_BACKOFF_MIN = int(env_config.get('ADB_BACKOFF_MIN', '60'))
+ADB_BACKOFF_MAX = int(env_config.get('ADB_BACKOFF_MAX', '1800'))
+
+# Deteksi SMS masuk berbasis event (mode daemon): stream logcat dari device,
+# setiap baris yang cocok SMS_EVENT_PATTERN memicu pengecekan segera.
+# Polling CHECK_INTERVAL tetap jalan sebagai fallback.
+SMS_EVENT_WATCH = env_config.get('SMS_EVENT_WATCH', 'true').lower() == 'true'
+SMS_EVENT_CMD = env_config.get(
+    'SMS_EVENT_CMD',
+    "logcat -v brief -T 1 -b radio -b main InboundSmsHandler:V GsmInboundSmsHandler:V '*:S'"
+)
+SMS_EVENT_PATTERN = env_config.get('SMS_EVENT_PATTERN', 'InboundSmsHandler')
+SMS_EVENT_DEBOUNCE = float(env_config.get('SMS_EVENT_DEBOUNCE', '1'))
+
 # Pengaturan threshold kuota
 THRESHOLD_KUOTA_GB = int(env_config.get('THRESHOLD_KUOTA_GB', '3'))
 
+# Prediksi habis kuota: laju pemakaian (EWMA) dari renewal + SMS sisa kuota
+KUOTA_PAKET_GB = float(env_config.get('KUOTA_PAKET_GB', '30'))
+PREDIKSI_ALPHA = float(env_config.get('PREDIKSI_ALPHA', '0.5'))
+# Renewal dijalankan PREDIKSI_MARGIN detik sebelum perkiraan habis
+PREDIKSI_RENEWAL = env_config.get('PREDIKSI_RENEWAL', 'false').lower() == 'true'
+PREDIKSI_MARGIN = int(env_config.get('PREDIKSI_MARGIN', '120'))
+
 # NEW: Monitoring Mode Configuration
 MONITORING_MODE = env_config.get('MONITORING_MODE', 'EFFICIENT').upper()
 
@@ -102,11 +247,30 @@ if MONITORING_MODE == 'AGGRESSIVE':
     JUMLAH_SMS_CEK = int(env_config.get('JUMLAH_SMS_CEK_AGGRESSIVE', '5'))
     SMS_MAX_AGE_MINUTES = int(env_config.get('SMS_MAX_AGE_AGGRESSIVE', '5'))
     USE_IMPROVED_LOGIC = True  # Priority kuota check
+    DEFAULT_CHECK_INTERVAL = 60
+elif MONITORING_MODE == 'AUTO':
+    # AUTO Mode: interval, jumlah SMS & max age menyesuaikan tiap tick
+    # (lihat profil_auto); nilai di bawah hanya titik awal
+    JUMLAH_SMS_CEK = int(env_config.get('JUMLAH_SMS_CEK', '3'))
+    SMS_MAX_AGE_MINUTES = int(env_config.get('SMS_MAX_AGE_MINUTES', '15'))
+    USE_IMPROVED_LOGIC = True  # Priority kuota check
+    DEFAULT_CHECK_INTERVAL = 60
 else:
     # EFFICIENT Mode: Normal to heavy usage (default)
     JUMLAH_SMS_CEK = int(env_config.get('JUMLAH_SMS_CEK', '3'))
     SMS_MAX_AGE_MINUTES = int(env_config.get('SMS_MAX_AGE_MINUTES', '15'))
     USE_IMPROVED_LOGIC = False  # Standard logic
+    DEFAULT_CHECK_INTERVAL = 180
+
+# Interval pengecekan untuk mode daemon (detik), bisa < 60 detik
+# Kosong = ikut mode (AGGRESSIVE: 60, EFFICIENT: 180)
+CHECK_INTERVAL = max(5, int(env_config.get('CHECK_INTERVAL') or DEFAULT_CHECK_INTERVAL))
+
+# Batas interval mode AUTO (detik): cepat setelah renewal / pemakaian berat,
+# melambat sampai AUTO_INTERVAL_MAX saat idle. Cron mode AUTO jalan tiap
+# menit dan tick yang belum jatuh tempo langsung keluar.
+AUTO_INTERVAL_MIN = max(5, int(env_config.get('AUTO_INTERVAL_MIN', '30')))
+AUTO_INTERVAL_MAX = max(AUTO_INTERVAL_MIN, int(env_config.get('AUTO_INTERVAL_MAX', '300')))
 
 # Pengaturan notifikasi
 NOTIF_KUOTA_AMAN = env_config.get('NOTIF_KUOTA_AMAN', 'false').lower() == 'true'
@@ -118,350 +282,2970 @@ LOG_FILE = env_config.get('LOG_FILE', '/tmp/auto_edu.log')
 if LOG_FILE and LOG_FILE.lower() == 'none':
     LOG_FILE = None
 MAX_LOG_SIZE = int(env_config.get('MAX_LOG_SIZE', '102400'))
+# Jumlah generasi log lama yang disimpan (auto_edu.log.1.gz ... .N.gz)
+LOG_GENERASI = int(env_config.get('LOG_GENERASI', '3'))
+# Buffer tulis log (byte); WARN/ERROR dan akhir tick selalu flush
+LOG_BUFFER = int(env_config.get('LOG_BUFFER', '16384'))
+# Format baris file log: text ([waktu] [LEVEL] pesan) atau json (JSON-lines)
+LOG_FORMAT = env_config.get('LOG_FORMAT', 'text').lower()
+# Cetak log ke stdout: auto = hanya jika tanpa file log atau stdout terminal
+# (cron mengalihkan stdout ke file log yang sama -> baris dobel)
+LOG_STDOUT = env_config.get('LOG_STDOUT', 'auto').lower()
+
+# File state (high-water mark SMS yang sudah diproses, dll)
+STATE_FILE = env_config.get('STATE_FILE', '/tmp/auto_edu_state.json')
+# Lock anti double-run (per device, device berikutnya pakai akhiran nama)
+LOCK_FILE = '/tmp/auto_edu_python.lock'
+# Cache klasifikasi per SMS (LRU, persisten) supaya SMS tidak dievaluasi ulang
+SMS_CACHE_FILE = env_config.get('SMS_CACHE_FILE', '/tmp/auto_edu_sms_cache.json')
+SMS_CACHE_SIZE = int(env_config.get('SMS_CACHE_SIZE', '200'))
+
+# Allowlist pengirim SMS operator, dipisah koma (huruf besar/kecil sama).
+# Diterapkan di --where query content provider di device, jadi SMS bank,
+# teman atau spam tidak ikut makan jendela JUMLAH_SMS_CEK. Kosong = semua
+# pengirim, auto = pengirim hasil belajar (semua sampai ada yang dikenal)
+SMS_PENGIRIM = env_config.get('SMS_PENGIRIM', '').strip()
+# Catat pengirim yang benar-benar mengirim SMS kuota/aktivasi di state
+# device (selalu aktif untuk SMS_PENGIRIM=auto)
+SMS_PENGIRIM_BELAJAR = env_config.get('SMS_PENGIRIM_BELAJAR', 'false').lower() == 'true'
+# Batas jumlah pengirim dikenal (yang paling lama tidak terlihat dibuang)
+PENGIRIM_DIKENAL_MAKS = 20
+
+# Snapshot status untuk LuCI (ditulis atomik tiap akhir fase, dibaca controller)
+STATUS_FILE = env_config.get('STATUS_FILE', '/tmp/auto_edu_status.json')
+
+# Metrik OpenMetrics: textfile (ditulis atomik tiap akhir tick, untuk
+# collector textfile ala node-exporter) dan/atau endpoint HTTP /metrics di
+# mode daemon (METRIK_PORT, 0 = mati). Total counter dibawa antar run cron
+# lewat <METRIK_FILE>.json. METRIK_FILE=none untuk mematikan textfile.
+METRIK_FILE = env_config.get('METRIK_FILE', '/tmp/auto_edu.prom')
+if METRIK_FILE and METRIK_FILE.lower() == 'none':
+    METRIK_FILE = None
+METRIK_PORT = int(env_config.get('METRIK_PORT', '0'))
+METRIK_ALAMAT = env_config.get('METRIK_ALAMAT', '127.0.0.1')
+
+# Riwayat run / renewal / SMS / timing (SQLite WAL, butuh python3-sqlite3).
+# DB kerja ada di tmpfs (DB_KERJA); DB_FILE di flash hanya ditimpa salinannya
+# jika ada renewal / SMS baru / retensi, paling sering per DB_COMMIT_INTERVAL
+# detik (renewal langsung). Tick tanpa SMS baru tidak menulis flash sama
+# sekali. DB_FILE=none untuk mematikan.
+DB_FILE = env_config.get('DB_FILE', '/root/Auto-Edu/auto_edu.db')
+if DB_FILE and DB_FILE.lower() == 'none':
+    DB_FILE = None
+DB_KERJA = env_config.get('DB_KERJA') or (
+    DB_FILE and os.path.join('/tmp', os.path.basename(DB_FILE))
+)
+DB_COMMIT_INTERVAL = int(env_config.get('DB_COMMIT_INTERVAL', '300'))
+DB_RETENSI_HARI = int(env_config.get('DB_RETENSI_HARI', '30'))
+# Retensi (DELETE baris lama) dijalankan terjadwal, bukan tiap buka DB
+DB_RETENSI_INTERVAL = int(env_config.get('DB_RETENSI_INTERVAL', '86400'))
 
 # ============================================================================
 # KELAS HELPER
 # ============================================================================
 
+# Kode event log yang stabil (dipakai index & `auto_edu.py logs --event`).
+# Urutan = id di file index: hanya boleh DITAMBAH di akhir, jangan diubah.
+EVENT_LOG = (
+    None, 'run_mulai', 'run_selesai', 'adb_ok', 'adb_error', 'sms_baru',
+    'sms_kosong', 'kuota_rendah', 'kuota_aman', 'konfirmasi', 'renewal_mulai',
+    'renewal_selesai', 'renewal_prediktif', 'ussd', 'daemon_mulai',
+    'daemon_stop', 'fatal', 'telegram', 'adb_pulih',
+)
+_EVENT_ID = {nama: i for i, nama in enumerate(EVENT_LOG)}
+LEVEL_LOG = ('INFO', 'SUCCESS', 'WARN', 'ERROR')
+_LEVEL_ID = {nama: i for i, nama in enumerate(LEVEL_LOG)}
+
+
 class Logger:
-    """Simple logger untuk debugging dan monitoring"""
+    """Logger ke stdout + file log ber-buffer, dengan index offset
+
+    Baris ditahan di memori dan ditulis dalam satu write() saat level
+    WARN/ERROR, buffer penuh (LOG_BUFFER) atau di akhir tick (flush()).
+    Offset baris ditentukan saat flush dari ukuran file sebenarnya, jadi
+    index tetap benar walau ada penulis lain (redirect stdout cron).
+
+    Setiap baris punya entri index di <log>.idx (struct INDEX_FORMAT:
+    waktu, offset, level, event) yang dipakai `auto_edu.py logs` untuk
+    binary search berdasarkan waktu. LOG_FORMAT=json menulis baris
+    JSON-lines {"t", "ts", "level", "event", "msg"}.
+
+    Rotasi: begitu melewati MAX_LOG_SIZE, file di-gzip menjadi generasi
+    .1.gz (maksimal LOG_GENERASI) dan index dimulai ulang.
+    Aman dipakai dari beberapa thread (outbox, watcher SMS).
+    """
     
-    def __init__(self, log_file=None):
+    LEVEL_FLUSH = ('WARN', 'ERROR')
+    INDEX_FORMAT = '<dQBB'
+    INDEX_SIZE = struct.calcsize(INDEX_FORMAT)
+    
+    def __init__(self, log_file=None, max_size=None, generasi=None, format_log=None):
         self.log_file = log_file
+        self.index_file = f"{log_file}.idx" if log_file else None
+        self.max_size = MAX_LOG_SIZE if max_size is None else max_size
+        self.generasi = LOG_GENERASI if generasi is None else generasi
+        self.json = (LOG_FORMAT if format_log is None else format_log) == 'json'
+        self.stdout = LOG_STDOUT == 'true' or (
+            LOG_STDOUT == 'auto' and (not log_file or sys.stdout.isatty())
+        )
+        self._fd = None
+        self._fd_index = None
+        self._buffer = []      # (waktu, level_id, event_id, bytes baris)
+        self._buffer_bytes = 0
+        self._ukuran = 0
+        self._lock = threading.Lock()
         self._check_log_size()
     
+    def _buka(self):
+        self._fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._fd_index = os.open(self.index_file, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self._ukuran = os.fstat(self._fd).st_size
+        ukuran_index = os.fstat(self._fd_index).st_size
+        if ukuran_index >= self.INDEX_SIZE:
+            # Log dibuat ulang / di-clear: record terakhir menunjuk melewati
+            # akhir file -> index lama tidak berlaku
+            record = os.pread(self._fd_index, self.INDEX_SIZE, ukuran_index - self.INDEX_SIZE)
+            if struct.unpack(self.INDEX_FORMAT, record)[1] >= self._ukuran:
+                os.ftruncate(self._fd_index, 0)
+    
+    def _tutup_fd(self):
+        for fd in (self._fd, self._fd_index):
+            if fd is not None:
+                os.close(fd)
+        self._fd = self._fd_index = None
+    
     def _check_log_size(self):
-        """Rotasi log jika terlalu besar"""
-        if self.log_file and Path(self.log_file).exists():
-            if Path(self.log_file).stat().st_size > MAX_LOG_SIZE:
-                Path(self.log_file).unlink()
-    
-    def log(self, level, message):
-        """Write log dengan timestamp"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        """Sinkronkan ukuran dengan file (mis. setelah log di-clear) lalu rotasi jika perlu"""
+        if not self.log_file:
+            return
+        with self._lock:
+            try:
+                self._flush()
+                if self._fd is not None:
+                    ukuran = os.fstat(self._fd).st_size
+                    if ukuran < self._ukuran:
+                        # Di-clear dari luar (LuCI): index lama tidak berlaku
+                        os.ftruncate(self._fd_index, 0)
+                    self._ukuran = ukuran
+                elif Path(self.log_file).exists():
+                    self._ukuran = Path(self.log_file).stat().st_size
+                if self._ukuran > self.max_size:
+                    self._rotasi()
+            except OSError as e:
+                print(f"Warning: Gagal cek ukuran log: {e}")
+    
+    def _rotasi(self):
+        """Geser .N.gz, kompres log sekarang ke .1.gz, mulai file + index baru"""
+        import gzip
+        self._tutup_fd()
+        if self.generasi > 0:
+            for i in range(self.generasi - 1, 0, -1):
+                lama = f"{self.log_file}.{i}.gz"
+                if os.path.exists(lama):
+                    os.replace(lama, f"{self.log_file}.{i + 1}.gz")
+            tmp_gz = f"{self.log_file}.1.gz.tmp"
+            with open(self.log_file, 'rb') as src, gzip.open(tmp_gz, 'wb') as dst:
+                while True:
+                    blok = src.read(65536)
+                    if not blok:
+                        break
+                    dst.write(blok)
+            os.replace(tmp_gz, f"{self.log_file}.1.gz")
+        os.unlink(self.log_file)
+        if os.path.exists(self.index_file):
+            os.unlink(self.index_file)
+        self._ukuran = 0
+    
+    def _flush(self):
+        """Tulis buffer (panggil dengan lock): satu write log + satu write index"""
+        if not self._buffer:
+            return
+        if self._fd is None:
+            self._buka()
+        # Offset dari ukuran file sebenarnya (O_APPEND menulis di akhir)
+        offset = os.fstat(self._fd).st_size
+        index = bytearray()
+        for waktu, level_id, event_id, data in self._buffer:
+            index += struct.pack(self.INDEX_FORMAT, waktu, offset, level_id, event_id)
+            offset += len(data)
+        os.write(self._fd, b''.join(entry[3] for entry in self._buffer))
+        os.write(self._fd_index, bytes(index))
+        self._ukuran = offset
+        self._buffer = []
+        self._buffer_bytes = 0
+        if self._ukuran > self.max_size:
+            self._rotasi()
+    
+    def log(self, level, message, event=None):
+        """Write log dengan timestamp (event: kode stabil dari EVENT_LOG)"""
+        sekarang = time.time()
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sekarang))
+        # Multi device: tandai baris dengan nama device thread ini
+        perangkat = getattr(_konteks, 'perangkat', None)
+        if perangkat is not None and perangkat.label:
+            message = f"[{perangkat.nama}] {message}"
         log_msg = f"[{timestamp}] [{level}] {message}"
         
-        print(log_msg)
+        if self.stdout:
+            print(log_msg)
         
         if self.log_file:
+            if self.json:
+                baris = json.dumps(
+                    {'t': round(sekarang, 3), 'ts': timestamp, 'level': level,
+                     'event': event, 'msg': message},
+                    ensure_ascii=False, separators=(',', ':')
+                )
+            else:
+                baris = log_msg
+            data = (baris + '\n').encode('utf-8')
+            with self._lock:
+                try:
+                    self._buffer.append(
+                        (sekarang, _LEVEL_ID.get(level, 0), _EVENT_ID.get(event, 0), data)
+                    )
+                    self._buffer_bytes += len(data)
+                    if level in self.LEVEL_FLUSH or self._buffer_bytes >= LOG_BUFFER:
+                        self._flush()
+                except Exception as e:
+                    self._buffer = []
+                    self._buffer_bytes = 0
+                    print(f"Warning: Gagal write log: {e}")
+    
+    def flush(self):
+        """Tulis buffer ke file (akhir tick / sebelum keluar)"""
+        with self._lock:
             try:
-                with open(self.log_file, 'a', encoding='utf-8') as f:
-                    f.write(log_msg + '\n')
-            except Exception as e:
-                print(f"Warning: Gagal write log: {e}")
+                self._flush()
+            except OSError as e:
+                self._buffer = []
+                self._buffer_bytes = 0
+                print(f"Warning: Gagal flush log: {e}")
     
-    def info(self, message):
-        self.log('INFO', message)
+    def tutup(self):
+        self.flush()
+        with self._lock:
+            self._tutup_fd()
     
-    def warning(self, message):
-        self.log('WARN', message)
+    def info(self, message, event=None):
+        self.log('INFO', message, event)
     
-    def error(self, message):
-        self.log('ERROR', message)
+    def warning(self, message, event=None):
+        self.log('WARN', message, event)
     
-    def success(self, message):
-        self.log('SUCCESS', message)
+    def error(self, message, event=None):
+        self.log('ERROR', message, event)
+    
+    def success(self, message, event=None):
+        self.log('SUCCESS', message, event)
 
 
 class TelegramBot:
-    """Handler untuk Telegram Bot API"""
+    """Handler untuk Telegram Bot API
+
+    Memakai http.client dengan satu koneksi HTTPS keep-alive yang dipakai
+    ulang untuk semua pesan (tanpa spawn curl, DNS lookup dan TLS handshake
+    per pesan).
+    """
     
-    def __init__(self, token, chat_id, logger):
+    TIMEOUT = 10
+    # Method semu untuk outbox: edit pesan status live (atau kirim + pin baru)
+    METHOD_LIVE = 'liveStatus'
+    MAX_RETRY_AFTER = 30
+    
+    def __init__(self, token, chat_id, logger, api_url=None, perangkat=None):
         self.token = token
         self.chat_id = chat_id
         self.logger = logger
-        self.base_url = f"https://api.telegram.org/bot{token}"
+        
+        # URL di-parse saat koneksi pertama (tick tanpa notifikasi tidak
+        # perlu import urllib/http.client/ssl)
+        self.api_url = api_url or TELEGRAM_API_URL
+        self.base_path = None
+        self._conn = None
+        self.outbox = None
+        self.live_status = TELEGRAM_LIVE_STATUS
+        self.live_file = TELEGRAM_LIVE_FILE
+        self.perangkat = perangkat or ADB_SERIAL or 'default'
+        # Label perangkat di metrik (thread outbox tidak punya perangkat_aktif())
+        self.label_metrik = None
+    
+    def mulai_outbox(self, path=None):
+        """Aktifkan pengiriman asinkron lewat outbox persisten"""
+        self.outbox = TelegramOutbox(self, path or TELEGRAM_OUTBOX_FILE, self.logger)
+        self.outbox.mulai()
+        return self.outbox
+    
+    def _koneksi(self):
+        import http.client
+        if self._conn is None:
+            import urllib.parse
+            url = urllib.parse.urlsplit(self.api_url)
+            self.base_path = f"{url.path.rstrip('/')}/bot{self.token}"
+            if url.scheme != 'http':
+                import ssl
+                self._conn = http.client.HTTPSConnection(
+                    url.hostname, url.port, timeout=self.TIMEOUT,
+                    context=ssl.create_default_context()
+                )
+            else:
+                self._conn = http.client.HTTPConnection(
+                    url.hostname, url.port, timeout=self.TIMEOUT
+                )
+        return self._conn
+    
+    def tutup(self, flush_timeout=None):
+        """Kirim sisa outbox (dengan batas waktu), lalu tutup koneksi keep-alive"""
+        if self.outbox is not None:
+            outbox, self.outbox = self.outbox, None
+            berhenti = outbox.stop(
+                TELEGRAM_FLUSH_TIMEOUT if flush_timeout is None else flush_timeout,
+                tutup_koneksi=True
+            )
+            if not berhenti:
+                # Thread pengirim masih di tengah request memakai _conn:
+                # koneksi ditutup thread itu sendiri begitu request selesai
+                return
+        self._tutup_koneksi()
+    
+    def _tutup_koneksi(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def _post(self, method, body):
+        """POST satu request, return (status HTTP, body bytes)"""
+        import http.client
+        for percobaan in range(2):
+            dipakai_ulang = self._conn is not None
+            conn = self._koneksi()
+            try:
+                conn.request(
+                    'POST', f"{self.base_path}/{method}", body=body,
+                    headers={'Content-Type': 'application/x-www-form-urlencoded'}
+                )
+                resp = conn.getresponse()
+                data = resp.read()
+                if resp.will_close:
+                    self._tutup_koneksi()
+                return resp.status, data
+            except (http.client.HTTPException, OSError):
+                self._tutup_koneksi()
+                # Koneksi keep-alive basi (ditutup server): ulang sekali
+                # dengan koneksi baru sebelum dianggap gagal
+                if dipakai_ulang and percobaan == 0:
+                    continue
+                raise
+    
+    def panggil_api(self, method, params):
+        """Panggil method Bot API, return dict JSON (selalu punya key 'ok')"""
+        import urllib.parse
+        body = urllib.parse.urlencode(params).encode()
+        mulai = time.monotonic()
+        try:
+            status, data = self._post(method, body)
+        finally:
+            metrik().amati(
+                'autoedu_telegram_request_seconds', time.monotonic() - mulai,
+                perangkat=self.label_metrik, method=method
+            )
+        try:
+            hasil = json.loads(data.decode('utf-8'))
+        except ValueError:
+            hasil = {}
+        if not isinstance(hasil, dict):
+            hasil = {}
+        hasil.setdefault('ok', False)
+        hasil.setdefault('error_code', status if status != 200 else None)
+        return hasil
+    
+    def kirim_sekali(self, method, params):
+        """Satu percobaan panggil API untuk outbox
+
+        Return (status, detik_tunggu): 'ok', 'retry' atau 'drop' (error
+        permanen seperti chat_id/token salah yang tidak akan berhasil diulang).
+        """
+        import socket
+        try:
+            if method == self.METHOD_LIVE:
+                hasil = self._kirim_status_live(params)
+            else:
+                hasil = self.panggil_api(method, params)
+        except socket.timeout:
+            self.logger.warning(f"Outbox {method}: Timeout")
+            return 'retry', None
+        except Exception as e:
+            self.logger.warning(f"Outbox {method}: {str(e)}")
+            return 'retry', None
+        
+        if hasil['ok']:
+            return 'ok', None
+        
+        error_code = hasil.get('error_code')
+        self.logger.warning(
+            f"Outbox {method}: Gagal kirim ({error_code}) {hasil.get('description', '')}".rstrip()
+        )
+        if error_code == 429:
+            retry_after = (hasil.get('parameters') or {}).get('retry_after')
+            return 'retry', min(int(retry_after or 2), self.MAX_RETRY_AFTER)
+        if error_code and 400 <= error_code < 500:
+            return 'drop', None
+        return 'retry', None
     
     def kirim_pesan(self, pesan, parse_mode='HTML', silent=False):
-        """Kirim pesan ke Telegram dengan retry mechanism"""
+        """Kirim pesan ke Telegram dengan retry mechanism
+
+        Jika outbox aktif, pesan hanya diantrikan (persisten) dan langsung
+        return True; pengiriman dilakukan thread outbox.
+        """
         if not self.chat_id or self.chat_id == 'CHAT_ID':
             self.logger.error("CHAT_ID belum dikonfigurasi!")
             return False
         
-        url = f"{self.base_url}/sendMessage"
         params = {
             'chat_id': self.chat_id,
             'text': pesan,
             'parse_mode': parse_mode,
-            'disable_notification': silent
+            'disable_notification': 'true' if silent else 'false'
         }
         
-        data = urllib.parse.urlencode(params)
+        if self.outbox is not None:
+            self.outbox.tambah('sendMessage', params)
+            return True
         
+        import socket
         for attempt in range(3):
+            jeda = 2
             try:
-                result = subprocess.run(
-                    f'curl -s -X POST "{url}" -d "{data}"',
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                hasil = self.panggil_api('sendMessage', params)
                 
-                if result.returncode == 0:
-                    self.logger.info("Pesan Telegram terkirim")
+                if hasil['ok']:
+                    self.logger.info("Pesan Telegram terkirim", event='telegram')
                     return True
-                else:
-                    self.logger.warning(f"Attempt {attempt + 1}: Gagal kirim ({result.returncode})")
+                
+                error_code = hasil.get('error_code')
+                deskripsi = hasil.get('description', '')
+                self.logger.warning(
+                    f"Attempt {attempt + 1}: Gagal kirim ({error_code}) {deskripsi}".rstrip()
+                )
+                
+                if error_code == 429:
+                    retry_after = (hasil.get('parameters') or {}).get('retry_after', jeda)
+                    jeda = min(int(retry_after), self.MAX_RETRY_AFTER)
+                elif error_code and 400 <= error_code < 500:
+                    # Request salah (chat_id/format/token): retry tidak membantu
+                    return False
                     
-            except subprocess.TimeoutExpired:
+            except socket.timeout:
                 self.logger.warning(f"Attempt {attempt + 1}: Timeout")
             except Exception as e:
                 self.logger.error(f"Attempt {attempt + 1}: {str(e)}")
             
             if attempt < 2:
-                time.sleep(2)
+                metrik().tambah('autoedu_telegram_retries', perangkat=self.label_metrik)
+                time.sleep(jeda)
         
         return False
     
-    def kirim_pesan_format(self, emoji, judul, konten, tingkat='info'):
-        """Kirim pesan dengan format HTML yang rapi"""
+    def kirim_pesan_format(self, emoji, judul, konten, tingkat='info', live=False):
+        """Kirim pesan dengan format HTML yang rapi
+
+        live=True: jika mode status live aktif, pesan status di-edit
+        (bukan pesan baru) dengan fase dan konten ini.
+        """
+        if live and self.live_status:
+            return self.perbarui_status(emoji, judul, konten)
+        
         template = f"""
 {emoji} <b>{judul}</b>
 
 {konten}
 
-<i>⏱ {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</i>
+<i>⏱ {format_waktu('%d/%m/%Y %H:%M:%S')}</i>
 """
         return self.kirim_pesan(template.strip())
+    
+    def perbarui_status(self, emoji, judul, konten):
+        """Update pesan status live (satu pesan di-pin per chat & device)"""
+        if not self.chat_id or self.chat_id == 'CHAT_ID':
+            self.logger.error("CHAT_ID belum dikonfigurasi!")
+            return False
+        
+        template = f"""
+📟 <b>Auto Edu</b> · <code>{self.perangkat}</code>
 
+{emoji} <b>{judul}</b>
 
-class ADBManager:
-    """Manager untuk komunikasi dengan Android via ADB"""
-    
-    def __init__(self, logger):
-        self.logger = logger
-    
-    def cek_koneksi(self):
-        """Cek apakah ADB terhubung dengan device"""
+{konten}
+
+<i>🔄 Update: {format_waktu('%d/%m/%Y %H:%M:%S')}</i>
+"""
+        params = {
+            'kunci': f"{self.chat_id}:{self.perangkat}",
+            'chat_id': self.chat_id,
+            'text': template.strip(),
+            'parse_mode': 'HTML',
+        }
+        
+        if self.outbox is not None:
+            # Update status lama yang belum terkirim tidak perlu dikirim lagi
+            self.outbox.tambah(self.METHOD_LIVE, params, gabung='kunci')
+            return True
+        
         try:
-            result = subprocess.run(
-                "adb devices",
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            lines = result.stdout.strip().split('\n')
-            if len(lines) > 1 and 'device' in lines[1]:
-                self.logger.success("ADB terhubung dengan device")
-                return True
-            else:
-                self.logger.error("Tidak ada device ADB yang terhubung")
-                return False
-                
+            hasil = self._kirim_status_live(params)
         except Exception as e:
-            self.logger.error(f"Gagal cek koneksi ADB: {str(e)}")
+            self.logger.error(f"Gagal update status live: {str(e)}")
             return False
+        return hasil['ok']
     
-    def kirim_ussd(self, kode_ussd):
-        """Kirim kode USSD ke device"""
+    def _muat_live_ids(self):
         try:
-            self.logger.info(f"Mengirim USSD: {kode_ussd}")
-            
-            kode_encoded = kode_ussd.replace('#', '%23')
-            
-            result = subprocess.run(
-                f"adb shell am start -a android.intent.action.CALL -d tel:{kode_encoded}",
-                shell=True,
-                capture_output=True,
-                timeout=TIMEOUT_ADB
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"ADB error: {result.stderr.decode()}")
-            
-            time.sleep(JEDA_USSD)
-            
-            subprocess.run(
-                "adb shell input keyevent KEYCODE_BACK",
-                shell=True,
-                capture_output=True,
-                timeout=5
-            )
-            time.sleep(1)
-            
-            self.logger.success(f"USSD '{kode_ussd}' berhasil dikirim")
-            return True, f"✅ USSD '{kode_ussd}' terkirim"
+            with open(self.live_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _kirim_status_live(self, params):
+        """Edit pesan status; kirim + pin pesan baru jika belum ada / sudah dihapus
+
+        Baca-ubah-tulis file message_id dikunci flock: proses lain (cron
+        yang tumpang tindih, --test) tidak boleh mengirim pesan status kedua.
+        """
+        import fcntl
+        try:
+            kunci_file = open(f"{self.live_file}.lock", 'a')
+        except OSError as e:
+            self.logger.warning(f"Lock status live tidak bisa dibuat: {e}")
+            return self._perbarui_status_live(params)
+        with kunci_file:
+            fcntl.flock(kunci_file, fcntl.LOCK_EX)
+            return self._perbarui_status_live(params)
+    
+    def _perbarui_status_live(self, params):
+        kunci = params['kunci']
+        ids = self._muat_live_ids()
+        message_id = ids.get(kunci)
+        
+        if message_id:
+            hasil = self.panggil_api('editMessageText', {
+                'chat_id': params['chat_id'],
+                'message_id': message_id,
+                'text': params['text'],
+                'parse_mode': params['parse_mode'],
+            })
+            if hasil['ok'] or 'not modified' in hasil.get('description', ''):
+                hasil['ok'] = True
+                return hasil
+            if hasil.get('error_code') != 400:
+                # 429 / error server: diulang outbox, pesan lama tetap dipakai
+                return hasil
+            self.logger.warning(f"Pesan status #{message_id} tidak bisa di-edit, kirim baru")
+        
+        hasil = self.panggil_api('sendMessage', {
+            'chat_id': params['chat_id'],
+            'text': params['text'],
+            'parse_mode': params['parse_mode'],
+            'disable_notification': 'true',
+        })
+        if not hasil['ok']:
+            return hasil
+        
+        message_id = (hasil.get('result') or {}).get('message_id')
+        if message_id:
+            ids[kunci] = message_id
+            try:
+                tmp_path = f"{self.live_file}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(ids, f)
+                os.replace(tmp_path, self.live_file)
+            except OSError as e:
+                self.logger.warning(f"Gagal simpan message_id status: {e}")
             
-        except subprocess.TimeoutExpired:
-            msg = f"❌ Timeout saat kirim USSD '{kode_ussd}'"
-            self.logger.error(msg)
-            return False, msg
-        except Exception as e:
-            msg = f"❌ Gagal kirim USSD: {str(e)}"
-            self.logger.error(msg)
-            return False, msg
+            pin = self.panggil_api('pinChatMessage', {
+                'chat_id': params['chat_id'],
+                'message_id': message_id,
+                'disable_notification': 'true',
+            })
+            if not pin['ok']:
+                self.logger.warning(f"Gagal pin pesan status: {pin.get('description', '')}")
+        return hasil
+
+
+class TelegramOutbox:
+    """Antrian notifikasi Telegram persisten (JSON lines) + thread pengirim
+
+    tambah() menulis pesan ke file lebih dulu lalu langsung kembali, jadi
+    jalur kritis (deteksi -> unreg -> beli) tidak pernah menunggu jaringan.
+    Thread latar belakang mengirim pesan berurutan dengan backoff; pesan
+    yang belum terkirim saat crash atau WAN mati dikirim pada run berikutnya.
+    """
+    
+    MIN_BACKOFF = 2
+    MAX_BACKOFF = 60
     
-    def baca_sms(self, limit=5, keyword=None):
-        """Baca SMS dari inbox dengan filter opsional"""
+    def __init__(self, bot, path, logger):
+        self.bot = bot
+        self.path = path
+        self.logger = logger
+        self._cond = threading.Condition()
+        self._antrian = self._muat()
+        self._seq = max((entry['id'] for entry in self._antrian), default=0)
+        self._stop = False
+        # Tutup koneksi keep-alive bot saat thread keluar (lihat stop())
+        self._tutup_saat_idle = False
+        self._thread = None
+        self.latency_terakhir = None
+        
+        if self._antrian:
+            self.logger.info(f"Outbox: {len(self._antrian)} pesan tertunda dari run sebelumnya")
+    
+    def _muat(self):
+        antrian = []
         try:
-            self.logger.info(f"Membaca {limit} SMS terbaru...")
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for baris in f:
+                    try:
+                        entry = json.loads(baris)
+                    except ValueError:
+                        # Baris terpotong (crash saat append)
+                        continue
+                    if isinstance(entry, dict) and 'id' in entry:
+                        antrian.append(entry)
+        except OSError:
+            pass
+        return antrian
+    
+    def _tulis_ulang(self):
+        """Tulis ulang sisa antrian secara atomik (dipanggil dengan lock)"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self._antrian:
+                f.write(json.dumps(entry) + '\n')
+        os.replace(tmp_path, self.path)
+    
+    def __len__(self):
+        with self._cond:
+            return len(self._antrian)
+    
+    def tambah(self, method, params, gabung=None):
+        """Antrikan satu panggilan API (persisten sebelum return)
+
+        gabung: nama key di params; entry tertunda dengan method dan nilai
+        key yang sama dibuang (hanya versi terbaru yang perlu dikirim).
+        """
+        with self._cond:
+            self._seq += 1
+            entry = {'id': self._seq, 'method': method, 'params': params, 't': time.time()}
             
-            cmd = 'content query --uri content://sms/inbox --projection address:date:body --sort "date DESC"'
-            result = subprocess.run(
-                f"adb shell {cmd}",
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=TIMEOUT_ADB
-            )
+            jumlah = len(self._antrian)
+            if gabung:
+                # Entry terdepan mungkin sedang dikirim, biarkan
+                self._antrian[1:] = [
+                    e for e in self._antrian[1:]
+                    if not (e['method'] == method
+                            and e['params'].get(gabung) == params.get(gabung))
+                ]
+            self._antrian.append(entry)
             
-            if result.returncode != 0:
-                raise Exception("Gagal query SMS database")
+            try:
+                if len(self._antrian) <= jumlah:
+                    self._tulis_ulang()
+                else:
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(entry) + '\n')
+            except OSError as e:
+                self.logger.warning(f"Outbox: gagal simpan ke {self.path}: {e}")
+            self._cond.notify_all()
+    
+    def mulai(self):
+        self._thread = threading.Thread(target=self._loop, name='telegram-outbox', daemon=True)
+        self._thread.start()
+    
+    def _loop(self):
+        backoff = self.MIN_BACKOFF
+        while True:
+            with self._cond:
+                while not self._antrian and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    # Sisa antrian tetap di file untuk run berikutnya
+                    if self._tutup_saat_idle:
+                        self.bot._tutup_koneksi()
+                    return
+                entry = self._antrian[0]
             
-            pesan_list = []
-            found_keyword = False
+            status, tunggu = self.bot.kirim_sekali(entry['method'], entry['params'])
             
-            for baris in result.stdout.splitlines():
-                if not baris.strip().startswith('Row:'):
-                    continue
-                
-                alamat = re.search(r'address=([^,]+),', baris)
-                tanggal = re.search(r'date=(\d+),', baris)
-                isi = re.search(r'body=(.+)$', baris)
-                
-                if not (alamat and tanggal and isi):
-                    continue
-                
-                pengirim = alamat.group(1).strip()
-                timestamp = int(tanggal.group(1)) / 1000
-                tanggal_str = datetime.fromtimestamp(timestamp).strftime('%d/%m/%Y %H:%M')
-                isi_pesan = isi.group(1).strip()
-                
-                if keyword and keyword.lower() in isi_pesan.lower():
-                    found_keyword = True
-                
-                pesan_list.append({
-                    'pengirim': pengirim,
-                    'tanggal': tanggal_str,
-                    'isi': isi_pesan,
-                    'timestamp': timestamp
-                })
-                
-                if len(pesan_list) >= limit:
-                    break
+            if status == 'retry':
+                metrik().tambah('autoedu_telegram_retries', perangkat=self.bot.label_metrik)
+                with self._cond:
+                    if not self._stop:
+                        self._cond.wait(tunggu or backoff)
+                backoff = min(backoff * 2, self.MAX_BACKOFF)
+                continue
             
-            self.logger.success(f"Berhasil baca {len(pesan_list)} SMS")
-            return pesan_list, found_keyword
+            backoff = self.MIN_BACKOFF
+            with self._cond:
+                if self._antrian and self._antrian[0]['id'] == entry['id']:
+                    self._antrian.pop(0)
+                try:
+                    self._tulis_ulang()
+                except OSError as e:
+                    self.logger.warning(f"Outbox: gagal update {self.path}: {e}")
+                self._cond.notify_all()
             
-        except subprocess.TimeoutExpired:
-            self.logger.error("Timeout saat baca SMS")
-            return [], False
-        except Exception as e:
-            self.logger.error(f"Gagal baca SMS: {str(e)}")
-            return [], False
+            if status == 'ok':
+                self.latency_terakhir = time.time() - entry['t']
+                self.logger.info(
+                    f"Pesan Telegram terkirim (delay {self.latency_terakhir:.1f}s)"
+                )
+            else:
+                self.logger.error(f"Outbox: pesan #{entry['id']} dibuang (error permanen)")
+    
+    def flush(self, timeout):
+        """Tunggu antrian kosong, return True jika semua terkirim"""
+        batas = time.monotonic() + timeout
+        with self._cond:
+            while self._antrian:
+                sisa = batas - time.monotonic()
+                if sisa <= 0 or self._thread is None or not self._thread.is_alive():
+                    return False
+                self._cond.wait(sisa)
+        return True
+    
+    def stop(self, timeout, tutup_koneksi=False):
+        """Flush dengan batas waktu lalu hentikan thread pengirim
 
+        tutup_koneksi: thread menutup koneksi keep-alive bot sebelum keluar.
+        Return True jika thread sudah berhenti; False jika masih menunggu
+        request yang sedang berjalan (koneksi belum boleh disentuh).
+        """
+        if not self.flush(timeout):
+            self.logger.warning(
+                f"Outbox: {len(self)} pesan belum terkirim, disimpan di {self.path}"
+            )
+        with self._cond:
+            self._stop = True
+            self._tutup_saat_idle = tutup_koneksi
+            self._cond.notify_all()
+        if self._thread is None:
+            return True
+        self._thread.join(1)
+        return not self._thread.is_alive()
 
-# ============================================================================
-# FUNGSI UTAMA
-# ============================================================================
 
-def format_sms_untuk_telegram(sms_list, max_tampil=3):
-    """Format list SMS menjadi text untuk Telegram"""
-    if not sms_list:
-        return "❌ Tidak ada SMS ditemukan"
+class SMS:
+    """Record SMS ringkas; tanggal tampilan dibuat saat dibutuhkan saja"""
     
-    result = []
-    for i, sms in enumerate(sms_list[:max_tampil], 1):
-        result.append(
-            f"<b>SMS #{i}</b>\n"
-            f"📤 <code>{sms['pengirim']}</code>\n"
-            f"🕐 {sms['tanggal']}\n"
-            f"💬 {sms['isi'][:200]}{'...' if len(sms['isi']) > 200 else ''}"
-        )
+    __slots__ = ('id', 'pengirim', 'date_ms', 'isi')
     
-    return "\n\n".join(result)
+    def __init__(self, sms_id, pengirim, date_ms, isi):
+        self.id = sms_id
+        self.pengirim = pengirim
+        self.date_ms = date_ms
+        self.isi = isi
+    
+    @property
+    def timestamp(self):
+        return self.date_ms / 1000
+    
+    @property
+    def tanggal(self):
+        return format_waktu('%d/%m/%Y %H:%M', self.timestamp)
+    
+    def __repr__(self):
+        return f"SMS(id={self.id}, pengirim={self.pengirim!r}, date_ms={self.date_ms})"
 
 
-def proses_renewal(adb, telegram, logger):
-    """Proses unreg dan beli paket baru"""
-    logger.info("=" * 50)
-    logger.info("MEMULAI PROSES RENEWAL")
-    logger.info("=" * 50)
+# Satu pola untuk baris Row (projection _id:address:date:body)
+@functools.lru_cache(maxsize=None)
+def _re_sms_row():
+    return re.compile(rb'Row: \d+ _id=(\d+), address=(.*?), date=(\d+), body=(.*)', re.DOTALL)
+
+
+def _buat_sms(sms_id, alamat, tanggal, isi_parts):
+    return SMS(
+        int(sms_id),
+        alamat.decode('utf-8', 'replace').strip(),
+        int(tanggal),
+        b'\n'.join(isi_parts).decode('utf-8', 'replace').strip()
+    )
+
+
+def parse_sms_stream(stream, limit=None):
+    """Parse output `content query` baris demi baris (bytes)
+
+    Baris yang tidak diawali 'Row: ' adalah lanjutan body SMS multi-baris.
+    Berhenti begitu baris Row ke-(limit + 1) muncul, tanpa membaca sisa output.
+    Return: (list SMS, True jika berhenti lebih awal)
+    """
+    pesan_list = []
+    match_row = _re_sms_row().match
+    current = None
     
-    hasil = []
+    for baris in stream:
+        if baris.startswith(b'Row: '):
+            if current is not None:
+                pesan_list.append(_buat_sms(*current))
+                if limit and len(pesan_list) >= limit:
+                    return pesan_list, True
+            m = match_row(baris.rstrip(b'\r\n'))
+            current = (m.group(1), m.group(2), m.group(3), [m.group(4)]) if m else None
+        elif current is not None:
+            current[3].append(baris.rstrip(b'\r\n'))
     
-    telegram.kirim_pesan_format(
-        "🔄", "Memulai Proses Renewal",
-        "Sedang melakukan unregister paket lama..."
-    )
+    if current is not None:
+        pesan_list.append(_buat_sms(*current))
     
-    success_unreg, msg_unreg = adb.kirim_ussd(KODE_UNREG)
-    hasil.append(msg_unreg)
+    return pesan_list, False
+
+
+def args_adb(adb_bin, serial):
+    """Awal command line adb, dengan -s <serial> jika device ditentukan"""
+    return [adb_bin, '-s', serial] if serial else [adb_bin]
+
+
+def pulihkan_adb_exec(adb_bin, serial, timeout):
+    """`adb connect` (serial host:port) atau `adb reconnect`, lalu wait-for-device
+
+    Return True jika device muncul sebelum timeout.
+    """
+    try:
+        if serial and ':' in serial:
+            subprocess.run([adb_bin, 'connect', serial], capture_output=True, timeout=timeout)
+        else:
+            # Gagal jika device belum terlihat sama sekali; wait-for-device tetap jalan
+            subprocess.run(args_adb(adb_bin, serial) + ['reconnect'], capture_output=True, timeout=5)
+        result = subprocess.run(
+            args_adb(adb_bin, serial) + ['wait-for-device'], capture_output=True, timeout=timeout
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return False
+    return result.returncode == 0
+
+
+class ADBExecTransport:
+    """Transport ADB lama: satu proses adb baru untuk setiap perintah"""
     
-    if not success_unreg:
-        telegram.kirim_pesan_format(
-            "⚠️", "Peringatan",
-            f"Unreg gagal, tapi akan lanjut beli paket baru.\n\n{msg_unreg}"
+    def __init__(self, adb_bin=None, serial=None):
+        self.adb_bin = adb_bin or ADB_BIN
+        self.serial = serial if serial is not None else ADB_SERIAL
+    
+    def cek_device(self):
+        """True jika `adb devices` menampilkan device target yang siap"""
+        result = subprocess.run(
+            [self.adb_bin, 'devices'],
+            capture_output=True,
+            text=True,
+            timeout=5
         )
+        for baris in result.stdout.strip().split('\n')[1:]:
+            kolom = baris.split()
+            if len(kolom) >= 2 and kolom[1] == 'device' and (not self.serial or kolom[0] == self.serial):
+                return True
+        return False
     
-    time.sleep(2)
+    def pulihkan(self, timeout):
+        """Coba sambungkan ulang device, True jika muncul lagi"""
+        return pulihkan_adb_exec(self.adb_bin, self.serial, timeout)
     
-    success_beli, msg_beli = adb.kirim_ussd(KODE_BELI)
-    hasil.append(msg_beli)
+    def jalankan(self, cmd, timeout=None):
+        """Jalankan perintah shell di device, return (exit code, output)"""
+        result = subprocess.run(
+            args_adb(self.adb_bin, self.serial) + ['shell', cmd],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            timeout=timeout or TIMEOUT_ADB
+        )
+        return result.returncode, result.stdout.decode('utf-8', 'replace')
     
-    if success_beli:
+    def stream(self, cmd, timeout=None):
+        """Yield output perintah per baris (bytes); proses di-kill jika berhenti lebih awal"""
+        timeout = timeout or TIMEOUT_ADB
+        proc = subprocess.Popen(
+            args_adb(self.adb_bin, self.serial) + ['shell', cmd],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        timeout_flag = []
+        
+        def _timeout():
+            timeout_flag.append(True)
+            proc.kill()
+        
+        watchdog = threading.Timer(timeout, _timeout)
+        watchdog.start()
         try:
-            renewal_timestamp_file = '/tmp/auto_edu_last_renewal'
-            with open(renewal_timestamp_file, 'w') as f:
-                f.write(str(int(time.time())))
-            logger.success(f"Renewal timestamp disimpan: {datetime.now()}")
-        except Exception as e:
-            logger.warning(f"Gagal simpan timestamp: {e}")
+            for baris in proc.stdout:
+                yield baris
+        finally:
+            watchdog.cancel()
+            if proc.poll() is None:
+                proc.kill()
+            proc.stdout.close()
+            proc.wait()
+        
+        if timeout_flag:
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        if proc.returncode != 0:
+            raise RuntimeError(f"exit code {proc.returncode}")
     
-    time.sleep(3)
-    sms_list, _ = adb.baca_sms(limit=2)
+    def tutup(self):
+        pass
+
+
+class ADBShellSession:
+    """Satu sesi `adb shell` yang dipakai bersama oleh semua perintah
+
+    Setiap perintah dibungkus `{ cmd; } 2>&1 </dev/null; echo <sentinel> $?`
+    sehingga output tiap perintah bisa dipisah dan exit code ikut terbawa.
+    Sesi yang mati atau timeout ditutup, lalu dibuka ulang otomatis pada
+    perintah berikutnya.
+    """
     
-    status = "✅ Berhasil" if (success_unreg or success_beli) else "❌ Gagal"
+    # Output sisa yang masih dibuang (drain) saat pembaca berhenti lebih awal;
+    # lebih dari ini sesi langsung ditutup saja
+    DRAIN_MAX_BYTES = 64 * 1024
     
-    konten = "\n".join(hasil)
-    if sms_list:
-        konten += f"\n\n<b>📱 SMS Terbaru:</b>\n\n{format_sms_untuk_telegram(sms_list, 2)}"
+    def __init__(self, logger, adb_bin=None, serial=None):
+        self.logger = logger
+        self.adb_bin = adb_bin or ADB_BIN
+        self.serial = serial if serial is not None else ADB_SERIAL
+        self.proc = None
+        self.returncode = None
+        self._sentinel = f"__AUTOEDU_{os.urandom(6).hex()}__".encode()
+        self._lines = []
+        self._sisa = b''
     
-    telegram.kirim_pesan_format(
-        "🎉" if success_beli else "❌",
-        f"Renewal {status}",
-        konten
-    )
+    @property
+    def aktif(self):
+        return self.proc is not None and self.proc.poll() is None
     
+    def pulihkan(self, timeout):
+        """Tutup sesi lama (dibuka ulang di perintah berikutnya) lalu sambungkan ulang"""
+        self.tutup()
+        return pulihkan_adb_exec(self.adb_bin, self.serial, timeout)
+    
+    def _buka(self):
+        self.tutup()
+        self.proc = subprocess.Popen(
+            args_adb(self.adb_bin, self.serial) + ['shell'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0
+        )
+        self.logger.info(f"Sesi adb shell dibuka (PID {self.proc.pid})")
+    
+    def tutup(self):
+        """Tutup sesi (exit), kill jika tidak merespon"""
+        if self.proc is None:
+            return
+        proc, self.proc = self.proc, None
+        self._lines = []
+        self._sisa = b''
+        try:
+            if proc.poll() is None:
+                try:
+                    proc.stdin.write(b'exit\n')
+                except OSError:
+                    pass
+                try:
+                    proc.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+        finally:
+            for pipe in (proc.stdin, proc.stdout):
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+    
+    def _kirim(self, cmd):
+        frame = f"{{ {cmd}\n}} 2>&1 </dev/null; echo {self._sentinel.decode()} $?\n".encode()
+        if not self.aktif:
+            self._buka()
+        try:
+            self.proc.stdin.write(frame)
+        except OSError:
+            # Sesi mati sejak perintah terakhir: buka ulang, kirim sekali lagi
+            self._buka()
+            self.proc.stdin.write(frame)
+    
+    def _baca_baris(self, deadline, cmd):
+        """Ambil satu baris output (bytes, tanpa newline)"""
+        fd = self.proc.stdout.fileno()
+        while not self._lines:
+            sisa_waktu = deadline - time.monotonic()
+            if sisa_waktu <= 0:
+                raise subprocess.TimeoutExpired(cmd, TIMEOUT_ADB)
+            siap, _, _ = select.select([fd], [], [], sisa_waktu)
+            if not siap:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise ConnectionError("Sesi adb shell terputus")
+            parts = (self._sisa + chunk).split(b'\n')
+            self._sisa = parts.pop()
+            self._lines.extend(reversed(parts))
+        return self._lines.pop()
+    
+    def _perintah(self, cmd, timeout):
+        """Generator output satu perintah; exit code disimpan di self.returncode"""
+        self.returncode = None
+        self._kirim(cmd)
+        deadline = time.monotonic() + (timeout or TIMEOUT_ADB)
+        selesai = False
+        try:
+            while True:
+                baris = self._baca_baris(deadline, cmd)
+                idx = baris.find(self._sentinel)
+                if idx >= 0:
+                    selesai = True
+                    kode = baris[idx + len(self._sentinel):].strip()
+                    self.returncode = int(kode) if kode.isdigit() else 1
+                    if idx > 0:
+                        # Output terakhir tanpa newline menempel di depan sentinel
+                        yield baris[:idx] + b'\n'
+                    return
+                yield baris + b'\n'
+        except (subprocess.TimeoutExpired, ConnectionError, OSError):
+            self.tutup()
+            raise
+        finally:
+            if not selesai and self.proc is not None:
+                self._buang_sisa(deadline, cmd)
+    
+    def _buang_sisa(self, deadline, cmd):
+        """Baca & buang sisa output sampai sentinel agar sesi tetap sinkron"""
+        dibuang = 0
+        try:
+            while dibuang <= self.DRAIN_MAX_BYTES:
+                baris = self._baca_baris(deadline, cmd)
+                if self._sentinel in baris:
+                    return
+                dibuang += len(baris)
+        except (subprocess.TimeoutExpired, ConnectionError, OSError):
+            pass
+        self.tutup()
+    
+    def cek_device(self):
+        """True jika sesi shell bisa menjalankan perintah (device siap)"""
+        rc, out = self.jalankan('echo ok', timeout=5)
+        return rc == 0 and 'ok' in out
+    
+    def jalankan(self, cmd, timeout=None):
+        """Jalankan perintah di sesi, return (exit code, output)"""
+        output = b''.join(self._perintah(cmd, timeout))
+        return self.returncode, output.decode('utf-8', 'replace')
+    
+    def stream(self, cmd, timeout=None):
+        """Yield output per baris (bytes); sisa output dibuang jika berhenti lebih awal"""
+        yield from self._perintah(cmd, timeout)
+        if self.returncode != 0:
+            raise RuntimeError(f"exit code {self.returncode}")
+
+
+class ADBSocketTransport:
+    """Transport ADB lewat protokol adb server (TCP 5037) tanpa exec binary adb
+
+    Request: 4 digit hex panjang + payload, dibalas OKAY atau FAIL + pesan.
+    Perintah shell memakai service `shell:` (v1) dengan sentinel exit code
+    yang sama seperti ADBShellSession.
+    """
+    
+    def __init__(self, host=None, port=None, serial=None):
+        self.host = host or ADB_SERVER_HOST
+        self.port = port or ADB_SERVER_PORT
+        self.serial = serial if serial is not None else ADB_SERIAL
+        self._sentinel = f"__AUTOEDU_{os.urandom(6).hex()}__".encode()
+    
+    def _sambung(self, timeout):
+        import socket
+        return socket.create_connection((self.host, self.port), timeout=timeout)
+    
+    @staticmethod
+    def _baca_pas(sock, n):
+        data = b''
+        while len(data) < n:
+            chunk = sock.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("Koneksi adb server terputus")
+            data += chunk
+        return data
+    
+    def _request(self, sock, payload):
+        """Kirim satu request host/service, raise jika dibalas FAIL"""
+        data = payload.encode()
+        sock.sendall(b'%04x' % len(data) + data)
+        status = self._baca_pas(sock, 4)
+        if status == b'OKAY':
+            return
+        if status == b'FAIL':
+            panjang = int(self._baca_pas(sock, 4), 16)
+            pesan = self._baca_pas(sock, panjang).decode('utf-8', 'replace')
+            raise ConnectionError(f"adb server: {pesan}")
+        raise ConnectionError(f"Balasan adb server tidak dikenal: {status!r}")
+    
+    def devices(self, timeout=5):
+        """List (serial, state) dari `host:devices`"""
+        with self._sambung(timeout) as sock:
+            self._request(sock, 'host:devices')
+            panjang = int(self._baca_pas(sock, 4), 16)
+            data = self._baca_pas(sock, panjang).decode('utf-8', 'replace')
+        
+        hasil = []
+        for baris in data.splitlines():
+            if '\t' in baris:
+                serial, state = baris.split('\t', 1)
+                hasil.append((serial.strip(), state.strip()))
+        return hasil
+    
+    def cek_device(self):
+        """True jika device target berstatus 'device'"""
+        for serial, state in self.devices():
+            if (not self.serial or serial == self.serial) and state == 'device':
+                return True
+        return False
+    
+    def pulihkan(self, timeout):
+        """host:connect untuk device TCP, lalu tunggu device muncul di host:devices"""
+        deadline = time.monotonic() + timeout
+        if self.serial and ':' in self.serial:
+            try:
+                with self._sambung(timeout) as sock:
+                    self._request(sock, f'host:connect:{self.serial}')
+            except OSError:
+                pass
+        while True:
+            try:
+                if self.cek_device():
+                    return True
+            except OSError:
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(1)
+    
+    def _buka_shell(self, cmd, timeout):
+        sock = self._sambung(timeout)
+        try:
+            if self.serial:
+                self._request(sock, f'host:transport:{self.serial}')
+            else:
+                self._request(sock, 'host:transport-any')
+            self._request(
+                sock,
+                f"shell:{{ {cmd}\n}} 2>&1 </dev/null; echo {self._sentinel.decode()} $?"
+            )
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+    
+    def _perintah(self, cmd, timeout):
+        """Generator output per baris; exit code disimpan di self.returncode"""
+        import socket
+        timeout = timeout or TIMEOUT_ADB
+        self.returncode = None
+        deadline = time.monotonic() + timeout
+        sock = self._buka_shell(cmd, timeout)
+        sisa = b''
+        try:
+            while True:
+                sock.settimeout(max(0.001, deadline - time.monotonic()))
+                try:
+                    chunk = sock.recv(65536)
+                except socket.timeout:
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+                if not chunk:
+                    break
+                parts = (sisa + chunk).split(b'\n')
+                sisa = parts.pop()
+                for baris in parts:
+                    idx = baris.find(self._sentinel)
+                    if idx >= 0:
+                        kode = baris[idx + len(self._sentinel):].strip()
+                        self.returncode = int(kode) if kode.isdigit() else 1
+                        if idx > 0:
+                            yield baris[:idx] + b'\n'
+                        return
+                    yield baris + b'\n'
+        finally:
+            # Menutup socket juga menghentikan perintah di device
+            sock.close()
+        
+        if sisa:
+            yield sisa
+        if self.returncode is None:
+            raise ConnectionError("Output shell terputus sebelum selesai")
+    
+    def jalankan(self, cmd, timeout=None):
+        """Jalankan perintah di device, return (exit code, output)"""
+        output = b''.join(self._perintah(cmd, timeout))
+        return self.returncode, output.decode('utf-8', 'replace')
+    
+    def stream(self, cmd, timeout=None):
+        """Yield output per baris (bytes); socket ditutup jika berhenti lebih awal"""
+        yield from self._perintah(cmd, timeout)
+        if self.returncode != 0:
+            raise RuntimeError(f"exit code {self.returncode}")
+    
+    def tutup(self):
+        pass
+
+
+def buat_transport_adb(logger, backend=None, serial=None):
+    """Pilih transport ADB sesuai ADB_BACKEND (serial None = ADB_SERIAL)"""
+    backend = (backend or ADB_BACKEND).lower()
+    if backend == 'socket':
+        return ADBSocketTransport(serial=serial)
+    if backend == 'exec':
+        return ADBExecTransport(serial=serial)
+    if backend != 'session':
+        logger.warning(f"ADB_BACKEND '{backend}' tidak dikenal, pakai 'session'")
+    return ADBShellSession(logger, serial=serial)
+
+
+@functools.lru_cache(maxsize=None)
+def _re_ui():
+    """(pola node, pola atribut) untuk hasil uiautomator dump"""
+    return re.compile(r'<node ([^>]*?)/?>'), re.compile(r'([\w:-]+)="([^"]*)"')
+
+
+def parse_dialog_ussd(xml):
+    """Ambil teks respon dari hasil `uiautomator dump`
+
+    Return (selesai, teks). selesai=False jika dialog masih menampilkan
+    progress ("USSD code running...") atau belum ada teks pesan.
+    """
+    import html
+    teks_pesan = []
+    teks_lain = []
+    re_node, re_attr = _re_ui()
+    for node in re_node.finditer(xml):
+        attr = dict(re_attr.findall(node.group(1)))
+        kelas = attr.get('class', '')
+        if kelas.endswith('ProgressBar'):
+            return False, ''
+        teks = html.unescape(attr.get('text', '')).strip()
+        if not teks or kelas.endswith('Button'):
+            continue
+        if attr.get('resource-id') == 'android:id/message':
+            teks_pesan.append(teks)
+        else:
+            teks_lain.append(teks)
+    
+    teks = "\n".join(teks_pesan or teks_lain)
+    return bool(teks), teks
+
+
+class ADBManager:
+    """Manager untuk komunikasi dengan Android via ADB"""
+    
+    def __init__(self, logger, transport=None, serial=None):
+        self.logger = logger
+        self.transport = transport or buat_transport_adb(logger, serial=serial)
+        self.ussd_deteksi = USSD_DETEKSI
+        # Hasil kirim_ussd() terakhir: teks respon (None jika tidak terdeteksi)
+        # dan detik dari USSD dikirim sampai respon tampil
+        self.last_ussd_response = None
+        self.last_ussd_latency = None
+        # _id SMS tertinggi yang pernah terlihat (baseline watcher konfirmasi)
+        self.sms_id_terakhir = 0
+        # Allowlist pengirim untuk query SMS (kosong = semua pengirim)
+        self.pengirim = ()
+        # Diset pemantau event saat stream device hidup lagi: probe ADB
+        # tanpa menunggu backoff circuit breaker
+        self.probe_segera = False
+    
+    def tutup(self):
+        """Tutup koneksi/sesi ADB"""
+        self.transport.tutup()
+    
+    def minta_probe(self):
+        self.probe_segera = True
+    
+    @staticmethod
+    def _catat_latency(perintah, mulai):
+        metrik().amati('autoedu_adb_command_seconds', time.monotonic() - mulai, perintah=perintah)
+    
+    def _jalankan(self, cmd, timeout=None):
+        """transport.jalankan() + latency per subcommand (kata pertama cmd)"""
+        mulai = time.monotonic()
+        try:
+            return self.transport.jalankan(cmd, timeout=timeout)
+        finally:
+            self._catat_latency(cmd.split(None, 1)[0], mulai)
+    
+    def _stream(self, cmd, timeout=None):
+        """transport.stream() + latency sampai stream ditutup"""
+        mulai = time.monotonic()
+        try:
+            yield from self.transport.stream(cmd, timeout=timeout)
+        finally:
+            self._catat_latency(cmd.split(None, 1)[0], mulai)
+    
+    def cek_koneksi(self):
+        """Cek apakah ADB terhubung dengan device"""
+        mulai = time.monotonic()
+        try:
+            if self.transport.cek_device():
+                self.logger.success("ADB terhubung dengan device", event='adb_ok')
+                return True
+            else:
+                self.logger.error("Tidak ada device ADB yang terhubung", event='adb_error')
+                return False
+                
+        except Exception as e:
+            self.logger.error(f"Gagal cek koneksi ADB: {str(e)}", event='adb_error')
+            return False
+        finally:
+            self._catat_latency('devices', mulai)
+    
+    def pulihkan(self):
+        """Coba sambungkan ulang device (connect/reconnect + wait-for-device)"""
+        self.logger.info(f"Mencoba menyambungkan ulang ADB (maks {ADB_RECONNECT_TIMEOUT} detik)...")
+        mulai = time.monotonic()
+        try:
+            if not self.transport.pulihkan(ADB_RECONNECT_TIMEOUT):
+                return False
+        except Exception as e:
+            self.logger.warning(f"Gagal menyambungkan ulang ADB: {str(e)}")
+            return False
+        finally:
+            self._catat_latency('reconnect', mulai)
+        return self.cek_koneksi()
+    
+    def kirim_ussd(self, kode_ussd):
+        """Kirim kode USSD ke device
+
+        Respon yang terdeteksi disimpan di last_ussd_response dan
+        last_ussd_latency (None jika tidak terdeteksi).
+        """
+        self.last_ussd_response = None
+        self.last_ussd_latency = None
+        try:
+            self.logger.info(f"Mengirim USSD: {kode_ussd}", event='ussd')
+            
+            kode_encoded = kode_ussd.replace('#', '%23')
+            
+            returncode, output = self._jalankan(
+                f"am start -a android.intent.action.CALL -d 'tel:{kode_encoded}'",
+                timeout=TIMEOUT_ADB
+            )
+            
+            if returncode != 0:
+                raise Exception(f"ADB error: {output.strip()}")
+            
+            mulai = time.monotonic()
+            deadline = mulai + JEDA_USSD
+            
+            respon = self._tunggu_respon_ussd(deadline) if self.ussd_deteksi else None
+            if respon is None:
+                time.sleep(max(0, deadline - time.monotonic()))
+            else:
+                self.last_ussd_response = respon
+                self.last_ussd_latency = time.monotonic() - mulai
+                metrik().amati('autoedu_ussd_roundtrip_seconds', self.last_ussd_latency)
+                self.logger.info(
+                    f"Respon USSD ({self.last_ussd_latency:.1f}s): {respon[:100]}"
+                )
+            
+            self._jalankan("input keyevent KEYCODE_BACK", timeout=5)
+            time.sleep(1)
+            
+            self.logger.success(f"USSD '{kode_ussd}' berhasil dikirim", event='ussd')
+            msg = f"✅ USSD '{kode_ussd}' terkirim"
+            if respon:
+                import html
+                msg += f" ({self.last_ussd_latency:.1f}s)\n💬 {html.escape(respon[:200])}"
+            return True, msg
+            
+        except subprocess.TimeoutExpired:
+            msg = f"❌ Timeout saat kirim USSD '{kode_ussd}'"
+            self.logger.error(msg, event='ussd')
+            return False, msg
+        except Exception as e:
+            msg = f"❌ Gagal kirim USSD: {str(e)}"
+            self.logger.error(msg, event='ussd')
+            return False, msg
+    
+    def _tunggu_respon_ussd(self, deadline):
+        """Poll dialog USSD sampai respon tampil, return teks atau None
+
+        Fokus window dicek dulu (murah); uiautomator dump hanya dijalankan
+        saat dialog USSD sudah di depan. Jika uiautomator tidak tersedia,
+        deteksi dimatikan dan kirim_ussd() kembali ke jeda tetap.
+        """
+        while True:
+            sisa = deadline - time.monotonic()
+            if sisa <= 0:
+                return None
+            time.sleep(min(USSD_POLL_INTERVAL, sisa))
+            
+            _, fokus = self._jalankan(
+                "dumpsys window | grep -m1 mCurrentFocus", timeout=5
+            )
+            if not re.search(USSD_DIALOG_PATTERN, fokus):
+                continue
+            
+            returncode, xml = self._jalankan(
+                "uiautomator dump /dev/tty", timeout=max(5, int(sisa) + 1)
+            )
+            if returncode != 0 or '<hierarchy' not in xml:
+                self.logger.warning("uiautomator dump tidak tersedia - deteksi respon USSD dimatikan")
+                self.ussd_deteksi = False
+                return None
+            
+            selesai, teks = parse_dialog_ussd(xml)
+            if selesai:
+                return teks
+    
+    @staticmethod
+    def _where_sms_baru(since_id=0, since_date=0, pengirim=()):
+        """Klausa --where untuk SMS yang lebih baru dari high-water mark
+
+        pengirim (allowlist) ikut difilter di content provider, sehingga
+        limit/sort hanya berlaku untuk SMS dari pengirim tersebut.
+        """
+        kondisi = []
+        if since_id > 0:
+            kondisi.append(f"_id>{int(since_id)}")
+        if since_date > 0:
+            # Jaga-jaga kalau database SMS di-reset (_id mulai dari kecil lagi)
+            kondisi.append(f"date>{int(since_date)}")
+        where = " OR ".join(kondisi)
+        if pengirim:
+            daftar = ",".join("'" + p.replace("'", "''") + "'" for p in pengirim)
+            filter_pengirim = f"address COLLATE NOCASE IN ({daftar})"
+            where = f"({where}) AND {filter_pengirim}" if where else filter_pengirim
+        return where
+    
+    @staticmethod
+    def _perintah_query_sms(projection, where='', sort='date DESC'):
+        """Susun perintah content query inbox SMS"""
+        cmd = f"content query --uri content://sms/inbox --projection {projection}"
+        if where:
+            # Kutip untuk sh di device (where bisa berisi literal '...')
+            cmd += " --where '" + where.replace("'", "'\\''") + "'"
+        cmd += f" --sort '{sort}'"
+        return cmd
+    
+    def cek_sms_baru(self, since_id=0, since_date=0):
+        """Probe murah: _id tertinggi dari SMS baru (0 = tidak ada, None = error)"""
+        try:
+            returncode, output = self._jalankan(
+                self._perintah_query_sms(
+                    '_id', self._where_sms_baru(since_id, since_date, self.pengirim),
+                    sort='_id DESC'
+                ),
+                timeout=TIMEOUT_ADB
+            )
+            
+            if returncode != 0:
+                raise Exception("Gagal query SMS database")
+            
+            id_baru = [int(x) for x in re.findall(r'_id=(\d+)', output)]
+            if not id_baru:
+                return 0
+            self.sms_id_terakhir = max(self.sms_id_terakhir, *id_baru)
+            return max(id_baru)
+            
+        except subprocess.TimeoutExpired:
+            self.logger.error("Timeout saat cek SMS baru")
+            return None
+        except Exception as e:
+            self.logger.error(f"Gagal cek SMS baru: {str(e)}")
+            return None
+    
+    def baca_sms(self, limit=5, keyword=None, since_id=0, since_date=0):
+        """Baca SMS dari inbox dengan filter opsional
+
+        since_id/since_date membatasi query ke SMS yang lebih baru dari
+        high-water mark, sehingga transfer ADB tidak tergantung ukuran inbox.
+        """
+        try:
+            self.logger.info(f"Membaca {limit} SMS terbaru...")
+            
+            cmd = self._perintah_query_sms(
+                '_id:address:date:body',
+                self._where_sms_baru(since_id, since_date, self.pengirim)
+            )
+            
+            # Parse sambil jalan; berhenti (kill/drain) begitu limit tercapai
+            stream = self._stream(cmd, timeout=TIMEOUT_ADB)
+            try:
+                pesan_list, _ = parse_sms_stream(stream, limit)
+            except RuntimeError:
+                raise Exception("Gagal query SMS database")
+            finally:
+                stream.close()
+            
+            found_keyword = bool(keyword) and any(
+                keyword.lower() in sms.isi.lower() for sms in pesan_list
+            )
+            if pesan_list:
+                self.sms_id_terakhir = max(self.sms_id_terakhir, *(sms.id for sms in pesan_list))
+            
+            self.logger.success(f"Berhasil baca {len(pesan_list)} SMS")
+            return pesan_list, found_keyword
+            
+        except subprocess.TimeoutExpired:
+            self.logger.error("Timeout saat baca SMS")
+            return [], False
+        except Exception as e:
+            self.logger.error(f"Gagal baca SMS: {str(e)}")
+            return [], False
+
+
+class PemutusADB:
+    """Circuit breaker koneksi ADB, disimpan di state device ('adb')
+
+    - closed    : normal; cek "terhubung" terakhir dipakai ulang selama
+                  ADB_HEALTH_TTL detik tanpa `adb devices`
+    - open      : putus; tick dilewati tanpa spawn sampai coba_berikutnya
+    - half_open : backoff habis, satu probe (plus reconnect) boleh jalan;
+                  berhasil -> closed, gagal -> open dengan backoff 2x
+    Notifikasi hanya dikirim saat closed -> open dan kembali ke closed.
+    """
+    
+    TUTUP, BUKA, SETENGAH = 'closed', 'open', 'half_open'
+    
+    def __init__(self, data=None):
+        data = data or {}
+        self.status = data.get('status', self.TUTUP)
+        self.gagal = int(data.get('gagal', 0))
+        self.sejak = data.get('sejak', 0)
+        self.coba_berikutnya = data.get('coba_berikutnya', 0)
+        self.ok_terakhir = data.get('ok_terakhir', 0)
+    
+    def ke_dict(self):
+        return {
+            'status': self.status, 'gagal': self.gagal, 'sejak': self.sejak,
+            'coba_berikutnya': self.coba_berikutnya, 'ok_terakhir': self.ok_terakhir,
+        }
+    
+    def boleh_coba(self, sekarang, paksa=False):
+        """False jika masih open (dalam backoff); open yang habis -> half_open"""
+        if self.status == self.TUTUP:
+            return True
+        if paksa or sekarang >= self.coba_berikutnya:
+            self.status = self.SETENGAH
+            return True
+        return False
+    
+    def sehat_tercache(self, sekarang):
+        return self.status == self.TUTUP and 0 <= sekarang - self.ok_terakhir < ADB_HEALTH_TTL
+    
+    def sukses(self, sekarang):
+        """Catat ADB terhubung, return True jika ini pemulihan (sebelumnya putus)"""
+        pulih = self.status != self.TUTUP
+        self.status = self.TUTUP
+        self.gagal = 0
+        self.ok_terakhir = sekarang
+        return pulih
+    
+    def putus(self, sekarang):
+        """Catat ADB gagal, return True jika baru putus (sebelumnya closed)"""
+        baru = self.status == self.TUTUP
+        if baru:
+            self.sejak = sekarang
+        self.gagal += 1
+        self.status = self.BUKA
+        self.coba_berikutnya = sekarang + self.backoff()
+        return baru
+    
+    def backoff(self):
+        return min(ADB_BACKOFF_MAX, ADB_BACKOFF_MIN * 2 ** max(0, self.gagal - 1))
+
+
+# ============================================================================
+# PERANGKAT (MULTI DEVICE)
+# ============================================================================
+
+# Device yang sedang diproses thread ini (lihat Perangkat.aktif)
+_konteks = threading.local()
+
+
+class Perangkat:
+    """Satu HP/SIM: serial ADB, config, file state dan objek ADB/Telegram sendiri
+
+    Device pertama memakai file state/cache/status/outbox yang lama, device
+    berikutnya file dengan akhiran nama (mis. auto_edu_state.hp2.json),
+    jadi menambah device tidak mengganggu riwayat device yang sudah ada.
+    Fungsi pengecekan membaca config & file lewat perangkat_aktif(), yang
+    di-set per thread oleh aktif().
+    """
+    
+    # Config yang boleh di-override per device (<nama>.<KUNCI>=...)
+    KUNCI = (
+        'ADB_SERIAL', 'BOT_TOKEN', 'CHAT_ID', 'KODE_UNREG', 'KODE_BELI',
+        'THRESHOLD_KUOTA_GB', 'KUOTA_PAKET_GB', 'SMS_PENGIRIM',
+    )
+    
+    def __init__(self, nama='default', config=None, utama=True, label=False):
+        # config None = device tunggal dari config global (tanpa DEVICES)
+        serial_default = ADB_SERIAL if config is None else nama
+        config = config or {}
+        self.nama = nama
+        self.utama = utama
+        # Prefix [nama] di log (hanya jika device lebih dari satu)
+        self.label = label
+        self.serial = config.get('ADB_SERIAL', serial_default)
+        self.bot_token = config.get('BOT_TOKEN', BOT_TOKEN)
+        self.chat_id = config.get('CHAT_ID', CHAT_ID)
+        self.kode_unreg = config.get('KODE_UNREG', KODE_UNREG)
+        self.kode_beli = config.get('KODE_BELI', KODE_BELI)
+        self.threshold_gb = int(config.get('THRESHOLD_KUOTA_GB', THRESHOLD_KUOTA_GB))
+        self.kuota_paket_gb = float(config.get('KUOTA_PAKET_GB', KUOTA_PAKET_GB))
+        pengirim = config.get('SMS_PENGIRIM', SMS_PENGIRIM)
+        self.pengirim_auto = pengirim.lower() == 'auto'
+        self.pengirim_sms = () if self.pengirim_auto else daftar_pengirim(pengirim)
+        self.belajar_pengirim = SMS_PENGIRIM_BELAJAR or self.pengirim_auto
+        # Diubah profil mode AUTO tiap tick (per device, bukan global)
+        self.jumlah_sms_cek = JUMLAH_SMS_CEK
+        self.sms_max_age = SMS_MAX_AGE_MINUTES
+        
+        self.state_file = self.file_device(STATE_FILE)
+        self.sms_cache_file = self.file_device(SMS_CACHE_FILE)
+        self.status_file = self.file_device(STATUS_FILE)
+        self.outbox_file = self.file_device(TELEGRAM_OUTBOX_FILE)
+        self.live_file = self.file_device(TELEGRAM_LIVE_FILE)
+        self.lock_file = self.file_device(LOCK_FILE)
+        
+        self.cache = None
+        self.snapshot = None
+        self.adb = None
+        self.telegram = None
+    
+    def file_device(self, path):
+        """Path file milik device ini (device utama: path aslinya)"""
+        if self.utama or not path:
+            return path
+        dasar, ext = os.path.splitext(path)
+        nama_aman = re.sub(r'[^\w.-]', '_', self.nama)
+        return f"{dasar}.{nama_aman}{ext}"
+    
+    def allowlist_sms(self, state):
+        """Pengirim untuk filter query SMS: dari config, atau hasil belajar (auto)"""
+        if self.pengirim_auto:
+            return tuple(state.get('pengirim_dikenal') or {})
+        return self.pengirim_sms
+    
+    def aktif(self):
+        """Context manager: jadikan device ini perangkat_aktif() di thread ini"""
+        return _KonteksPerangkat(self)
+    
+    def buka(self, logger):
+        """Buat objek ADB & Telegram device ini"""
+        self.adb = ADBManager(logger, serial=self.serial)
+        self.adb.pengirim = self.pengirim_sms
+        self.telegram = TelegramBot(self.bot_token, self.chat_id, logger, perangkat=self.nama
+                                    if self.label else None)
+        self.telegram.label_metrik = self.nama
+        self.telegram.live_file = self.live_file
+        if TELEGRAM_ASYNC:
+            self.telegram.mulai_outbox(self.outbox_file)
+    
+    def tutup(self, flush_timeout=None):
+        if self.adb is not None:
+            self.adb.tutup()
+        if self.telegram is not None:
+            self.telegram.tutup(flush_timeout)
+
+
+def daftar_pengirim(teks):
+    """'A, b,A' -> ('A', 'b'): pengirim unik tanpa beda huruf besar/kecil"""
+    hasil = {}
+    for nama in teks.split(','):
+        nama = nama.strip()
+        if nama:
+            hasil.setdefault(nama.lower(), nama)
+    return tuple(hasil.values())
+
+
+class _KonteksPerangkat:
+    def __init__(self, perangkat):
+        self.perangkat = perangkat
+        self._sebelum = None
+    
+    def __enter__(self):
+        self._sebelum = getattr(_konteks, 'perangkat', None)
+        _konteks.perangkat = self.perangkat
+        return self.perangkat
+    
+    def __exit__(self, *exc):
+        _konteks.perangkat = self._sebelum
+        return False
+
+
+_perangkat_default = None
+
+
+def perangkat_aktif():
+    """Device thread ini, atau device tunggal dari config global"""
+    perangkat = getattr(_konteks, 'perangkat', None)
+    if perangkat is None:
+        global _perangkat_default
+        if _perangkat_default is None:
+            _perangkat_default = Perangkat()
+        perangkat = _perangkat_default
+    return perangkat
+
+
+def muat_perangkat():
+    """Daftar Perangkat dari DEVICES (kosong = satu device config global)"""
+    if not DEVICES:
+        return [perangkat_aktif()]
+    daftar = []
+    for i, nama in enumerate(DEVICES):
+        # Kunci '<nama>.<KUNCI>': nama boleh serial ber-titik (ip:port),
+        # jadi pisah di titik terakhir
+        config = {}
+        for kunci, nilai in env_config.items():
+            prefix, _, sub_kunci = kunci.rpartition('.')
+            if prefix == nama and sub_kunci in Perangkat.KUNCI:
+                config[sub_kunci] = nilai
+        daftar.append(Perangkat(nama, config, utama=(i == 0), label=len(DEVICES) > 1))
+    return daftar
+
+
+def jalankan_paralel(daftar, fungsi, logger):
+    """fungsi(perangkat) untuk setiap device di thread pool, return list hasil
+
+    Setiap device jalan di thread sendiri dengan perangkat_aktif() miliknya,
+    jadi jeda USSD / tunggu konfirmasi satu device tidak menahan device lain.
+    Exception satu device dicatat dan hasilnya None, device lain tetap jalan.
+    """
+    def jalankan(perangkat):
+        with perangkat.aktif():
+            try:
+                return fungsi(perangkat)
+            except Exception as e:
+                logger.error(f"FATAL ERROR: {str(e)}", event='fatal')
+                if perangkat.telegram is not None:
+                    perangkat.telegram.kirim_pesan_format(
+                        "💥", "Fatal Error",
+                        f"Script error:\n<code>{str(e)}</code>\n\n"
+                        f"Periksa log untuk detail lebih lanjut."
+                    )
+                return None
+    
+    if len(daftar) == 1:
+        return [jalankan(daftar[0])]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=len(daftar), thread_name_prefix='perangkat') as pool:
+        return list(pool.map(jalankan, daftar))
+
+
+# ============================================================================
+# STATE
+# ============================================================================
+
+def muat_state():
+    """Load state persisten device aktif (high-water mark SMS, dll)"""
+    try:
+        with open(perangkat_aktif().state_file, 'r') as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def simpan_state(state):
+    """Simpan state secara atomik (tulis file sementara lalu rename)"""
+    state_file = perangkat_aktif().state_file
+    tmp_path = f"{state_file}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_file)
+
+
+# ============================================================================
+# FUNGSI UTAMA
+# ============================================================================
+
+# Minimal sampel laju sebelum prediksi boleh memicu renewal
+PREDIKSI_MIN_SAMPEL = 2
+# Jeda minimal antar renewal prediktif (cegah renewal beruntun)
+PREDIKSI_JEDA_MIN = 60
+# Backoff setelah renewal prediktif gagal: 5 menit, 10, 20 ... maks 1 jam
+PREDIKSI_BACKOFF_MIN = 300
+PREDIKSI_BACKOFF_MAX = 3600
+
+
+def amati_kuota(state, waktu, sisa_gb):
+    """Update model laju pemakaian dengan satu observasi sisa kuota
+
+    Model di state['prediksi']: titik terakhir (t, gb) dan laju GB/detik
+    (EWMA). Observasi yang tidak lebih baru dari titik terakhir diabaikan,
+    jadi aman dipanggil ulang untuk SMS yang sama. Sisa yang naik hanya
+    memindah titik tanpa mengubah laju. 't_sms' = waktu observasi SMS
+    terakhir (syarat renewal prediktif). Return True jika berubah.
+    """
+    p = state.setdefault('prediksi', {})
+    t0, gb0 = p.get('t'), p.get('gb')
+    if t0 is not None and waktu <= t0:
+        return False
+    if t0 is not None and sisa_gb < gb0:
+        laju = (gb0 - sisa_gb) / (waktu - t0)
+        lama = p.get('laju')
+        p['laju'] = laju if lama is None else PREDIKSI_ALPHA * laju + (1 - PREDIKSI_ALPHA) * lama
+        p['n'] = p.get('n', 0) + 1
+    p['t'], p['gb'] = int(waktu), sisa_gb
+    p['t_sms'] = int(waktu)
+    return True
+
+
+def reset_prediksi(state, waktu, paket_gb):
+    """Titik awal model setelah renewal: paket penuh, laju & sampel dihapus
+
+    Laju lama tidak dibawa: tanpa SMS sisa kuota baru, prediksi tidak boleh
+    memicu renewal lagi hanya dari laju paket sebelumnya.
+    """
+    state['prediksi'] = {'t': int(waktu), 'gb': paket_gb}
+
+
+def prediksi_habis(state):
+    """(perkiraan waktu habis, perkiraan sisa GB sekarang) atau None"""
+    p = state.get('prediksi') or {}
+    if not p.get('laju') or p.get('t') is None:
+        return None
+    habis = p['t'] + p['gb'] / p['laju']
+    sisa = max(0.0, p['gb'] - p['laju'] * (time.time() - p['t']))
+    return habis, sisa
+
+
+def format_prediksi(state):
+    """Ringkasan prediksi untuk notifikasi/status ('' jika belum ada data)"""
+    hasil = prediksi_habis(state)
+    if hasil is None:
+        return ''
+    habis, sisa = hasil
+    laju_jam = state['prediksi']['laju'] * 3600
+    return (
+        f"📉 Laju {laju_jam:.1f}GB/jam · perkiraan sisa {sisa:.1f}GB\n"
+        f"⏳ Habis ±{format_waktu('%d/%m %H:%M', habis)}"
+    )
+
+
+def format_sms_untuk_telegram(sms_list, max_tampil=3):
+    """Format list SMS menjadi text untuk Telegram"""
+    if not sms_list:
+        return "❌ Tidak ada SMS ditemukan"
+    
+    result = []
+    for i, sms in enumerate(sms_list[:max_tampil], 1):
+        result.append(
+            f"<b>SMS #{i}</b>\n"
+            f"📤 <code>{sms.pengirim}</code>\n"
+            f"🕐 {sms.tanggal}\n"
+            f"💬 {sms.isi[:200]}{'...' if len(sms.isi) > 200 else ''}"
+        )
+    
+    return "\n\n".join(result)
+
+
+# ============================================================================
+# KLASIFIKASI SMS
+# ============================================================================
+
+LABEL_KUOTA_RENDAH = 'kuota_rendah'
+LABEL_AKTIVASI = 'aktivasi'
+LABEL_LAIN = 'lain'
+
+# Template operator (huruf kecil); tambah pola di sini, semua digabung jadi
+# satu regex yang dicocokkan ke isi SMS yang sudah di-lowercase sekali
+POLA_AKTIVASI = (
+    r'sdh aktif',
+    r'sudah aktif',
+    r'berhasil diaktifkan',
+    r'telah diaktifkan',
+    r'paket aktif',
+)
+# Frasa sisa kuota sebelum angka, mis. "kurang dari 3GB", "sisa kuota 1,5 GB",
+# "tersisa 500MB", "kuota kamu tinggal 2GB". Sengaja tanpa "kuota"/"tinggal"
+# saja: SMS promo ("Nikmati kuota 2GB ...", "Bonus kuota 500MB") bukan sisa
+# kuota dan tidak boleh memicu renewal berbayar
+POLA_SISA_KUOTA = (
+    r'kurang dari',
+    r'sisa',
+    r'kuota(?: \w+)? tinggal',
+)
+
+# Naikkan jika pola berubah: cache klasifikasi lama dibuang
+VERSI_KLASIFIKASI = 2
+
+@functools.lru_cache(maxsize=None)
+def _re_klasifikasi():
+    return re.compile(
+        r'(?P<aktivasi>' + '|'.join(POLA_AKTIVASI) + r')'
+        # Boleh ada beberapa kata (tanpa angka) di antara konteks dan angka
+        r'|(?:' + '|'.join(POLA_SISA_KUOTA) + r')[^\d\n]{0,20}?'
+        r'(?P<nilai>\d+(?:[.,]\d+)?)\s*(?P<satuan>gb|mb)\b'
+    )
+
+
+def klasifikasi_sms(isi, threshold_gb=None):
+    """Label SMS dalam satu kali scan: (label, sisa kuota GB atau None)
+
+    kuota_rendah jika ada angka sisa kuota <= threshold (bandingkan angka,
+    tidak tergantung teks threshold yang persis sama), aktivasi jika ada
+    pola konfirmasi aktivasi, selain itu lain.
+    """
+    threshold_gb = perangkat_aktif().threshold_gb if threshold_gb is None else threshold_gb
+    aktivasi = False
+    kuota_gb = None
+    
+    # lower() sekali lebih murah daripada regex re.IGNORECASE
+    for m in _re_klasifikasi().finditer(isi.lower()):
+        if m.group('aktivasi'):
+            aktivasi = True
+            continue
+        nilai = float(m.group('nilai').replace(',', '.'))
+        if m.group('satuan') == 'mb':
+            nilai /= 1024
+        # Angka terkecil = sisa kuota (abaikan ukuran paket yang lebih besar)
+        if kuota_gb is None or nilai < kuota_gb:
+            kuota_gb = nilai
+    
+    if kuota_gb is not None and kuota_gb <= threshold_gb:
+        return LABEL_KUOTA_RENDAH, kuota_gb
+    if aktivasi:
+        return LABEL_AKTIVASI, kuota_gb
+    return LABEL_LAIN, kuota_gb
+
+
+def is_sms_konfirmasi(isi):
+    """True jika isi SMS adalah konfirmasi aktivasi paket"""
+    return klasifikasi_sms(isi)[0] == LABEL_AKTIVASI
+
+
+def belajar_pengirim(state, sms_list, klasifikasi, logger):
+    """Catat pengirim SMS kuota/aktivasi di state['pengirim_dikenal']
+
+    {pengirim: {'jumlah': n, 'terakhir': timestamp}}, dipakai sebagai
+    allowlist untuk SMS_PENGIRIM=auto dan ditampilkan di --status.
+    """
+    dikenal = state.setdefault('pengirim_dikenal', {})
+    for sms in sms_list:
+        label, kuota_gb = klasifikasi(sms)
+        if not sms.pengirim or (label == LABEL_LAIN and kuota_gb is None):
+            continue
+        entry = dikenal.get(sms.pengirim)
+        if entry is None:
+            logger.info(f"Pengirim SMS operator dikenali: {sms.pengirim}")
+            entry = dikenal[sms.pengirim] = {'jumlah': 0, 'terakhir': 0}
+        entry['jumlah'] += 1
+        entry['terakhir'] = max(entry['terakhir'], int(sms.timestamp))
+    while len(dikenal) > PENGIRIM_DIKENAL_MAKS:
+        del dikenal[min(dikenal, key=lambda p: dikenal[p]['terakhir'])]
+
+
+# Aksi yang sudah diambil untuk sebuah SMS
+AKSI_DILIHAT = 'dilihat'          # sudah dievaluasi, tidak perlu tindakan
+AKSI_DILEWATI = 'dilewati'        # kuota rendah tapi terlalu lama / sebelum renewal
+AKSI_RENEWAL = 'renewal'          # memicu renewal yang berhasil
+AKSI_KONFIRMASI = 'konfirmasi'    # konfirmasi aktivasi yang sudah dilaporkan
+
+
+class CacheKlasifikasi:
+    """Cache LRU klasifikasi + aksi per SMS, disimpan sebagai JSON
+
+    Kunci = _id + date (tetap unik walau database SMS di-reset). Cache
+    dikosongkan jika THRESHOLD_KUOTA_GB atau VERSI_KLASIFIKASI berubah
+    karena label ikut berubah.
+    """
+    
+    def __init__(self, path=None, ukuran=None, threshold_gb=None):
+        self.path = path or SMS_CACHE_FILE
+        self.ukuran = SMS_CACHE_SIZE if ukuran is None else ukuran
+        self.threshold_gb = THRESHOLD_KUOTA_GB if threshold_gb is None else threshold_gb
+        self._data = OrderedDict()
+        self._berubah = False
+        self._muat()
+    
+    def _muat(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                isi = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (not isinstance(isi, dict) or isi.get('threshold') != self.threshold_gb
+                or isi.get('versi') != VERSI_KLASIFIKASI):
+            return
+        for kunci, label, kuota_gb, aksi in isi.get('entries', []):
+            self._data[kunci] = [label, kuota_gb, aksi]
+    
+    @staticmethod
+    def kunci(sms):
+        return f"{sms.id}:{sms.date_ms}"
+    
+    def _entry(self, sms):
+        kunci = self.kunci(sms)
+        entry = self._data.get(kunci)
+        if entry is None:
+            label, kuota_gb = klasifikasi_sms(sms.isi, self.threshold_gb)
+            entry = self._data[kunci] = [label, kuota_gb, None]
+            metrik().tambah('autoedu_sms_classified', jenis=label)
+            self._berubah = True
+            while len(self._data) > self.ukuran:
+                self._data.popitem(last=False)
+        else:
+            self._data.move_to_end(kunci)
+        return entry
+    
+    def klasifikasi(self, sms):
+        """(label, sisa kuota GB) dari cache, dihitung sekali per SMS"""
+        entry = self._entry(sms)
+        return entry[0], entry[1]
+    
+    def aksi(self, sms):
+        """Aksi yang sudah diambil untuk SMS ini (None = belum pernah)"""
+        return self._entry(sms)[2]
+    
+    def tandai(self, sms, aksi):
+        self._entry(sms)[2] = aksi
+        self._berubah = True
+    
+    def simpan(self, logger=None):
+        """Tulis ke file (atomik) jika ada perubahan"""
+        if not self._berubah:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'threshold': self.threshold_gb,
+                    'versi': VERSI_KLASIFIKASI,
+                    'entries': [[k, *v] for k, v in self._data.items()],
+                }, f)
+            os.replace(tmp_path, self.path)
+            self._berubah = False
+        except OSError as e:
+            if logger:
+                logger.warning(f"Gagal simpan cache SMS: {e}")
+
+
+def cache_sms():
+    """Cache klasifikasi SMS device aktif (dimuat sekali per proses)"""
+    perangkat = perangkat_aktif()
+    if perangkat.cache is None:
+        perangkat.cache = CacheKlasifikasi(perangkat.sms_cache_file, threshold_gb=perangkat.threshold_gb)
+    return perangkat.cache
+
+
+class StatusSnapshot:
+    """Status ringkas di STATUS_FILE untuk dashboard LuCI
+
+    Ditulis atomik (tmp + rename) di akhir setiap fase: cek ADB,
+    klasifikasi SMS, renewal, akhir tick. Controller cukup membaca satu
+    file ini tanpa grep log / adb devices. Counter dibawa antar run cron
+    (dibaca dari file lama) dan dihitung per jam untuk angka 24 jam.
+    """
+    
+    def __init__(self, path=None, perangkat=None):
+        self.path = path or STATUS_FILE
+        self.data = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            pass
+        self.data.setdefault('counters', {'checks': 0, 'renewals': 0, 'renewals_ok': 0})
+        self.data.setdefault('per_jam', {})
+        self.data.update(pid=os.getpid(), mode=MONITORING_MODE)
+        if perangkat:
+            self.data['perangkat'] = perangkat
+    
+    def perbarui(self, **kolom):
+        """Update kolom lalu tulis file"""
+        self.data.update(kolom)
+        self.tulis()
+    
+    def hitung(self, nama, jumlah=1):
+        """Tambah counter total + bucket jam ini (tanpa menulis file)"""
+        counters = self.data['counters']
+        counters[nama] = counters.get(nama, 0) + jumlah
+        jam = str(int(time.time() // 3600))
+        bucket = self.data['per_jam'].setdefault(jam, {})
+        bucket[nama] = bucket.get(nama, 0) + jumlah
+    
+    def _ringkas_24jam(self):
+        batas = int(time.time() // 3600) - 23
+        per_jam = {j: b for j, b in self.data['per_jam'].items() if int(j) >= batas}
+        self.data['per_jam'] = per_jam
+        total = {}
+        for bucket in per_jam.values():
+            for nama, jumlah in bucket.items():
+                total[nama] = total.get(nama, 0) + jumlah
+        return total
+    
+    def tulis(self):
+        total = self._ringkas_24jam()
+        counters = self.data['counters']
+        counters['checks_24h'] = total.get('checks', 0)
+        counters['renewals_24h'] = total.get('renewals', 0)
+        counters['success_rate'] = (
+            round(100 * total.get('renewals_ok', 0) / total['renewals'])
+            if total.get('renewals') else 100
+        )
+        self.data['diperbarui'] = int(time.time())
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+def status_snapshot():
+    """StatusSnapshot device aktif (dimuat sekali per proses)"""
+    perangkat = perangkat_aktif()
+    if perangkat.snapshot is None:
+        perangkat.snapshot = StatusSnapshot(perangkat.status_file, perangkat.nama if perangkat.label else None)
+    return perangkat.snapshot
+
+
+def muat_sqlite3():
+    """Import sqlite3 saat pertama dibutuhkan; False jika tidak terpasang"""
+    global sqlite3
+    if sqlite3 is None:
+        try:
+            import sqlite3 as modul
+        except ImportError:  # opkg install python3-sqlite3
+            modul = False
+        sqlite3 = modul
+    return sqlite3
+
+
+class RiwayatDB:
+    """Penyimpanan riwayat di SQLite (WAL): runs, renewals, sms_seen, timings
+
+    Semua tabel punya kolom waktu ber-index, jadi query rentang waktu dan
+    "N terakhir" (ORDER BY id DESC LIMIT N) tidak perlu scan seluruh tabel.
+    Tulis masuk ke transaksi yang terbuka dan baru di-commit setelah
+    DB_COMMIT_INTERVAL detik, saat renewal, atau saat ditutup.
+    
+    Dengan arsip (DB_FILE di flash), path adalah salinan kerja di tmpfs:
+    dipulihkan dari arsip jika belum ada (setelah reboot) dan disalin balik
+    ke arsip oleh sinkron() hanya jika ada tulisan penting (renewal, SMS,
+    retensi). Baris runs/timings saja tidak pernah memicu tulis flash.
+    
+    Satu koneksi dipakai bersama thread device (multi device), jadi semua
+    akses lewat self._lock. Kolom perangkat = nama device aktif.
+    """
+    
+    SKEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY, waktu REAL NOT NULL, durasi REAL,
+        mode TEXT, status TEXT
+    );
+    CREATE INDEX IF NOT EXISTS runs_waktu ON runs(waktu);
+    CREATE TABLE IF NOT EXISTS renewals (
+        id INTEGER PRIMARY KEY, waktu REAL NOT NULL, status TEXT,
+        pemicu TEXT, unreg_ok INTEGER, beli_ok INTEGER,
+        durasi_unreg REAL, durasi_beli REAL, latency REAL, sms_id INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS renewals_waktu ON renewals(waktu);
+    CREATE TABLE IF NOT EXISTS sms_seen (
+        kunci TEXT PRIMARY KEY, sms_id INTEGER, waktu REAL NOT NULL,
+        pengirim TEXT, label TEXT, kuota_gb REAL, aksi TEXT, dilihat REAL
+    );
+    CREATE INDEX IF NOT EXISTS sms_seen_waktu ON sms_seen(waktu);
+    CREATE TABLE IF NOT EXISTS timings (
+        id INTEGER PRIMARY KEY, waktu REAL NOT NULL, nama TEXT, durasi REAL
+    );
+    CREATE INDEX IF NOT EXISTS timings_waktu ON timings(waktu);
+    """
+    
+    TABEL = ('runs', 'renewals', 'sms_seen', 'timings')
+    # Tabel yang diberi kolom perangkat (ditambahkan ke DB lama saat dibuka)
+    TABEL_PERANGKAT = ('runs', 'renewals', 'sms_seen')
+    
+    def __init__(self, path, logger, commit_interval=None, baca_saja=False, arsip=None):
+        self.path = path
+        self.arsip = arsip if arsip != path else None
+        self.logger = logger
+        self.commit_interval = DB_COMMIT_INTERVAL if commit_interval is None else commit_interval
+        self._pending = 0
+        self._penting = False
+        self._commit_terakhir = time.monotonic()
+        self._lock = threading.RLock()
+        if baca_saja:
+            # Pembaca (--status) tidak ikut mengunci penulis yang sedang batch
+            self.conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True, timeout=5)
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if self.arsip and not os.path.exists(path) and os.path.exists(self.arsip):
+            import shutil
+            shutil.copyfile(self.arsip, path)
+        self.conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(self.SKEMA)
+        self._migrasi()
+    
+    def _migrasi(self):
+        """Tambah kolom perangkat ke DB dari versi sebelum multi device"""
+        for tabel in self.TABEL_PERANGKAT:
+            kolom = [row[1] for row in self.conn.execute(f'PRAGMA table_info({tabel})')]
+            if 'perangkat' not in kolom:
+                self.conn.execute(f'ALTER TABLE {tabel} ADD COLUMN perangkat TEXT')
+        self.conn.commit()
+    
+    def _tulis(self, sql, args, penting=False):
+        # Riwayat hanya pelengkap: error DB tidak boleh menggagalkan renewal
+        with self._lock:
+            try:
+                cur = self.conn.execute(sql, args)
+            except sqlite3.Error as e:
+                self.logger.warning(f"Gagal tulis riwayat DB: {e}")
+                return
+            if cur.rowcount:
+                # UPDATE/DELETE tanpa baris kena tidak perlu di-commit
+                self._pending += 1
+                self._penting = self._penting or penting
+    
+    def _query(self, sql, args=()):
+        with self._lock:
+            cur = self.conn.execute(sql, args)
+            kolom = [c[0] for c in cur.description]
+            return kolom, cur.fetchall()
+    
+    def catat_run(self, waktu, durasi, mode, status):
+        self._tulis(
+            'INSERT INTO runs (waktu, durasi, mode, status, perangkat) VALUES (?, ?, ?, ?, ?)',
+            (waktu, round(durasi, 3), mode, status, perangkat_aktif().nama)
+        )
+    
+    def catat_renewal(self, waktu, status, pemicu, unreg_ok, beli_ok,
+                      durasi_unreg, durasi_beli, latency=None, sms_id=None):
+        self._tulis(
+            'INSERT INTO renewals (waktu, status, pemicu, unreg_ok, beli_ok, '
+            'durasi_unreg, durasi_beli, latency, sms_id, perangkat) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (waktu, status, pemicu, int(unreg_ok), int(beli_ok),
+             round(durasi_unreg, 2), round(durasi_beli, 2), latency, sms_id,
+             perangkat_aktif().nama),
+            penting=True
+        )
+        # Renewal jarang & penting: jangan tunggu batch, langsung ke flash
+        self.commit(paksa=True)
+        self.sinkron(paksa=True)
+    
+    def konfirmasi_renewal(self, waktu, latency, sms_id):
+        """Renewal yang terkonfirmasi belakangan (SMS datang setelah timeout)"""
+        self._tulis(
+            "UPDATE renewals SET status = 'confirmed', latency = ?, sms_id = ? "
+            "WHERE waktu >= ? AND waktu < ? + 1 AND (perangkat = ? OR perangkat IS NULL)",
+            (latency, sms_id, int(waktu), int(waktu), perangkat_aktif().nama),
+            penting=True
+        )
+    
+    def catat_sms(self, sms, label, kuota_gb, aksi):
+        perangkat = perangkat_aktif()
+        kunci = CacheKlasifikasi.kunci(sms)
+        if not perangkat.utama:
+            # _id & date hanya unik per device
+            kunci = f"{perangkat.nama}/{kunci}"
+        self._tulis(
+            'INSERT OR REPLACE INTO sms_seen '
+            '(kunci, sms_id, waktu, pengirim, label, kuota_gb, aksi, dilihat, perangkat) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (kunci, sms.id, sms.timestamp, sms.pengirim,
+             label, kuota_gb, aksi, time.time(), perangkat.nama),
+            penting=True
+        )
+    
+    def catat_timing(self, nama, durasi, waktu=None):
+        self._tulis(
+            'INSERT INTO timings (waktu, nama, durasi) VALUES (?, ?, ?)',
+            (time.time() if waktu is None else waktu, nama, round(durasi, 3))
+        )
+    
+    def commit(self, paksa=False):
+        """Commit jika ada tulisan tertunda dan batch sudah cukup lama"""
+        if not self._pending:
+            return
+        if not paksa and time.monotonic() - self._commit_terakhir < self.commit_interval:
+            return
+        with self._lock:
+            try:
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Gagal commit riwayat DB: {e}")
+                return
+            self._pending = 0
+            self._commit_terakhir = time.monotonic()
+            if self._penting and self.arsip:
+                # Penanda di tmpfs: proses cron berikutnya tahu arsip tertinggal
+                try:
+                    open(f"{self.path}.kotor", 'a').close()
+                except OSError:
+                    pass
+            self._penting = False
+        self.sinkron()
+    
+    def sinkron(self, paksa=False):
+        """Salin DB kerja ke arsip flash jika ada tulisan penting yang belum disalin
+
+        Paling sering sekali per commit_interval (umur arsip), kecuali paksa.
+        Salinan dibuat lewat backup API ke file sementara lalu rename.
+        """
+        if not self.arsip:
+            return
+        penanda = f"{self.path}.kotor"
+        if not os.path.exists(penanda):
+            return
+        try:
+            umur = time.time() - os.stat(self.arsip).st_mtime
+        except OSError:
+            umur = None
+        if not paksa and umur is not None and umur < self.commit_interval:
+            return
+        tmp_path = f"{self.arsip}.tmp"
+        with self._lock:
+            try:
+                Path(self.arsip).parent.mkdir(parents=True, exist_ok=True)
+                tujuan = sqlite3.connect(tmp_path)
+                try:
+                    self.conn.backup(tujuan)
+                finally:
+                    tujuan.close()
+                os.replace(tmp_path, self.arsip)
+                os.unlink(penanda)
+            except (sqlite3.Error, OSError) as e:
+                self.logger.warning(f"Gagal salin riwayat DB ke {self.arsip}: {e}")
+    
+    def bersihkan(self, hari=None):
+        """Hapus baris lebih tua dari retensi (renewal tetap disimpan)"""
+        batas = time.time() - (DB_RETENSI_HARI if hari is None else hari) * 86400
+        for tabel in ('runs', 'sms_seen', 'timings'):
+            self._tulis(f'DELETE FROM {tabel} WHERE waktu < ?', (batas,), penting=True)
+    
+    def terakhir(self, tabel, n=10, **filter_kolom):
+        """N baris terbaru sebagai list dict (terbaru dulu)"""
+        urut = 'waktu' if tabel == 'sms_seen' else 'id'
+        where = ' AND '.join(f'{k} = ?' for k in filter_kolom)
+        kolom, rows = self._query(
+            f'SELECT * FROM {tabel}' + (f' WHERE {where}' if where else '')
+            + f' ORDER BY {urut} DESC LIMIT ?',
+            (*filter_kolom.values(), n)
+        )
+        return [dict(zip(kolom, row)) for row in rows]
+    
+    def rentang(self, tabel, mulai, akhir=None):
+        """Baris dengan mulai <= waktu < akhir (urut waktu)"""
+        akhir = time.time() + 1 if akhir is None else akhir
+        kolom, rows = self._query(
+            f'SELECT * FROM {tabel} WHERE waktu >= ? AND waktu < ? ORDER BY waktu',
+            (mulai, akhir)
+        )
+        return [dict(zip(kolom, row)) for row in rows]
+    
+    def jumlah(self, tabel, **filter_kolom):
+        where = ' AND '.join(f'{k} = ?' for k in filter_kolom)
+        sql = f'SELECT COUNT(*) FROM {tabel}' + (f' WHERE {where}' if where else '')
+        return self._query(sql, tuple(filter_kolom.values()))[1][0][0]
+    
+    def renewal_sukses_terakhir(self, perangkat=None):
+        """Waktu renewal terakhir yang beli paketnya berhasil (0 jika belum ada)
+
+        Per device aktif; baris lama tanpa kolom perangkat milik device utama.
+        """
+        perangkat = perangkat or perangkat_aktif()
+        _, rows = self._query(
+            'SELECT waktu FROM renewals WHERE beli_ok = 1 '
+            'AND (perangkat = ? OR (perangkat IS NULL AND ?)) ORDER BY id DESC LIMIT 1',
+            (perangkat.nama, int(perangkat.utama))
+        )
+        return int(rows[0][0]) if rows else 0
+    
+    def tutup(self):
+        self.commit(paksa=True)
+        # Sisa tulisan penting yang belum waktunya disalin: dicek lagi run berikutnya
+        self.sinkron()
+        with self._lock:
+            self.conn.close()
+
+
+_riwayat_db = False
+_riwayat_db_lock = threading.Lock()
+
+
+def riwayat_db(logger=None):
+    """RiwayatDB bersama, atau None jika dimatikan / sqlite3 tidak tersedia"""
+    global _riwayat_db
+    with _riwayat_db_lock:
+        if _riwayat_db is False:
+            _riwayat_db = None
+            if DB_FILE and muat_sqlite3():
+                try:
+                    _riwayat_db = RiwayatDB(DB_KERJA, logger or Logger(None), arsip=DB_FILE)
+                except (sqlite3.Error, OSError) as e:
+                    if logger:
+                        logger.warning(f"Riwayat DB tidak bisa dibuka ({DB_KERJA}): {e}")
+                    _riwayat_db = None
+        return _riwayat_db
+
+
+def retensi_riwayat(db, logger):
+    """Jalankan retensi riwayat DB maksimal sekali per DB_RETENSI_INTERVAL
+
+    Waktu retensi terakhir disimpan di state device aktif, jadi mode cron
+    tidak menjalankan DELETE (dan commit ke flash) setiap menit.
+    """
+    state = muat_state()
+    sekarang = time.time()
+    if sekarang - state.get('db_bersih', 0) < DB_RETENSI_INTERVAL:
+        return
+    db.bersihkan()
+    state['db_bersih'] = int(sekarang)
+    try:
+        simpan_state(state)
+    except OSError as e:
+        logger.warning(f"Gagal simpan state retensi DB: {e}")
+
+
+def tutup_riwayat_db():
+    global _riwayat_db
+    if _riwayat_db:
+        _riwayat_db.tutup()
+    _riwayat_db = False
+
+
+# ============================================================================
+# METRIK (OPENMETRICS)
+# ============================================================================
+
+# Batas bucket histogram (detik)
+BUCKET_ADB = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKET_USSD = (0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30)
+BUCKET_TELEGRAM = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKET_TICK = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# nama: (tipe, help, bucket). Urutan = urutan di output
+DEFINISI_METRIK = {
+    'autoedu_checks': ('counter', 'Pengecekan per hasil (ok, warning, adb_error, adb_skip, error)', None),
+    'autoedu_renewals': ('counter', 'Renewal per hasil (confirmed, unconfirmed, gagal)', None),
+    'autoedu_sms_classified': ('counter', 'SMS baru yang diklasifikasi per jenis', None),
+    'autoedu_adb_command_seconds': ('histogram', 'Latency perintah adb per subcommand', BUCKET_ADB),
+    'autoedu_ussd_roundtrip_seconds': ('histogram', 'USSD dikirim sampai dialog respon tampil', BUCKET_USSD),
+    'autoedu_telegram_request_seconds': ('histogram', 'Latency request Bot API per method', BUCKET_TELEGRAM),
+    'autoedu_telegram_retries': ('counter', 'Pengiriman Telegram yang diulang (gagal/timeout/429)', None),
+    'autoedu_tick_seconds': ('histogram', 'Durasi satu tick pengecekan', BUCKET_TICK),
+    'autoedu_last_tick_timestamp_seconds': ('gauge', 'Waktu akhir tick terakhir (unix)', None),
+}
+
+
+class RegistriMetrik:
+    """Counter, gauge dan histogram OpenMetrics dengan label perangkat
+    
+    Pencatatan hanya update dict di memori (di bawah lock, aman untuk
+    thread device & outbox). simpan() di akhir tick menggabungkan delta ke
+    total di <path>.json (flock, jadi run cron yang tumpang tindih tidak
+    saling menimpa) lalu menulis textfile OpenMetrics secara atomik.
+    Histogram disimpan sebagai [jumlah per bucket..., +Inf, sum].
+    """
+    
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._total = {}
+        self._delta = {}
+        # (mtime, size, inode) <path>.json setelah ditulis proses ini:
+        # selama sama, total di memori dipakai tanpa parse ulang
+        self._versi = None
+    
+    @staticmethod
+    def _kunci(nama, perangkat, label):
+        label['perangkat'] = perangkat or perangkat_aktif().nama
+        return nama, tuple(sorted(label.items()))
+    
+    def tambah(self, nama, jumlah=1, perangkat=None, **label):
+        kunci = self._kunci(nama, perangkat, label)
+        with self._lock:
+            self._delta[kunci] = self._delta.get(kunci, 0) + jumlah
+    
+    def set(self, nama, nilai, perangkat=None, **label):
+        kunci = self._kunci(nama, perangkat, label)
+        with self._lock:
+            self._delta[kunci] = nilai
+    
+    def amati(self, nama, detik, perangkat=None, **label):
+        """Catat satu observasi histogram"""
+        bucket = DEFINISI_METRIK[nama][2]
+        kunci = self._kunci(nama, perangkat, label)
+        i = 0
+        while i < len(bucket) and detik > bucket[i]:
+            i += 1
+        with self._lock:
+            nilai = self._delta.get(kunci)
+            if nilai is None:
+                nilai = self._delta[kunci] = [0] * (len(bucket) + 2)
+            nilai[i] += 1
+            nilai[-1] += detik
+    
+    @staticmethod
+    def _gabung(tujuan, sumber):
+        """Tambahkan sumber ke tujuan (gauge: nilai sumber menimpa)"""
+        for kunci, nilai in sumber.items():
+            lama = tujuan.get(kunci)
+            tipe = DEFINISI_METRIK[kunci[0]][0]
+            if tipe == 'histogram':
+                # Bucket berubah (versi script lain): mulai dari nol
+                if lama is None or len(lama) != len(nilai):
+                    lama = [0] * len(nilai)
+                tujuan[kunci] = [a + b for a, b in zip(lama, nilai)]
+            elif lama is None or tipe == 'gauge':
+                tujuan[kunci] = nilai
+            else:
+                tujuan[kunci] = lama + nilai
+        return tujuan
+    
+    def simpan(self, logger=None):
+        """Gabung delta ke total (file .json jika ada path) lalu tulis textfile"""
+        with self._lock:
+            delta, self._delta = self._delta, {}
+        if not delta:
+            return
+        if not self.path:
+            with self._lock:
+                self._gabung(self._total, delta)
+            return
+        
+        import fcntl
+        try:
+            fd = os.open(f"{self.path}.json", os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(fd, 'r+', encoding='utf-8') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                st = os.fstat(f.fileno())
+                if (st.st_mtime_ns, st.st_size, st.st_ino) == self._versi:
+                    total = dict(self._total)
+                else:
+                    try:
+                        total = {
+                            (nama, tuple(sorted(label.items()))): nilai
+                            for nama, label, nilai in json.load(f)
+                            if nama in DEFINISI_METRIK
+                        }
+                    except (ValueError, TypeError):
+                        total = {}
+                self._gabung(total, delta)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps([[nama, dict(label), nilai] for (nama, label), nilai in total.items()]))
+                f.flush()
+                st = os.fstat(f.fileno())
+                with self._lock:
+                    self._total = total
+                    self._versi = (st.st_mtime_ns, st.st_size, st.st_ino)
+                
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as prom:
+                    prom.write(self.teks(total))
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            # Delta dikembalikan, dicoba lagi pada simpan() berikutnya
+            with self._lock:
+                self._delta = self._gabung(delta, self._delta)
+            if logger:
+                logger.warning(f"Gagal simpan metrik ({self.path}): {e}")
+    
+    def teks(self, data=None):
+        """Exposition OpenMetrics (default: total terakhir + delta yang belum disimpan)"""
+        if data is None:
+            with self._lock:
+                data = self._gabung(self._gabung({}, self._total), self._delta)
+        
+        per_nama = {}
+        for (nama, label), nilai in data.items():
+            # Escape nilai label: backslash, kutip ganda, newline
+            isi = ','.join(
+                '%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                for k, v in label
+            )
+            per_nama.setdefault(nama, []).append((isi, nilai))
+        
+        baris = []
+        for nama, (tipe, bantuan, bucket) in DEFINISI_METRIK.items():
+            sampel = per_nama.get(nama)
+            if not sampel:
+                continue
+            sampel.sort()
+            baris.append(f"# TYPE {nama} {tipe}")
+            baris.append(f"# HELP {nama} {bantuan}")
+            if tipe != 'histogram':
+                akhiran = '_total' if tipe == 'counter' else ''
+                baris.extend(f"{nama}{akhiran}{{{isi}}} {nilai}" for isi, nilai in sampel)
+                continue
+            batas = [repr(float(le)) for le in bucket] + ['+Inf']
+            for isi, nilai in sampel:
+                awal = f"{nama}_bucket{{{isi},le=" if isi else f"{nama}_bucket{{le="
+                kumulatif = 0
+                for le, jumlah in zip(batas, nilai):
+                    kumulatif += jumlah
+                    baris.append(f'{awal}"{le}"}} {kumulatif}')
+                baris.append(f"{nama}_sum{{{isi}}} {round(nilai[-1], 6)}")
+                baris.append(f"{nama}_count{{{isi}}} {kumulatif}")
+        baris.append('# EOF')
+        return '\n'.join(baris) + '\n'
+
+
+_metrik = None
+_metrik_lock = threading.Lock()
+
+
+def metrik():
+    """RegistriMetrik bersama (satu per proses, label perangkat per sampel)"""
+    global _metrik
+    if _metrik is None:
+        with _metrik_lock:
+            if _metrik is None:
+                _metrik = RegistriMetrik(METRIK_FILE)
+    return _metrik
+
+
+def mulai_server_metrik(logger, port=None, alamat=None):
+    """Endpoint HTTP /metrics di background thread (mode daemon)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = metrik().teks().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/openmetrics-text; version=1.0.0; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    port = METRIK_PORT if port is None else port
+    alamat = alamat or METRIK_ALAMAT
+    try:
+        server = ThreadingHTTPServer((alamat, port), Handler)
+    except OSError as e:
+        logger.warning(f"Endpoint metrik {alamat}:{port} tidak bisa dibuka: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrik-http', daemon=True).start()
+    logger.info(f"Endpoint metrik: http://{alamat}:{server.server_address[1]}/metrics")
+    return server
+
+
+def tunggu_konfirmasi_aktivasi(adb, logger, since_id, since_date=0, timeout=None):
+    """Poll SMS baru setelah beli paket sampai konfirmasi aktivasi masuk
+
+    Setiap putaran hanya probe _id (murah); SMS dibaca jika ada yang baru.
+    Jeda poll naik bertahap 1, 2, 4 ... maksimal 15 detik sampai batas waktu.
+    Return (SMS konfirmasi atau None, detik menunggu, _id tertinggi).
+    """
+    timeout = KONFIRMASI_TIMEOUT if timeout is None else timeout
+    mulai = time.monotonic()
+    deadline = mulai + timeout
+    jeda = 1
+    id_max = since_id
+    
+    logger.info(f"Menunggu SMS konfirmasi aktivasi (maks {timeout} detik)...")
+    while True:
+        # Setelah ada _id acuan, cukup pakai _id supaya SMS yang sama tidak
+        # terbaca berulang lewat kondisi date
+        tanggal = 0 if id_max else since_date
+        id_baru = adb.cek_sms_baru(id_max, tanggal)
+        if id_baru:
+            sms_list, _ = adb.baca_sms(
+                limit=perangkat_aktif().jumlah_sms_cek, since_id=id_max, since_date=tanggal
+            )
+            id_max = max(id_max, id_baru)
+            for sms in sms_list:
+                if is_sms_konfirmasi(sms.isi):
+                    latency = time.monotonic() - mulai
+                    logger.success(f"Konfirmasi aktivasi diterima ({latency:.1f}s)", event='konfirmasi')
+                    return sms, latency, id_max
+        
+        sisa = deadline - time.monotonic()
+        if sisa <= 0:
+            logger.warning(f"Konfirmasi aktivasi belum diterima setelah {timeout} detik", event='konfirmasi')
+            return None, time.monotonic() - mulai, id_max
+        time.sleep(min(jeda, sisa))
+        jeda = min(jeda * 2, 15)
+
+
+def proses_renewal(adb, telegram, logger, pemicu='sms'):
+    """Proses unreg dan beli paket baru
+
+    pemicu: 'sms' (SMS kuota rendah) atau 'prediksi' (renewal prediktif),
+    dicatat ke riwayat DB.
+    """
     logger.info("=" * 50)
-    logger.success("PROSES RENEWAL SELESAI")
+    logger.info("MEMULAI PROSES RENEWAL", event='renewal_mulai')
+    logger.info("=" * 50)
+    
+    hasil = []
+    
+    telegram.kirim_pesan_format(
+        "🔄", "Memulai Proses Renewal",
+        "Sedang melakukan unregister paket lama...",
+        live=True
+    )
+    
+    db = riwayat_db(logger)
+    perangkat = perangkat_aktif()
+    
+    status_snapshot().perbarui(fase='renewal', fase_waktu=int(time.time()))
+    
+    mulai = time.monotonic()
+    success_unreg, msg_unreg = adb.kirim_ussd(perangkat.kode_unreg)
+    durasi_unreg = time.monotonic() - mulai
+    hasil.append(msg_unreg)
+    if db and adb.last_ussd_latency is not None:
+        db.catat_timing('ussd_respon', adb.last_ussd_latency)
+    
+    if not success_unreg:
+        telegram.kirim_pesan_format(
+            "⚠️", "Peringatan",
+            f"Unreg gagal, tapi akan lanjut beli paket baru.\n\n{msg_unreg}",
+            live=True
+        )
+    
+    if adb.last_ussd_response is None:
+        # Dialog tidak terdeteksi: beri jeda sebelum USSD berikutnya
+        time.sleep(2)
+    
+    # Baseline watcher konfirmasi: SMS yang sudah ada sebelum beli
+    since_id = adb.sms_id_terakhir
+    since_date = int((time.time() - 60) * 1000) if not since_id else 0
+    waktu_beli = time.time()
+    
+    mulai = time.monotonic()
+    success_beli, msg_beli = adb.kirim_ussd(perangkat.kode_beli)
+    durasi_beli = time.monotonic() - mulai
+    hasil.append(msg_beli)
+    if db and adb.last_ussd_latency is not None:
+        db.catat_timing('ussd_respon', adb.last_ussd_latency)
+    
+    konfirmasi = None
+    latency = None
+    if success_beli:
+        konfirmasi, latency, id_max = tunggu_konfirmasi_aktivasi(
+            adb, logger, since_id, since_date
+        )
+        catat_renewal(logger, waktu_beli, konfirmasi, latency, id_max)
+        if konfirmasi:
+            hasil.append(f"✅ Aktivasi terkonfirmasi ({latency:.0f}s)")
+        else:
+            hasil.append(f"⚠️ Konfirmasi aktivasi belum diterima ({latency:.0f}s)")
+    
+    snapshot = status_snapshot()
+    snapshot.hitung('renewals')
+    if success_beli:
+        snapshot.hitung('renewals_ok')
+        status_renewal = 'confirmed' if konfirmasi else 'unconfirmed'
+    else:
+        status_renewal = 'gagal'
+    metrik().tambah('autoedu_renewals', hasil=status_renewal)
+    if success_beli:
+        snapshot.data['last_renewal'] = {
+            'waktu': int(waktu_beli), 'status': status_renewal, 'pemicu': pemicu,
+            'latency': round(latency, 1) if konfirmasi else None,
+        }
+    snapshot.perbarui(fase='cek_kuota', fase_waktu=int(time.time()))
+    
+    if db:
+        if konfirmasi:
+            db.catat_timing('konfirmasi', latency)
+        db.catat_renewal(
+            waktu_beli, status_renewal, pemicu, success_unreg, success_beli,
+            durasi_unreg, durasi_beli,
+            latency=round(latency, 1) if konfirmasi else None,
+            sms_id=konfirmasi.id if konfirmasi else None,
+        )
+    
+    sms_list = [konfirmasi] if konfirmasi else adb.baca_sms(limit=2)[0]
+    
+    status = "✅ Berhasil" if (success_unreg or success_beli) else "❌ Gagal"
+    
+    konten = "\n".join(hasil)
+    konten += f"\n⏱ Unreg {durasi_unreg:.1f}s · Beli {durasi_beli:.1f}s"
+    if sms_list:
+        konten += f"\n\n<b>📱 SMS Terbaru:</b>\n\n{format_sms_untuk_telegram(sms_list, 2)}"
+    
+    telegram.kirim_pesan_format(
+        "🎉" if success_beli else "❌",
+        f"Renewal {status}",
+        konten,
+        live=success_beli
+    )
+    
+    logger.info("=" * 50)
+    logger.success("PROSES RENEWAL SELESAI", event='renewal_selesai')
     logger.info("=" * 50)
     
     return success_beli
 
 
+def catat_renewal(logger, waktu_beli, konfirmasi, latency, id_max):
+    """Simpan hasil renewal (confirmed/unconfirmed) ke state
+
+    Jika terkonfirmasi, high-water mark digeser melewati SMS konfirmasi
+    sehingga pengecekan berikutnya tidak perlu scan inbox lagi.
+    """
+    state = muat_state()
+    state['renewal'] = {
+        'waktu': int(waktu_beli),
+        'status': 'confirmed' if konfirmasi else 'unconfirmed',
+        'latency': round(latency, 1) if konfirmasi else None,
+        'sms_id': konfirmasi.id if konfirmasi else None,
+    }
+    if konfirmasi:
+        state['sms_last_id'] = max(int(state.get('sms_last_id', 0)), id_max)
+        state['sms_last_date'] = max(int(state.get('sms_last_date', 0)), konfirmasi.date_ms)
+        if perangkat_aktif().belajar_pengirim:
+            belajar_pengirim(state, [konfirmasi], cache_sms().klasifikasi, logger)
+    # Titik awal model prediksi: paket baru penuh
+    reset_prediksi(state, waktu_beli, perangkat_aktif().kuota_paket_gb)
+    state.pop('prediksi_gagal', None)
+    try:
+        simpan_state(state)
+    except OSError as e:
+        logger.warning(f"Gagal simpan state renewal: {e}")
+
+
 def cek_kuota_dan_proses(adb, telegram, logger):
-    """Fungsi utama untuk cek kuota dan proses renewal jika perlu"""
+    """Fungsi utama untuk cek kuota dan proses renewal jika perlu
+
+    Return None jika device ADB hilang di tengah pengecekan.
+    """
+    
+    # High-water mark: hanya SMS yang lebih baru dari yang sudah diproses
+    state = muat_state()
+    if MONITORING_MODE == 'AUTO':
+        terapkan_profil_auto(state, logger)
+    adb.pengirim = perangkat_aktif().allowlist_sms(state)
+    since_id = int(state.get('sms_last_id', 0))
+    since_date = int(state.get('sms_last_date', 0))
+    if not since_id and not since_date:
+        # Run pertama: cukup ambil SMS di dalam jendela usia maksimal
+        since_date = int((time.time() - perangkat_aktif().sms_max_age * 60) * 1000)
+    
+    # Renewal prediktif: jangan tunggu SMS "kurang dari", yang bisa datang
+    # setelah kuota keburu habis
+    if PREDIKSI_RENEWAL and perlu_renewal_prediktif(state):
+        habis, sisa = prediksi_habis(state)
+        logger.warning(
+            f"⏳ Prediksi kuota habis {format_waktu('%H:%M:%S', habis)} "
+            f"(sisa ±{sisa:.1f}GB) - renewal lebih awal",
+            event='renewal_prediktif'
+        )
+        telegram.kirim_pesan_format(
+            "⏳", "Renewal Prediktif",
+            f"Kuota diperkirakan habis dalam {max(0, int(habis - time.time()))} detik.\n"
+            f"{format_prediksi(state)}\n\n"
+            f"Memulai proses renewal otomatis...",
+            live=True
+        )
+        if proses_renewal(adb, telegram, logger, pemicu='prediksi'):
+            return True
+        # Gagal beli: state['renewal'] tidak berubah, jadi tanpa backoff
+        # renewal prediktif akan dicoba lagi di setiap tick
+        state = muat_state()
+        gagal = state.get('prediksi_gagal') or {}
+        state['prediksi_gagal'] = {'waktu': int(time.time()), 'n': gagal.get('n', 0) + 1}
+        logger.warning(
+            f"Renewal prediktif gagal - dicoba lagi dalam {backoff_prediksi(state)} detik",
+            event='renewal_prediktif'
+        )
+        try:
+            simpan_state(state)
+        except OSError as e:
+            logger.warning(f"Gagal simpan state prediksi: {e}")
+        return False
+    
+    id_terbaru = adb.cek_sms_baru(since_id, since_date)
+    if id_terbaru == 0:
+        logger.info(f"Tidak ada SMS baru (sejak _id {since_id}) - skip", event='sms_kosong')
+        return True
     
-    keyword = f"kurang dari {THRESHOLD_KUOTA_GB}GB"
-    sms_list, kuota_rendah = adb.baca_sms(limit=JUMLAH_SMS_CEK, keyword=keyword)
+    if id_terbaru is None:
+        sms_list = []
+    else:
+        sms_list, _ = adb.baca_sms(
+            limit=perangkat_aktif().jumlah_sms_cek, since_id=since_id, since_date=since_date
+        )
     
     if not sms_list:
-        logger.warning("Tidak ada SMS ditemukan")
+        if id_terbaru is None and not adb.cek_koneksi():
+            # Device hilang setelah cek koneksi (atau dari cache kesehatan):
+            # serahkan ke circuit breaker, tanpa notifikasi terpisah
+            return None
+        logger.warning("Tidak ada SMS ditemukan", event='sms_kosong')
         telegram.kirim_pesan_format(
             "⚠️", "Peringatan",
             "Tidak dapat membaca SMS. Pastikan device terhubung dengan baik."
         )
         return False
     
-    logger.info(f"SMS terbaru dari: {sms_list[0]['pengirim']}")
-    logger.info(f"Isi: {sms_list[0]['isi'][:100]}...")
+    logger.info(f"SMS terbaru dari: {sms_list[0].pengirim}", event='sms_baru')
+    logger.info(f"Isi: {sms_list[0].isi[:100]}...")
     
-    # Load timestamp renewal terakhir
-    last_renewal_time = 0
-    renewal_timestamp_file = '/tmp/auto_edu_last_renewal'
-    
-    if Path(renewal_timestamp_file).exists():
+    # Sisa kuota dari SMS baru -> update model laju (urut dari yang terlama)
+    cache = cache_sms()
+    diamati = False
+    for sms in reversed(sms_list):
+        kuota_gb = cache.klasifikasi(sms)[1]
+        if kuota_gb is not None and amati_kuota(state, sms.timestamp, kuota_gb):
+            diamati = True
+            # Riwayat SMS sisa kuota untuk profil mode AUTO
+            batas = time.time() - AUTO_JENDELA
+            state['kuota_sms'] = [t for t in state.get('kuota_sms', []) if t >= batas]
+            state['kuota_sms'].append(int(sms.timestamp))
+    if diamati:
         try:
-            with open(renewal_timestamp_file, 'r') as f:
-                last_renewal_time = int(f.read().strip())
-            last_renewal_str = datetime.fromtimestamp(last_renewal_time).strftime('%d/%m/%Y %H:%M:%S')
-            logger.info(f"Last renewal: {last_renewal_str}")
-        except Exception as e:
-            logger.warning(f"Cannot read last renewal timestamp: {e}")
+            simpan_state(state)
+        except OSError as e:
+            logger.warning(f"Gagal simpan state prediksi: {e}")
+    
+    # Konfirmasi yang terlambat datang untuk renewal sebelumnya
+    renewal = state.get('renewal') or {}
+    konfirmasi_susulan = False
+    if renewal.get('status') == 'unconfirmed':
+        for sms in sms_list:
+            # Toleransi 60 detik untuk selisih jam device vs router
+            if sms.timestamp >= renewal.get('waktu', 0) - 60 and is_sms_konfirmasi(sms.isi):
+                renewal.update(
+                    status='confirmed', sms_id=sms.id,
+                    latency=round(max(0, sms.timestamp - renewal.get('waktu', 0)), 1)
+                )
+                konfirmasi_susulan = True
+                logger.success(f"Renewal terakhir terkonfirmasi (SMS _id {sms.id})")
+                db = riwayat_db(logger)
+                if db:
+                    db.konfirmasi_renewal(renewal.get('waktu', 0), renewal['latency'], sms.id)
+                snapshot = status_snapshot()
+                if (snapshot.data.get('last_renewal') or {}).get('waktu') == renewal.get('waktu'):
+                    snapshot.data['last_renewal'].update(status='confirmed', latency=renewal['latency'])
+                break
+    
+    # Timestamp renewal terakhir: riwayat DB, fallback state file
+    db = riwayat_db(logger)
+    last_renewal_time = db.renewal_sukses_terakhir() if db else 0
+    if not last_renewal_time:
+        last_renewal_time = int((state.get('renewal') or {}).get('waktu', 0))
+    
+    if last_renewal_time:
+        last_renewal_str = format_waktu('%d/%m/%Y %H:%M:%S', last_renewal_time)
+        logger.info(f"Last renewal: {last_renewal_str}")
     else:
         logger.info("No previous renewal timestamp found (first run?)")
     
@@ -471,195 +3255,385 @@ def cek_kuota_dan_proses(adb, telegram, logger):
     
     if USE_IMPROVED_LOGIC:
         # AGGRESSIVE Mode: Priority kuota check first
-        logger.info(f"Mode: AGGRESSIVE - Priority kuota check")
-        return cek_kuota_aggressive_mode(sms_list, keyword, last_renewal_time, adb, telegram, logger)
+        logger.info(f"Mode: {MONITORING_MODE} - Priority kuota check")
+        success = cek_kuota_aggressive_mode(sms_list, last_renewal_time, adb, telegram, logger)
     else:
         # EFFICIENT Mode: Standard check
         logger.info(f"Mode: EFFICIENT - Standard check")
-        return cek_kuota_efficient_mode(sms_list, keyword, last_renewal_time, adb, telegram, logger)
+        success = cek_kuota_efficient_mode(sms_list, last_renewal_time, adb, telegram, logger)
+    
+    cache.simpan(logger)
+    if db:
+        for sms in sms_list:
+            db.catat_sms(sms, *cache.klasifikasi(sms), cache.aksi(sms))
+    
+    label, kuota_gb = cache.klasifikasi(sms_list[0])
+    status_snapshot().perbarui(
+        fase='cek_kuota', fase_waktu=int(time.time()),
+        klasifikasi_terakhir={
+            'label': label, 'kuota_gb': kuota_gb, 'aksi': cache.aksi(sms_list[0]),
+            'sms_id': sms_list[0].id, 'pengirim': sms_list[0].pengirim,
+            'waktu_sms': int(sms_list[0].timestamp),
+        },
+    )
+    
+    # Geser high-water mark hanya jika berhasil, supaya renewal yang gagal
+    # dicoba lagi pada tick berikutnya
+    if success:
+        # Muat ulang: proses_renewal bisa sudah menggeser mark dan menulis hasil renewal
+        state = muat_state()
+        if konfirmasi_susulan and (state.get('renewal') or {}).get('waktu') == renewal.get('waktu'):
+            state['renewal'] = renewal
+        state['sms_last_id'] = max(
+            int(state.get('sms_last_id', 0)), id_terbaru, since_id, *(sms.id for sms in sms_list)
+        )
+        state['sms_last_date'] = max(
+            int(state.get('sms_last_date', 0)), since_date, *(sms.date_ms for sms in sms_list)
+        )
+        if perangkat_aktif().belajar_pengirim:
+            belajar_pengirim(state, sms_list, cache.klasifikasi, logger)
+        try:
+            simpan_state(state)
+        except OSError as e:
+            logger.warning(f"Gagal simpan state SMS: {e}")
+    
+    return success
+
+
+# Jendela hitung SMS sisa kuota untuk mode AUTO (detik)
+AUTO_JENDELA = 1800
+# Toleransi jadwal AUTO untuk cron (tick cron tidak tepat di detik yang sama)
+AUTO_TOLERANSI = 30
+
+
+def profil_auto(state, sekarang=None):
+    """Parameter tick mode AUTO: (interval detik, jumlah SMS, max age menit)
+
+    Interval diambil yang terkecil dari tiga sinyal:
+    - waktu sejak renewal terakhir / 4 (cepat tepat setelah renewal)
+    - AUTO_INTERVAL_MAX / (1 + SMS sisa kuota dalam 30 menit terakhir)
+    - perkiraan waktu sampai kuota habis / 10
+    lalu dibatasi AUTO_INTERVAL_MIN..AUTO_INTERVAL_MAX. Max age mengikuti
+    interval (3x, 5-15 menit) supaya SMS tidak terlewat di antara tick.
+    """
+    sekarang = time.time() if sekarang is None else sekarang
+    interval = AUTO_INTERVAL_MAX
+    
+    renewal = (state.get('renewal') or {}).get('waktu')
+    if renewal:
+        interval = min(interval, (sekarang - renewal) / 4)
+    
+    jumlah = sum(1 for t in state.get('kuota_sms', []) if sekarang - t <= AUTO_JENDELA)
+    if jumlah:
+        interval = min(interval, AUTO_INTERVAL_MAX / (1 + jumlah))
+    
+    hasil = prediksi_habis(state)
+    if hasil:
+        interval = min(interval, (hasil[0] - sekarang) / 10)
+    
+    interval = int(max(AUTO_INTERVAL_MIN, interval))
+    jumlah_sms = 5 if interval <= 90 else 3
+    max_age = max(5, min(15, -(-interval * 3 // 60)))
+    return interval, jumlah_sms, max_age
+
+
+def terapkan_profil_auto(state, logger):
+    """Set jumlah SMS & max age device aktif untuk tick ini (mode AUTO)"""
+    perangkat = perangkat_aktif()
+    interval, perangkat.jumlah_sms_cek, perangkat.sms_max_age = profil_auto(state)
+    logger.info(
+        f"Mode AUTO: interval {interval}s, {perangkat.jumlah_sms_cek} SMS, "
+        f"max age {perangkat.sms_max_age} menit"
+    )
+    return interval
 
 
-def cek_kuota_efficient_mode(sms_list, keyword, last_renewal_time, adb, telegram, logger):
+def jadwalkan_auto(logger):
+    """Simpan jadwal tick AUTO berikutnya ke state, return interval (detik)"""
+    state = muat_state()
+    interval = profil_auto(state)[0]
+    state['auto_berikutnya'] = int(time.time() + interval)
+    try:
+        simpan_state(state)
+    except OSError as e:
+        logger.warning(f"Gagal simpan jadwal AUTO: {e}")
+    return interval
+
+
+def auto_jatuh_tempo():
+    """True jika tick cron mode AUTO sudah waktunya jalan"""
+    berikutnya = muat_state().get('auto_berikutnya', 0)
+    return time.time() >= berikutnya - AUTO_TOLERANSI
+
+
+def backoff_prediksi(state):
+    """Detik tunggu setelah renewal prediktif gagal ke-n (0 = belum gagal)"""
+    n = (state.get('prediksi_gagal') or {}).get('n', 0)
+    if not n:
+        return 0
+    return min(PREDIKSI_BACKOFF_MIN * 2 ** (n - 1), PREDIKSI_BACKOFF_MAX)
+
+
+def perlu_renewal_prediktif(state, sekarang=None):
+    """True jika perkiraan habis kuota sudah masuk margin PREDIKSI_MARGIN
+
+    Hanya jika ada SMS sisa kuota yang lebih baru dari renewal terakhir
+    dan tidak sedang backoff setelah renewal prediktif yang gagal.
+    """
+    p = state.get('prediksi') or {}
+    hasil = prediksi_habis(state)
+    if hasil is None or p.get('n', 0) < PREDIKSI_MIN_SAMPEL:
+        return False
+    sekarang = time.time() if sekarang is None else sekarang
+    renewal_terakhir = (state.get('renewal') or {}).get('waktu', 0)
+    if sekarang - renewal_terakhir < PREDIKSI_JEDA_MIN:
+        return False
+    if p.get('t_sms', 0) <= renewal_terakhir:
+        return False
+    gagal = state.get('prediksi_gagal') or {}
+    if sekarang < gagal.get('waktu', 0) + backoff_prediksi(state):
+        return False
+    return sekarang >= hasil[0] - PREDIKSI_MARGIN
+
+
+def cek_kuota_efficient_mode(sms_list, last_renewal_time, adb, telegram, logger):
     """EFFICIENT Mode: Check konfirmasi aktivasi dulu, lalu kuota"""
     
-    # FIX #1: Cek apakah SMS terbaru adalah konfirmasi aktivasi
-    sms_terbaru = sms_list[0]['isi'].lower()
-    konfirmasi_keywords = [
-        'sdh aktif', 
-        'sudah aktif', 
-        'berhasil diaktifkan', 
-        'telah diaktifkan',
-        'anda sdh aktif',
-        'paket aktif'
-    ]
+    # Klasifikasi diambil dari cache: setiap SMS hanya dievaluasi sekali
+    cache = cache_sms()
+    label = [cache.klasifikasi(sms) for sms in sms_list]
     
-    if any(kw in sms_terbaru for kw in konfirmasi_keywords):
-        logger.success("✅ SMS terbaru adalah konfirmasi aktivasi paket - Skip renewal")
+    # FIX #1: Cek apakah SMS terbaru adalah konfirmasi aktivasi
+    if label[0][0] == LABEL_AKTIVASI:
+        if cache.aksi(sms_list[0]):
+            logger.info("SMS konfirmasi aktivasi sudah diproses - Skip renewal")
+            return True
+        cache.tandai(sms_list[0], AKSI_KONFIRMASI)
+        logger.success("✅ SMS terbaru adalah konfirmasi aktivasi paket - Skip renewal", event='konfirmasi')
         
         if NOTIF_KUOTA_AMAN:
             telegram.kirim_pesan_format(
                 "✅", "Paket Baru Aktif",
                 f"Paket baru sudah aktif!\n\n"
                 f"<b>SMS Terakhir:</b>\n{format_sms_untuk_telegram([sms_list[0]], 1)}",
-                tingkat='info'
+                tingkat='info',
+                live=True
             )
         
         return True
     
     # FIX #2 & #3: Filter SMS dengan multi-criteria
     current_time = time.time()
-    max_age_seconds = SMS_MAX_AGE_MINUTES * 60
+    perangkat = perangkat_aktif()
+    max_age_seconds = perangkat.sms_max_age * 60
     
     fresh_kuota_rendah = False
-    for sms in sms_list:
-        sms_age = current_time - sms['timestamp']
+    latest_kuota_sms = None
+    sudah_dievaluasi = 0
+    for sms, (jenis, kuota_gb) in zip(sms_list, label):
+        if cache.aksi(sms):
+            sudah_dievaluasi += 1
+            continue
+        
+        sms_age = current_time - sms.timestamp
         sms_age_minutes = int(sms_age / 60)
         
         if sms_age > max_age_seconds:
-            logger.info(f"Skip SMS: terlalu lama (usia: {sms_age_minutes} menit, max: {SMS_MAX_AGE_MINUTES} menit)")
+            logger.info(f"Skip SMS: terlalu lama (usia: {sms_age_minutes} menit, max: {perangkat.sms_max_age} menit)")
+            cache.tandai(sms, AKSI_DILEWATI)
             continue
         
-        if last_renewal_time > 0 and sms['timestamp'] < last_renewal_time:
-            sms_time_str = datetime.fromtimestamp(sms['timestamp']).strftime('%d/%m/%Y %H:%M:%S')
+        if last_renewal_time > 0 and sms.timestamp < last_renewal_time:
+            sms_time_str = format_waktu('%d/%m/%Y %H:%M:%S', sms.timestamp)
             logger.info(f"Skip SMS: dari sebelum renewal terakhir (SMS: {sms_time_str})")
+            cache.tandai(sms, AKSI_DILEWATI)
             continue
         
-        if keyword.lower() in sms['isi'].lower():
+        if jenis == LABEL_KUOTA_RENDAH:
             fresh_kuota_rendah = True
-            is_after_renewal = sms['timestamp'] > last_renewal_time if last_renewal_time > 0 else True
+            latest_kuota_sms = sms
+            is_after_renewal = sms.timestamp > last_renewal_time if last_renewal_time > 0 else True
             logger.warning(
                 f"⚠️ KUOTA RENDAH TERDETEKSI! "
+                f"Sisa: {kuota_gb:.2f}GB, "
                 f"SMS usia: {sms_age_minutes} menit, "
                 f"Setelah renewal: {'Ya' if is_after_renewal else 'N/A'}"
             )
             break
+        
+        cache.tandai(sms, AKSI_DILIHAT)
+    
+    if sudah_dievaluasi:
+        logger.info(f"{sudah_dievaluasi} SMS sudah dievaluasi sebelumnya - dilewati")
     
     if fresh_kuota_rendah:
-        logger.warning(f"⚠️ KUOTA RENDAH VALID! (< {THRESHOLD_KUOTA_GB}GB)")
+        logger.warning(f"⚠️ KUOTA RENDAH VALID! ({kuota_gb:.2f}GB ≤ {perangkat.threshold_gb}GB)", event='kuota_rendah')
         
         telegram.kirim_pesan_format(
             "⚠️", "Kuota Hampir Habis!",
-            f"Kuota Edu Anda kurang dari {THRESHOLD_KUOTA_GB}GB.\n"
+            f"Sisa kuota Edu Anda {kuota_gb:.2f}GB (batas {perangkat.threshold_gb}GB).\n"
             f"Memulai proses renewal otomatis...\n\n"
-            f"<b>SMS Terakhir:</b>\n{sms_list[0]['isi'][:200]}"
+            f"<b>SMS Terakhir:</b>\n{sms_list[0].isi[:200]}",
+            live=True
         )
         
-        return proses_renewal(adb, telegram, logger)
+        berhasil = proses_renewal(adb, telegram, logger)
+        if berhasil:
+            # Renewal gagal tidak ditandai supaya dicoba lagi tick berikutnya
+            cache.tandai(latest_kuota_sms, AKSI_RENEWAL)
+        return berhasil
     
     else:
-        logger.success(f"✅ Kuota masih aman (≥ {THRESHOLD_KUOTA_GB}GB atau SMS sudah di-proses)")
+        logger.success(
+            f"✅ Kuota masih aman (≥ {perangkat.threshold_gb}GB atau SMS sudah di-proses)",
+            event='kuota_aman'
+        )
         
         if NOTIF_KUOTA_AMAN:
+            konten = f"Kuota masih aman (≥ {perangkat.threshold_gb}GB)\n"
+            prediksi = format_prediksi(muat_state())
+            if prediksi:
+                konten += f"{prediksi}\n"
+            konten += f"\n<b>SMS Terakhir:</b>\n{format_sms_untuk_telegram([sms_list[0]], 1)}"
             telegram.kirim_pesan_format(
                 "✅", "Status Kuota",
-                f"Kuota masih aman (≥ {THRESHOLD_KUOTA_GB}GB)\n\n"
-                f"<b>SMS Terakhir:</b>\n{format_sms_untuk_telegram([sms_list[0]], 1)}",
-                tingkat='info'
+                konten,
+                tingkat='info',
+                live=True
             )
         
         return True
 
 
-def cek_kuota_aggressive_mode(sms_list, keyword, last_renewal_time, adb, telegram, logger):
+def cek_kuota_aggressive_mode(sms_list, last_renewal_time, adb, telegram, logger):
     """AGGRESSIVE Mode: Priority kuota check, lalu konfirmasi"""
     
     # Priority #1: Check ALL SMS for kuota rendah FIRST
     current_time = time.time()
-    max_age_seconds = SMS_MAX_AGE_MINUTES * 60
+    perangkat = perangkat_aktif()
+    max_age_seconds = perangkat.sms_max_age * 60
     
     fresh_kuota_rendah = False
     latest_kuota_sms = None
     
-    for sms in sms_list:
-        sms_age = current_time - sms['timestamp']
+    # Klasifikasi diambil dari cache: setiap SMS hanya dievaluasi sekali
+    cache = cache_sms()
+    label = [cache.klasifikasi(sms) for sms in sms_list]
+    sudah_dievaluasi = 0
+    
+    for sms, (jenis, kuota_gb) in zip(sms_list, label):
+        if cache.aksi(sms):
+            sudah_dievaluasi += 1
+            continue
+        
+        sms_age = current_time - sms.timestamp
         sms_age_minutes = int(sms_age / 60)
         
         # Kriteria 1: SMS terlalu lama
         if sms_age > max_age_seconds:
-            logger.info(f"Skip SMS: terlalu lama (usia: {sms_age_minutes} menit, max: {SMS_MAX_AGE_MINUTES} menit)")
+            logger.info(f"Skip SMS: terlalu lama (usia: {sms_age_minutes} menit, max: {perangkat.sms_max_age} menit)")
+            cache.tandai(sms, AKSI_DILEWATI)
             continue
         
         # Kriteria 2: SMS sebelum renewal terakhir
-        if last_renewal_time > 0 and sms['timestamp'] < last_renewal_time:
-            sms_time_str = datetime.fromtimestamp(sms['timestamp']).strftime('%d/%m/%Y %H:%M:%S')
+        if last_renewal_time > 0 and sms.timestamp < last_renewal_time:
+            sms_time_str = format_waktu('%d/%m/%Y %H:%M:%S', sms.timestamp)
             logger.info(f"Skip SMS: dari sebelum renewal terakhir (SMS: {sms_time_str})")
+            cache.tandai(sms, AKSI_DILEWATI)
             continue
         
-        # Kriteria 3: SMS mengandung keyword kuota rendah
-        if keyword.lower() in sms['isi'].lower():
+        # Kriteria 3: sisa kuota di SMS <= threshold
+        if jenis == LABEL_KUOTA_RENDAH:
             fresh_kuota_rendah = True
             latest_kuota_sms = sms
-            is_after_renewal = sms['timestamp'] > last_renewal_time if last_renewal_time > 0 else True
+            is_after_renewal = sms.timestamp > last_renewal_time if last_renewal_time > 0 else True
             logger.warning(
                 f"⚠️ KUOTA RENDAH TERDETEKSI! "
+                f"Sisa: {kuota_gb:.2f}GB, "
                 f"SMS usia: {sms_age_minutes} menit, "
                 f"Setelah renewal: {'Ya' if is_after_renewal else 'N/A'}"
             )
             break
+        
+        if jenis != LABEL_AKTIVASI or sms is not sms_list[0]:
+            # SMS aktivasi terbaru ditandai di Priority #2 (saat dilaporkan)
+            cache.tandai(sms, AKSI_DILIHAT)
+    
+    if sudah_dievaluasi:
+        logger.info(f"{sudah_dievaluasi} SMS sudah dievaluasi sebelumnya - dilewati")
     
     # Priority #2: Only check konfirmasi if NO kuota rendah found
     if not fresh_kuota_rendah:
-        sms_terbaru = sms_list[0]['isi'].lower()
-        konfirmasi_keywords = [
-            'sdh aktif', 
-            'sudah aktif', 
-            'berhasil diaktifkan', 
-            'telah diaktifkan',
-            'anda sdh aktif',
-            'paket aktif'
-        ]
-        
-        if any(kw in sms_terbaru for kw in konfirmasi_keywords):
-            logger.success("✅ SMS terbaru adalah konfirmasi aktivasi paket - Skip renewal")
+        if label[0][0] == LABEL_AKTIVASI:
+            if cache.aksi(sms_list[0]):
+                logger.info("SMS konfirmasi aktivasi sudah diproses - Skip renewal")
+                return True
+            cache.tandai(sms_list[0], AKSI_KONFIRMASI)
+            logger.success("✅ SMS terbaru adalah konfirmasi aktivasi paket - Skip renewal", event='konfirmasi')
             
             if NOTIF_KUOTA_AMAN:
                 telegram.kirim_pesan_format(
                     "✅", "Paket Baru Aktif",
                     f"Paket baru sudah aktif!\n\n"
                     f"<b>SMS Terakhir:</b>\n{format_sms_untuk_telegram([sms_list[0]], 1)}",
-                    tingkat='info'
+                    tingkat='info',
+                    live=True
                 )
             
             return True
     
     # Process renewal if kuota rendah found
     if fresh_kuota_rendah:
-        logger.warning(f"⚠️ KUOTA RENDAH VALID! (< {THRESHOLD_KUOTA_GB}GB)")
+        logger.warning(f"⚠️ KUOTA RENDAH VALID! ({kuota_gb:.2f}GB ≤ {perangkat.threshold_gb}GB)", event='kuota_rendah')
         
         telegram.kirim_pesan_format(
             "⚠️", "Kuota Hampir Habis!",
-            f"Kuota Edu Anda kurang dari {THRESHOLD_KUOTA_GB}GB.\n"
+            f"Sisa kuota Edu Anda {kuota_gb:.2f}GB (batas {perangkat.threshold_gb}GB).\n"
             f"Memulai proses renewal otomatis...\n\n"
-            f"<b>SMS Terakhir:</b>\n{latest_kuota_sms['isi'][:200]}"
+            f"<b>SMS Terakhir:</b>\n{latest_kuota_sms.isi[:200]}",
+            live=True
         )
         
-        return proses_renewal(adb, telegram, logger)
+        berhasil = proses_renewal(adb, telegram, logger)
+        if berhasil:
+            # Renewal gagal tidak ditandai supaya dicoba lagi tick berikutnya
+            cache.tandai(latest_kuota_sms, AKSI_RENEWAL)
+        return berhasil
     
     else:
-        logger.success(f"✅ Kuota masih aman (≥ {THRESHOLD_KUOTA_GB}GB atau SMS sudah di-proses)")
+        logger.success(
+            f"✅ Kuota masih aman (≥ {perangkat.threshold_gb}GB atau SMS sudah di-proses)",
+            event='kuota_aman'
+        )
         
         if NOTIF_KUOTA_AMAN:
+            konten = f"Kuota masih aman (≥ {perangkat.threshold_gb}GB)\n"
+            prediksi = format_prediksi(muat_state())
+            if prediksi:
+                konten += f"{prediksi}\n"
+            konten += f"\n<b>SMS Terakhir:</b>\n{format_sms_untuk_telegram([sms_list[0]], 1)}"
             telegram.kirim_pesan_format(
                 "✅", "Status Kuota",
-                f"Kuota masih aman (≥ {THRESHOLD_KUOTA_GB}GB)\n\n"
-                f"<b>SMS Terakhir:</b>\n{format_sms_untuk_telegram([sms_list[0]], 1)}",
-                tingkat='info'
+                konten,
+                tingkat='info',
+                live=True
             )
         
         return True
 
 
 def validasi_konfigurasi(logger):
-    """Validasi konfigurasi sebelum menjalankan script"""
+    """Validasi konfigurasi device aktif sebelum menjalankan script"""
     errors = []
+    perangkat = perangkat_aktif()
     
-    if BOT_TOKEN == 'BOT_TOKEN' or not BOT_TOKEN:
+    if perangkat.bot_token == 'BOT_TOKEN' or not perangkat.bot_token:
         errors.append("❌ BOT_TOKEN belum dikonfigurasi")
     
-    if CHAT_ID == 'CHAT_ID' or not CHAT_ID:
+    if perangkat.chat_id == 'CHAT_ID' or not perangkat.chat_id:
         errors.append("❌ CHAT_ID belum dikonfigurasi")
     
-    if not KODE_UNREG or not KODE_BELI:
+    if not perangkat.kode_unreg or not perangkat.kode_beli:
         errors.append("❌ Kode USSD belum dikonfigurasi")
     
     if errors:
@@ -670,68 +3644,857 @@ def validasi_konfigurasi(logger):
     return True
 
 
-def main():
-    """Fungsi utama"""
+class Scheduler:
+    """Scheduler internal untuk mode daemon (pengganti cron)
+
+    Signal handler hanya mengubah flag; loop tidur dalam potongan pendek
+    sehingga SIGTERM/SIGUSR1 tetap direspon paling lambat ~1 detik.
+    """
+
+    def __init__(self, interval, logger):
+        self.interval = interval
+        self.logger = logger
+        self._stop_requested = False
+        self._run_now = False
+        self._wake = threading.Event()
+
+    def pasang_signal(self):
+        """Pasang handler SIGTERM/SIGINT (stop) dan SIGUSR1 (cek sekarang)"""
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGUSR1, self._handle_run_now)
+
+    def _handle_stop(self, signum, frame):
+        self._stop_requested = True
+
+    def _handle_run_now(self, signum, frame):
+        self._run_now = True
+
+    def trigger(self):
+        """Minta pengecekan segera (aman dipanggil dari thread lain)"""
+        self._wake.set()
+
+    @property
+    def berhenti(self):
+        return self._stop_requested
+
+    def hentikan(self):
+        """Minta loop berhenti (dari thread lain)"""
+        self._stop_requested = True
+        self._wake.set()
+
+    def tunggu(self, detik):
+        """Tidur sampai jadwal berikutnya, stop, atau trigger
+
+        Return True jika dibangunkan lebih awal (SIGUSR1 / trigger).
+        """
+        batas = time.monotonic() + max(0, detik)
+        while not self._stop_requested and not self._run_now:
+            sisa = batas - time.monotonic()
+            if sisa <= 0:
+                break
+            if self._wake.wait(min(sisa, 1.0)):
+                break
+        dibangunkan = self._run_now or self._wake.is_set()
+        self._wake.clear()
+        self._run_now = False
+        return dibangunkan
+
+
+class SmsEventWatcher:
+    """Thread pemantau event SMS masuk dari stream logcat device
+
+    Baris yang cocok SMS_EVENT_PATTERN memicu scheduler.trigger() (event
+    beruntun di dalam SMS_EVENT_DEBOUNCE digabung), ditambah satu trigger
+    susulan karena log bisa muncul sebelum SMS tersimpan di content://sms.
+    Jika stream putus (device dicabut, logcat tidak didukung), dibuka ulang
+    dengan backoff; selama itu polling biasa tetap berjalan. Baris pertama
+    setelah stream putus berarti device kembali: saat_pulih() dipanggil dan
+    pengecekan dijalankan segera (tanpa menunggu backoff circuit breaker).
+    """
     
-    # Prevent double execution with file lock
-    import fcntl
-    lock_file_path = '/tmp/auto_edu_python.lock'
-    lock_file = None
+    MIN_BACKOFF = 2
+    MAX_BACKOFF = 60
+    # Jeda trigger susulan setelah event terakhir
+    SUSULAN = 3.0
+    
+    def __init__(self, scheduler, logger, transport=None, adb_bin=None, perangkat=None,
+                 saat_pulih=None):
+        self.scheduler = scheduler
+        self.logger = logger
+        self.transport = transport
+        self.perangkat = perangkat
+        self.saat_pulih = saat_pulih
+        self.adb_bin = adb_bin or ADB_BIN
+        self.pola = re.compile(SMS_EVENT_PATTERN.encode())
+        self._stop = threading.Event()
+        self._tutup_sumber = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._susulan = None
+        self._terakhir = 0.0
+        self.jumlah_event = 0
+    
+    def mulai(self):
+        self._thread = threading.Thread(target=self._loop, name='sms-event', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._tutup()
+        if self._susulan is not None:
+            self._susulan.cancel()
+        if self._thread is not None:
+            self._thread.join(2)
+    
+    def _buka_sumber(self):
+        """Buka stream event, return (file biner, fungsi penutup)"""
+        if isinstance(self.transport, ADBSocketTransport):
+            sock = self.transport._buka_shell(SMS_EVENT_CMD, TIMEOUT_ADB)
+            sock.settimeout(None)
+            berkas = sock.makefile('rb')
+            
+            def tutup():
+                import socket
+                # shutdown membangunkan readline() yang sedang menunggu
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                sock.close()
+            return berkas, tutup
+        
+        serial = getattr(self.transport, 'serial', None)
+        proc = subprocess.Popen(
+            args_adb(self.adb_bin, serial if serial is not None else ADB_SERIAL)
+            + ['shell', SMS_EVENT_CMD],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL
+        )
+        
+        def tutup():
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+        return proc.stdout, tutup
+    
+    def _tutup(self):
+        with self._lock:
+            tutup, self._tutup_sumber = self._tutup_sumber, None
+        if tutup is not None:
+            tutup()
+    
+    def _event(self):
+        sekarang = time.monotonic()
+        if sekarang - self._terakhir >= SMS_EVENT_DEBOUNCE:
+            self.jumlah_event += 1
+            self.logger.info("Event SMS masuk terdeteksi - cek sekarang")
+            self.scheduler.trigger()
+        self._terakhir = sekarang
+        
+        if self._susulan is not None:
+            self._susulan.cancel()
+        self._susulan = threading.Timer(self.SUSULAN, self.scheduler.trigger)
+        self._susulan.daemon = True
+        self._susulan.start()
+    
+    def _loop(self):
+        # Thread ini milik satu device (prefix log & file state)
+        _konteks.perangkat = self.perangkat
+        backoff = self.MIN_BACKOFF
+        putus = False
+        while not self._stop.is_set():
+            mulai = time.monotonic()
+            try:
+                berkas, tutup = self._buka_sumber()
+                with self._lock:
+                    self._tutup_sumber = tutup
+                if self._stop.is_set():
+                    break
+                self.logger.info("Pemantau event SMS aktif (logcat)")
+                for baris in berkas:
+                    if putus:
+                        putus = False
+                        self.logger.info("Stream event SMS tersambung lagi - cek sekarang")
+                        if self.saat_pulih is not None:
+                            self.saat_pulih()
+                        self.scheduler.trigger()
+                    if self.pola.search(baris):
+                        self._event()
+            except Exception as e:
+                if not self._stop.is_set():
+                    self.logger.warning(f"Pemantau event SMS error: {str(e)}")
+            finally:
+                self._tutup()
+            
+            if self._stop.is_set():
+                break
+            putus = True
+            # Stream yang sempat berjalan lama dianggap sehat: reset backoff
+            if time.monotonic() - mulai > self.MAX_BACKOFF:
+                backoff = self.MIN_BACKOFF
+            self.logger.warning(
+                f"Stream event SMS berhenti, buka ulang dalam {backoff} detik (polling tetap jalan)"
+            )
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, self.MAX_BACKOFF)
+        self._tutup()
+
+
+def kirim_notif_startup(telegram, interval=None):
+    """Kirim notifikasi startup (sekali per proses per device)"""
+    perangkat = perangkat_aktif()
+    mode_info = {
+        'AGGRESSIVE': "🔴 AGGRESSIVE", 'AUTO': "🟡 AUTO",
+    }.get(MONITORING_MODE, "🟢 EFFICIENT")
+    konten = (
+        f"Auto Edu monitoring dimulai\n"
+        f"Mode: {mode_info}\n"
+        f"Threshold: {perangkat.threshold_gb}GB\n"
+    )
+    if MONITORING_MODE == 'AUTO':
+        konten += f"Interval: adaptif {AUTO_INTERVAL_MIN}-{AUTO_INTERVAL_MAX} detik"
+    else:
+        konten += (
+            f"SMS Check: {perangkat.jumlah_sms_cek} messages\n"
+            f"Max Age: {perangkat.sms_max_age} menit"
+        )
+        if interval:
+            konten += f"\nDaemon: setiap {interval} detik"
+    telegram.kirim_pesan_format("🚀", "Script Started", konten, tingkat='info', live=True)
+
+
+def catat_akhir_tick(waktu, durasi, status):
+    """Fase akhir tick di snapshot status: last check, counter, prediksi"""
+    m = metrik()
+    m.tambah('autoedu_checks', hasil=status)
+    m.amati('autoedu_tick_seconds', durasi, mode=MONITORING_MODE)
+    m.set('autoedu_last_tick_timestamp_seconds', int(waktu + durasi))
+    m.simpan()
+    snapshot = status_snapshot()
+    snapshot.hitung('checks')
+    kolom = {
+        'fase': 'idle', 'fase_waktu': int(time.time()),
+        'last_check': {'waktu': int(waktu), 'durasi': round(durasi, 2), 'status': status},
+    }
+    state = muat_state()
+    hasil = prediksi_habis(state)
+    if hasil:
+        kolom['prediksi'] = {
+            'habis': int(hasil[0]), 'sisa_gb': round(hasil[1], 2),
+            'laju_gb_jam': round(state['prediksi']['laju'] * 3600, 2),
+        }
+    renewal = state.get('renewal') or {}
+    if renewal.get('waktu') and not snapshot.data.get('last_renewal'):
+        # Snapshot baru (mis. setelah reboot): ambil renewal terakhir dari state
+        kolom['last_renewal'] = {
+            'waktu': renewal['waktu'], 'status': renewal.get('status'),
+            'pemicu': None, 'latency': renewal.get('latency'),
+        }
+    snapshot.perbarui(**kolom)
+
+
+def jadwal_berikutnya(detik):
+    """Catat waktu cek berikutnya di snapshot status"""
+    status_snapshot().perbarui(next_check=int(time.time() + max(0, detik)))
+
+
+def simpan_pemutus(pemutus, logger):
+    """Tulis status circuit breaker ADB ke state device aktif"""
+    state = muat_state()
+    state['adb'] = pemutus.ke_dict()
+    try:
+        simpan_state(state)
+    except OSError as e:
+        logger.warning(f"Gagal simpan status ADB: {e}")
+
+
+def cek_adb(adb, telegram, logger, pemutus, tahu_putus=False):
+    """Pastikan ADB terhubung lewat cache kesehatan + circuit breaker
+
+    Return True (terhubung), False (gagal) atau None (breaker open, tick
+    dilewati tanpa menyentuh ADB). Notifikasi hanya saat status berubah.
+    tahu_putus: device baru saja gagal dicek, langsung coba sambung ulang.
+    """
+    sekarang = time.time()
+    paksa, adb.probe_segera = adb.probe_segera, False
+    if not pemutus.boleh_coba(sekarang, paksa):
+        logger.info(
+            f"ADB masih putus - skip, cek ulang dalam {int(pemutus.coba_berikutnya - sekarang)} detik",
+            event='adb_error'
+        )
+        return None
+    if pemutus.sehat_tercache(sekarang):
+        return True
+    
+    terhubung = (not tahu_putus and adb.cek_koneksi()) or adb.pulihkan()
+    sekarang = time.time()
+    if terhubung:
+        if pemutus.sukses(sekarang):
+            durasi = int(sekarang - pemutus.sejak)
+            logger.success(f"ADB terhubung kembali setelah {durasi} detik", event='adb_pulih')
+            telegram.kirim_pesan_format(
+                "🔌", "ADB Terhubung Kembali",
+                f"Device terhubung lagi setelah putus {durasi // 60} menit {durasi % 60} detik.\n"
+                f"Pengecekan kuota dijalankan sekarang."
+            )
+        return True
+    
+    if pemutus.putus(sekarang):
+        telegram.kirim_pesan_format(
+            "❌", "ADB Error",
+            "Tidak dapat terhubung ke device!\n\n"
+            "Pastikan:\n"
+            "• USB debugging aktif\n"
+            "• Device terhubung ke router\n"
+            "• ADB sudah terinstall\n\n"
+            f"Dicoba ulang otomatis (backoff {ADB_BACKOFF_MIN}-{ADB_BACKOFF_MAX} detik), "
+            f"notifikasi berikutnya saat device terhubung kembali."
+        )
+    logger.warning(
+        f"ADB putus ({pemutus.gagal}x) - cek ulang dalam {pemutus.backoff()} detik",
+        event='adb_error'
+    )
+    return False
+
+
+def jalankan_pengecekan(adb, telegram, logger):
+    """Satu siklus pengecekan: koneksi ADB lalu cek kuota (dicatat ke riwayat DB)"""
+    waktu = time.time()
+    mulai = time.monotonic()
+    db = riwayat_db(logger)
+    snapshot = status_snapshot()
+    pemutus = PemutusADB(muat_state().get('adb'))
+    try:
+        tercache = pemutus.sehat_tercache(waktu) and not adb.probe_segera
+        terhubung = cek_adb(adb, telegram, logger, pemutus)
+        if db and not tercache and terhubung is not None:
+            db.catat_timing('adb_cek', time.monotonic() - mulai, waktu)
+        snapshot.perbarui(
+            fase='cek_adb', fase_waktu=int(time.time()),
+            adb={'terhubung': bool(terhubung), 'device': adb.transport.serial or None,
+                 'backend': ADB_BACKEND, 'waktu': int(time.time()),
+                 'breaker': pemutus.status, 'coba_berikutnya': int(pemutus.coba_berikutnya) or None},
+        )
+        if not terhubung:
+            hasil = None
+        else:
+            hasil = cek_kuota_dan_proses(adb, telegram, logger)
+            if hasil is None:
+                # Device hilang di tengah tick (mis. kesehatan dari cache)
+                pemutus.ok_terakhir = 0
+                terhubung = cek_adb(adb, telegram, logger, pemutus, tahu_putus=True)
+                if terhubung:
+                    hasil = False
+            elif hasil:
+                pemutus.sukses(time.time())
+        simpan_pemutus(pemutus, logger)
+    except Exception:
+        if db:
+            db.catat_run(waktu, time.monotonic() - mulai, MONITORING_MODE, 'error')
+            db.commit()
+        catat_akhir_tick(waktu, time.monotonic() - mulai, 'error')
+        raise
+    if hasil is not None:
+        status = 'ok' if hasil else 'warning'
+    else:
+        status = 'adb_skip' if terhubung is None else 'adb_error'
+    if db:
+        db.catat_run(waktu, time.monotonic() - mulai, MONITORING_MODE, status)
+        retensi_riwayat(db, logger)
+        db.commit()
+    catat_akhir_tick(waktu, time.monotonic() - mulai, status)
+    return bool(hasil)
+
+
+def jalankan_daemon(daftar, logger, interval):
+    """Loop utama mode daemon - objek ADB/Telegram/Logger dipakai ulang
+
+    Satu device: loop jalan di thread utama. Beberapa device: satu thread
+    per device dengan Scheduler sendiri, thread utama hanya memegang signal
+    (SIGUSR1 diteruskan ke semua device, SIGTERM menghentikan semuanya).
+    """
+    scheduler = Scheduler(interval, logger)
+    scheduler.pasang_signal()
+    
+    server_metrik = mulai_server_metrik(logger) if METRIK_PORT else None
+    
+    if MONITORING_MODE == 'AUTO':
+        logger.info(
+            f"Mode daemon aktif - interval adaptif {AUTO_INTERVAL_MIN}-{AUTO_INTERVAL_MAX} "
+            f"detik (PID {os.getpid()})",
+            event='daemon_mulai'
+        )
+    else:
+        logger.info(
+            f"Mode daemon aktif - interval {interval} detik (PID {os.getpid()})",
+            event='daemon_mulai'
+        )
+    
+    if len(daftar) == 1:
+        with daftar[0].aktif():
+            loop_daemon(daftar[0], scheduler, logger, interval)
+    else:
+        logger.info(f"{len(daftar)} device: {', '.join(p.nama for p in daftar)}")
+        scheduler_device = [Scheduler(interval, logger) for _ in daftar]
+        
+        def jalankan(perangkat, sub_scheduler):
+            with perangkat.aktif():
+                loop_daemon(perangkat, sub_scheduler, logger, interval)
+        
+        threads = []
+        for perangkat, sub_scheduler in zip(daftar, scheduler_device):
+            thread = threading.Thread(
+                target=jalankan, args=(perangkat, sub_scheduler),
+                name=f'perangkat-{perangkat.nama}', daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+        while not scheduler.berhenti:
+            if scheduler.tunggu(3600):
+                for sub_scheduler in scheduler_device:
+                    sub_scheduler.trigger()
+        for sub_scheduler in scheduler_device:
+            sub_scheduler.hentikan()
+        for thread in threads:
+            thread.join()
+    
+    if server_metrik is not None:
+        server_metrik.shutdown()
+    logger.warning("Daemon dihentikan (SIGTERM/SIGINT)", event='daemon_stop')
+    return 0
+
+
+def loop_daemon(perangkat, scheduler, logger, interval):
+    """Loop pengecekan satu device sampai scheduler dihentikan"""
+    adb, telegram = perangkat.adb, perangkat.telegram
+    status_snapshot().perbarui(run_mode='daemon', interval=interval, mulai=int(time.time()))
+    
+    watcher = None
+    if SMS_EVENT_WATCH:
+        watcher = SmsEventWatcher(
+            scheduler, logger, transport=adb.transport, perangkat=perangkat,
+            saat_pulih=adb.minta_probe
+        )
+        watcher.mulai()
+    
+    next_run = time.monotonic()
+    while True:
+        scheduler.tunggu(next_run - time.monotonic())
+        if scheduler.berhenti:
+            break
+        
+        mulai = time.monotonic()
+        logger._check_log_size()
+        
+        try:
+            success = jalankan_pengecekan(adb, telegram, logger)
+            logger.info(
+                f"Siklus selesai ({time.monotonic() - mulai:.1f}s) - "
+                f"Status: {'OK' if success else 'WARNING'}"
+            )
+            logger.flush()
+        except Exception as e:
+            logger.error(f"ERROR siklus daemon: {str(e)}", event='fatal')
+            telegram.kirim_pesan_format(
+                "💥", "Fatal Error",
+                f"Script error:\n<code>{str(e)}</code>\n\n"
+                f"Daemon tetap berjalan, periksa log untuk detail."
+            )
+        
+        # Jadwal tetap (fixed-rate); kalau siklus molor, langsung lanjut.
+        # Mode AUTO: interval dihitung ulang setiap siklus
+        if MONITORING_MODE == 'AUTO':
+            interval = jadwalkan_auto(logger)
+        next_run = max(mulai + interval, time.monotonic())
+        
+        # Bangun lebih awal jika perkiraan habis kuota jatuh sebelum jadwal
+        if PREDIKSI_RENEWAL:
+            hasil = prediksi_habis(muat_state())
+            if hasil:
+                sisa_detik = hasil[0] - PREDIKSI_MARGIN - time.time()
+                if 0 < sisa_detik < next_run - time.monotonic():
+                    next_run = time.monotonic() + sisa_detik
+                    logger.info(f"Pengecekan berikutnya dimajukan {int(sisa_detik)}s (prediksi kuota habis)")
+        
+        jadwal_berikutnya(next_run - time.monotonic())
+    
+    if watcher is not None:
+        watcher.stop()
+    status_snapshot().perbarui(fase='berhenti', fase_waktu=int(time.time()), next_check=None)
+
+
+def parse_args(argv=None):
+    """Parse argumen command line"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        # Tick cron biasa tanpa argumen: tidak perlu memuat argparse
+        import types
+        return types.SimpleNamespace(
+            daemon=False, interval=None, force=False, status=False, perintah=None
+        )
+    
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Auto Edu - monitoring dan perpanjangan kuota Edu'
+    )
+    parser.add_argument(
+        '--daemon', action='store_true',
+        help='jalan terus dengan scheduler internal (untuk procd)'
+    )
+    parser.add_argument(
+        '--interval', type=int, default=None,
+        help=f'interval cek mode daemon dalam detik (default: {CHECK_INTERVAL})'
+    )
+    parser.add_argument(
+        '--force', action='store_true',
+        help='mode AUTO: cek sekarang walaupun belum jadwalnya'
+    )
+    parser.add_argument(
+        '--status', action='store_true',
+        help='tampilkan status renewal dan prediksi kuota lalu keluar'
+    )
+    
+    perintah = parser.add_subparsers(dest='perintah')
+    logs = perintah.add_parser(
+        'logs', help='cari log lewat index waktu/level/event',
+        description='Cari baris log via index <LOG_FILE>.idx (binary search waktu)'
+    )
+    logs.add_argument(
+        '--since', type=parse_waktu_log, default=None,
+        help='mulai dari: 30m, 2h, 1d, epoch, atau "YYYY-MM-DD HH:MM[:SS]"'
+    )
+    logs.add_argument(
+        '--until', type=parse_waktu_log, default=None,
+        help='sampai (format sama dengan --since)'
+    )
+    logs.add_argument(
+        '--level', type=str.upper, choices=LEVEL_LOG, default=None,
+        help='level minimal (INFO < SUCCESS < WARN < ERROR)'
+    )
+    logs.add_argument(
+        '--event', choices=[e for e in EVENT_LOG if e], default=None,
+        help='hanya baris dengan kode event ini'
+    )
+    logs.add_argument(
+        '--limit', type=int, default=200,
+        help='jumlah baris terakhir yang ditampilkan (0 = semua, default: 200)'
+    )
     
+    bundle = perintah.add_parser(
+        'bundle', help='buat bundle bytecode .pyz (start cron lebih cepat)',
+        description='Kompilasi script ke zipapp berisi bytecode, tanpa compile ulang tiap run'
+    )
+    bundle.add_argument(
+        '--output', default=None,
+        help='file tujuan (default: auto_edu.pyz di samping script)'
+    )
+    return parser.parse_args(argv)
+
+
+def parse_waktu_log(teks):
+    """'30m' / '2h' / '1d' / '45s' (relatif), epoch, atau tanggal -> epoch detik"""
+    teks = teks.strip()
+    satuan = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    if len(teks) > 1 and teks[-1].lower() in satuan and teks[:-1].isdigit():
+        return time.time() - int(teks[:-1]) * satuan[teks[-1].lower()]
+    try:
+        return float(teks)
+    except ValueError:
+        pass
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return time.mktime(time.strptime(teks, fmt))
+        except ValueError:
+            continue
+    import argparse
+    raise argparse.ArgumentTypeError(f"format waktu tidak dikenal: '{teks}'")
+
+
+def cari_index_log(data, since):
+    """Binary search: posisi record pertama di index dengan waktu >= since"""
+    ukuran = Logger.INDEX_SIZE
+    lo, hi = 0, len(data) // ukuran
+    while lo < hi:
+        tengah = (lo + hi) // 2
+        if struct.unpack_from('<d', data, tengah * ukuran)[0] < since:
+            lo = tengah + 1
+        else:
+            hi = tengah
+    return lo
+
+
+def tampilkan_logs(args):
+    """Subcommand `logs`: filter via index, baca hanya baris yang cocok"""
+    if not LOG_FILE:
+        print("LOG_FILE tidak diset")
+        return 1
+    index_file = f"{LOG_FILE}.idx"
     try:
-        lock_file = open(lock_file_path, 'w')
-        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-    except (IOError, OSError):
+        with open(index_file, 'rb') as f:
+            data = f.read()
+        ukuran_log = os.path.getsize(LOG_FILE)
+    except OSError:
+        print(f"Index log belum ada ({index_file})")
+        return 1
+    
+    ukuran = Logger.INDEX_SIZE
+    mulai = cari_index_log(data, args.since) if args.since is not None else 0
+    level_min = _LEVEL_ID[args.level] if args.level else 0
+    event_id = _EVENT_ID[args.event] if args.event else None
+    cocok = deque(maxlen=args.limit or None)
+    for i in range(mulai, len(data) // ukuran):
+        waktu, offset, level_id, event = struct.unpack_from(Logger.INDEX_FORMAT, data, i * ukuran)
+        if args.until is not None and waktu > args.until:
+            break
+        if level_id < level_min or (event_id is not None and event != event_id):
+            continue
+        if offset < ukuran_log:
+            cocok.append(offset)
+    
+    with open(LOG_FILE, 'rb') as f:
+        for offset in cocok:
+            f.seek(offset)
+            print(f.readline().decode('utf-8', 'replace').rstrip('\n'))
+    return 0
+
+
+# __main__.py di dalam bundle. Jika auto_edu.py sudah berubah sejak bundle
+# dibuat (update/edit manual), jalankan sumbernya supaya tidak memakai kode basi.
+BUNDLE_MAIN = """\
+# Dibuat oleh `auto_edu.py bundle` - jangan diedit
+import os
+import sys
+
+SUMBER = {sumber!r}
+MTIME = {mtime}
+
+try:
+    segar = os.stat(SUMBER).st_mtime_ns == MTIME
+except OSError:
+    segar = True
+
+if segar:
+    import auto_edu
+    sys.exit(auto_edu.main())
+
+import runpy
+runpy.run_path(SUMBER, run_name='__main__')
+"""
+
+
+def buat_bundle(args):
+    """Subcommand `bundle`: zipapp berisi auto_edu.pyc (tanpa compile source tiap run)
+
+    Python tidak menyimpan bytecode script yang dijalankan langsung, jadi
+    `python3 auto_edu.py` meng-compile ±3000 baris di setiap tick cron.
+    Bytecode terikat versi Python: buat bundle di device itu sendiri.
+    """
+    import zipfile
+    import tempfile
+    import py_compile
+    
+    sumber = os.path.abspath(__file__)
+    if not os.path.isfile(sumber):
+        print("Bundle hanya bisa dibuat dari auto_edu.py (bukan dari bundle)")
+        return 1
+    tujuan = args.output or os.path.splitext(sumber)[0] + '.pyz'
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pyc = os.path.join(tmp, 'auto_edu.pyc')
+        try:
+            py_compile.compile(sumber, cfile=pyc, doraise=True)
+        except py_compile.PyCompileError as e:
+            print(f"Gagal compile: {e}")
+            return 1
+        main_py = BUNDLE_MAIN.format(sumber=sumber, mtime=os.stat(sumber).st_mtime_ns)
+        
+        tmp_tujuan = f"{tujuan}.tmp"
+        with open(tmp_tujuan, 'wb') as f:
+            f.write(b'#!/usr/bin/env python3\n')
+            # ZIP_STORED: tanpa dekompresi saat import
+            with zipfile.ZipFile(f, 'w', zipfile.ZIP_STORED) as z:
+                z.write(pyc, 'auto_edu.pyc')
+                z.writestr('__main__.py', main_py)
+        os.chmod(tmp_tujuan, 0o755)
+        os.replace(tmp_tujuan, tujuan)
+    
+    print(f"Bundle dibuat: {tujuan} (Python {sys.version_info[0]}.{sys.version_info[1]})")
+    return 0
+
+
+def tampilkan_status():
+    """Cetak status renewal + prediksi habis kuota (tanpa ADB/Telegram)"""
+    db = None
+    # Salinan kerja di tmpfs paling baru; arsip flash setelah reboot
+    path_db = next((p for p in (DB_KERJA, DB_FILE) if p and Path(p).exists()), None)
+    if path_db and muat_sqlite3():
+        try:
+            db = RiwayatDB(path_db, Logger(None), baca_saja=True)
+        except sqlite3.Error as e:
+            print(f"Riwayat DB tidak bisa dibuka: {e}")
+    daftar = muat_perangkat()
+    for i, perangkat in enumerate(daftar):
+        if len(daftar) > 1:
+            if i:
+                print()
+            print(f"== {perangkat.nama} ({perangkat.serial}) ==")
+        with perangkat.aktif():
+            tampilkan_status_perangkat(db, perangkat if len(daftar) > 1 else None)
+    if db:
+        db.conn.close()
+    return 0
+
+
+def tampilkan_status_perangkat(db, perangkat=None):
+    """Status satu device (perangkat None = tanpa filter device di DB)"""
+    state = muat_state()
+    renewal = state.get('renewal') or {}
+    if renewal.get('waktu'):
+        waktu = format_waktu('%d/%m/%Y %H:%M:%S', renewal['waktu'])
+        print(f"Renewal terakhir : {waktu} ({renewal.get('status')})")
+    else:
+        print("Renewal terakhir : -")
+    pengirim = perangkat_aktif().allowlist_sms(state)
+    print(f"Filter pengirim  : {', '.join(pengirim) if pengirim else 'semua pengirim'}")
+    dikenal = state.get('pengirim_dikenal') or {}
+    if dikenal:
+        urut = sorted(dikenal.items(), key=lambda item: -item[1]['jumlah'])
+        print("Pengirim dikenal : " + ", ".join(f"{p} ({e['jumlah']}x)" for p, e in urut))
+    if db:
+        filter_db = {'perangkat': perangkat.nama} if perangkat else {}
+        sehari = [r for r in db.rentang('runs', time.time() - 86400)
+                  if not perangkat or r.get('perangkat') == perangkat.nama]
+        print(
+            f"Riwayat          : {db.jumlah('runs', **filter_db)} cek, "
+            f"{db.jumlah('renewals', **filter_db)} renewal "
+            f"({db.jumlah('renewals', status='confirmed', **filter_db)} terkonfirmasi), "
+            f"{len(sehari)} cek 24 jam terakhir"
+        )
+        for r in db.terakhir('renewals', 3, **filter_db):
+            waktu = format_waktu('%d/%m/%Y %H:%M:%S', r['waktu'])
+            print(f"  {waktu}  {r['status']:<11} pemicu={r['pemicu']} "
+                  f"unreg {r['durasi_unreg']}s beli {r['durasi_beli']}s")
+    hasil = prediksi_habis(state)
+    if hasil is None:
+        print("Prediksi         : belum cukup data")
+        return
+    habis, sisa = hasil
+    p = state['prediksi']
+    print(f"Laju pemakaian   : {p['laju'] * 3600:.2f} GB/jam ({p.get('n', 0)} sampel)")
+    print(f"Perkiraan sisa   : {sisa:.2f} GB")
+    print(f"Perkiraan habis  : {format_waktu('%d/%m/%Y %H:%M:%S', habis)}")
+    if PREDIKSI_RENEWAL:
+        renew = format_waktu('%d/%m/%Y %H:%M:%S', habis - PREDIKSI_MARGIN)
+        print(f"Renewal prediktif: {renew} (margin {PREDIKSI_MARGIN}s)")
+
+
+def main(argv=None):
+    """Fungsi utama"""
+    args = parse_args(argv)
+    
+    if args.status:
+        return tampilkan_status()
+    
+    if args.perintah == 'logs':
+        return tampilkan_logs(args)
+    
+    if args.perintah == 'bundle':
+        return buat_bundle(args)
+    
+    daftar = muat_perangkat()
+    
+    # Cron mode AUTO jalan tiap menit; device yang belum jatuh tempo
+    # dilewati dan tick tanpa device langsung keluar sebelum membuka ADB/Telegram
+    if MONITORING_MODE == 'AUTO' and not (args.daemon or args.force):
+        jatuh_tempo = []
+        for perangkat in daftar:
+            with perangkat.aktif():
+                if auto_jatuh_tempo():
+                    jatuh_tempo.append(perangkat)
+        daftar = jatuh_tempo
+        if not daftar:
+            return 0
+    
+    # Prevent double execution with file lock (per device: device yang
+    # masih diproses run sebelumnya dilewati, device lain tetap jalan)
+    import fcntl
+    locks = []
+    bebas = []
+    for perangkat in daftar:
+        try:
+            lock_file = open(perangkat.lock_file, 'w')
+        except OSError:
+            continue
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            continue
+        locks.append(lock_file)
+        bebas.append(perangkat)
+    daftar = bebas
+    if not daftar:
         # Another instance is running, exit silently
         return 0
     
     logger = Logger(LOG_FILE)
-    telegram = TelegramBot(BOT_TOKEN, CHAT_ID, logger)
-    adb = ADBManager(logger)
+    for perangkat in daftar:
+        perangkat.buka(logger)
     
     logger.info("=" * 60)
-    logger.info(f"AUTO EDU - DUAL MODE SYSTEM ({MONITORING_MODE})")
+    logger.info(f"AUTO EDU - DUAL MODE SYSTEM ({MONITORING_MODE})", event='run_mulai')
     logger.info("=" * 60)
     
     try:
-        if not validasi_konfigurasi(logger):
-            telegram.kirim_pesan_format(
-                "❌", "Konfigurasi Error",
-                "Script belum dikonfigurasi dengan benar!\n\n"
-                "Silakan edit file dan isi:\n"
-                "• BOT_TOKEN (dari @BotFather)\n"
-                "• CHAT_ID (dari @MissRose_bot atau @userinfobot)\n"
-                "• KODE_UNREG dan KODE_BELI"
-            )
+        valid = True
+        for perangkat in daftar:
+            with perangkat.aktif():
+                if validasi_konfigurasi(logger):
+                    continue
+                valid = False
+                perangkat.telegram.kirim_pesan_format(
+                    "❌", "Konfigurasi Error",
+                    "Script belum dikonfigurasi dengan benar!\n\n"
+                    "Silakan edit file dan isi:\n"
+                    "• BOT_TOKEN (dari @BotFather)\n"
+                    "• CHAT_ID (dari @MissRose_bot atau @userinfobot)\n"
+                    "• KODE_UNREG dan KODE_BELI"
+                )
+        if not valid:
             return 1
         
-        if NOTIF_STARTUP:
-            mode_info = "🟢 EFFICIENT" if MONITORING_MODE == 'EFFICIENT' else "🔴 AGGRESSIVE"
-            telegram.kirim_pesan_format(
-                "🚀", "Script Started",
-                f"Auto Edu monitoring dimulai\n"
-                f"Mode: {mode_info}\n"
-                f"Threshold: {THRESHOLD_KUOTA_GB}GB\n"
-                f"SMS Check: {JUMLAH_SMS_CEK} messages\n"
-                f"Max Age: {SMS_MAX_AGE_MINUTES} menit",
-                tingkat='info'
-            )
+        if args.daemon:
+            interval = max(5, args.interval or CHECK_INTERVAL)
+            if NOTIF_STARTUP:
+                for perangkat in daftar:
+                    with perangkat.aktif():
+                        kirim_notif_startup(perangkat.telegram, interval)
+            return jalankan_daemon(daftar, logger, interval)
         
-        if not adb.cek_koneksi():
-            telegram.kirim_pesan_format(
-                "❌", "ADB Error",
-                "Tidak dapat terhubung ke device!\n\n"
-                "Pastikan:\n"
-                "• USB debugging aktif\n"
-                "• Device terhubung ke router\n"
-                "• ADB sudah terinstall"
-            )
-            return 1
+        def cek_perangkat(perangkat):
+            if NOTIF_STARTUP:
+                kirim_notif_startup(perangkat.telegram)
+            
+            status_snapshot().data.update(run_mode='cron', interval=None)
+            success = jalankan_pengecekan(perangkat.adb, perangkat.telegram, logger)
+            
+            if MONITORING_MODE == 'AUTO':
+                interval = jadwalkan_auto(logger)
+                logger.info(f"Mode AUTO: cek berikutnya dalam {interval} detik")
+                jadwal_berikutnya(interval)
+            else:
+                # Jadwal cron: */1 (AGGRESSIVE) atau */3 (EFFICIENT)
+                periode = 60 if MONITORING_MODE == 'AGGRESSIVE' else 180
+                jadwal_berikutnya((time.time() // periode + 1) * periode - time.time())
+            return success
         
-        success = cek_kuota_dan_proses(adb, telegram, logger)
+        success = all(jalankan_paralel(daftar, cek_perangkat, logger))
         
         logger.info("=" * 60)
-        logger.success("SCRIPT SELESAI - Status: " + ("OK" if success else "WARNING"))
+        logger.success("SCRIPT SELESAI - Status: " + ("OK" if success else "WARNING"), event='run_selesai')
         logger.info("=" * 60)
         
         return 0 if success else 1
@@ -741,17 +4504,29 @@ def main():
         return 130
         
     except Exception as e:
-        logger.error(f"FATAL ERROR: {str(e)}")
-        telegram.kirim_pesan_format(
-            "💥", "Fatal Error",
-            f"Script error:\n<code>{str(e)}</code>\n\n"
-            f"Periksa log untuk detail lebih lanjut."
-        )
+        logger.error(f"FATAL ERROR: {str(e)}", event='fatal')
+        for perangkat in daftar:
+            perangkat.telegram.kirim_pesan_format(
+                "💥", "Fatal Error",
+                f"Script error:\n<code>{str(e)}</code>\n\n"
+                f"Periksa log untuk detail lebih lanjut."
+            )
         return 1
     
     finally:
+        # Satu batas waktu flush outbox untuk semua device (bukan per device)
+        batas_flush = time.monotonic() + (
+            TELEGRAM_FLUSH_TIMEOUT_STOP if args.daemon else TELEGRAM_FLUSH_TIMEOUT
+        )
+        for perangkat in daftar:
+            perangkat.tutup(max(0, batas_flush - time.monotonic()))
+        tutup_riwayat_db()
+        # Latency Telegram dari outbox yang terkirim setelah tick terakhir
+        metrik().simpan(logger)
+        logger.tutup()
+        
         # Release lock
-        if lock_file:
+        for lock_file in locks:
             try:
                 fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
                 lock_file.close()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark round trip perintah ADB: exec per perintah vs sesi adb shell vs socket
+
+Default memakai fake_adb.py + fake_adb_server.py (FAKE_ADB_LATENCY meniru
+handshake adb client); gunakan --adb adb untuk mengukur device sungguhan
+(backend socket memakai adb server di 127.0.0.1:5037).
+
+Usage:
+    python3 benchmarks/bench_adb_shell.py [--adb adb] [--n 50] [--latency 0.05]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCH_DIR.parent
+
+
+def ukur(transport, perintah, n):
+    hasil = []
+    for _ in range(n):
+        mulai = time.perf_counter()
+        transport.jalankan(perintah, timeout=30)
+        hasil.append((time.perf_counter() - mulai) * 1000)
+    hasil.sort()
+    return hasil[len(hasil) // 2], hasil[int(len(hasil) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--adb', default=str(BENCH_DIR / 'fake_adb.py'))
+    parser.add_argument('--n', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='FAKE_ADB_LATENCY per proses adb (detik, fake adb saja)')
+    parser.add_argument('--cmd', default='echo ok',
+                        help='perintah yang diukur (default: overhead transport saja)')
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.env', delete=False) as f:
+        f.write(f"ADB_BIN={args.adb}\nLOG_FILE=none\n")
+    os.environ['AUTO_EDU_ENV'] = f.name
+    os.environ['FAKE_ADB_LATENCY'] = str(args.latency)
+    sys.path.insert(0, str(ROOT_DIR))
+    sys.path.insert(0, str(BENCH_DIR))
+    pakai_fake = Path(args.adb).resolve() == (BENCH_DIR / 'fake_adb.py')
+
+    try:
+        import auto_edu
+        logger = auto_edu.Logger(None)
+
+        exec_transport = auto_edu.ADBExecTransport()
+        session = auto_edu.ADBShellSession(logger)
+        session.jalankan('true')  # buka sesi di luar pengukuran
+
+        if pakai_fake:
+            import fake_adb_server
+            _, port = fake_adb_server.mulai_di_thread()
+            socket_transport = auto_edu.ADBSocketTransport(port=port)
+        else:
+            socket_transport = auto_edu.ADBSocketTransport()
+
+        print(f"Perintah: {args.cmd!r}, n={args.n}, adb={args.adb}")
+        print(f"{'transport':<12}{'p50 (ms)':>12}{'p95 (ms)':>12}")
+        transports = (('exec', exec_transport), ('session', session), ('socket', socket_transport))
+        for nama, transport in transports:
+            p50, p95 = ukur(transport, args.cmd, args.n)
+            print(f"{nama:<12}{p50:>12.2f}{p95:>12.2f}")
+        session.tutup()
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == '__main__':
+    main()
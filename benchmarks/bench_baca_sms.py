@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark parsing inbox SMS: parser lama vs parser streaming
+
+Membuat dump inbox sintetis (default 100.000 baris), lalu menjalankan
+setiap varian di proses terpisah supaya peak RSS terukur bersih:
+
+- legacy        : subprocess.run(capture_output, text) + 3x re.search per baris
+- stream        : ADBManager.baca_sms() (streaming, kill adb setelah limit)
+- legacy-full   : parser lama tanpa limit (seluruh inbox)
+- stream-full   : parser streaming tanpa limit (seluruh inbox)
+
+Usage:
+    python3 benchmarks/bench_baca_sms.py [--rows 100000] [--limit 5]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCH_DIR.parent
+FAKE_ADB = BENCH_DIR / 'fake_adb.py'
+
+sys.path.insert(0, str(BENCH_DIR))
+from fake_adb import buat_dump  # noqa: E402
+
+VARIANTS = ['legacy', 'stream', 'legacy-full', 'stream-full']
+
+
+def baca_sms_legacy(limit):
+    """Salinan parser baca_sms() sebelum streaming (untuk pembanding)"""
+    from datetime import datetime
+
+    result = subprocess.run(
+        f'{FAKE_ADB} shell "content query --uri content://sms/inbox"',
+        shell=True,
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+
+    pesan_list = []
+    for baris in result.stdout.splitlines():
+        if not baris.strip().startswith('Row:'):
+            continue
+
+        alamat = re.search(r'address=([^,]+),', baris)
+        tanggal = re.search(r'date=(\d+),', baris)
+        isi = re.search(r'body=(.+)$', baris)
+
+        if not (alamat and tanggal and isi):
+            continue
+
+        timestamp = int(tanggal.group(1)) / 1000
+        pesan_list.append({
+            'pengirim': alamat.group(1).strip(),
+            'tanggal': datetime.fromtimestamp(timestamp).strftime('%d/%m/%Y %H:%M'),
+            'isi': isi.group(1).strip(),
+            'timestamp': timestamp
+        })
+
+        if len(pesan_list) >= limit:
+            break
+
+    return pesan_list
+
+
+def baca_sms_stream(limit):
+    import auto_edu
+    adb = auto_edu.ADBManager(auto_edu.Logger(None))
+    pesan_list, _ = adb.baca_sms(limit=limit)
+    return pesan_list
+
+
+def jalankan_varian(variant, rows, limit):
+    """Dijalankan di proses anak: cetak hasil sebagai JSON di baris terakhir"""
+    efektif = rows if variant.endswith('-full') else limit
+
+    rss_awal = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    mulai = time.perf_counter()
+    if variant.startswith('legacy'):
+        pesan_list = baca_sms_legacy(efektif)
+    else:
+        pesan_list = baca_sms_stream(efektif)
+    durasi = time.perf_counter() - mulai
+    rss_akhir = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(json.dumps({
+        'variant': variant,
+        'sms': len(pesan_list),
+        'detik': round(durasi, 4),
+        'peak_rss_kb': rss_akhir,
+        'rss_naik_kb': rss_akhir - rss_awal,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--limit', type=int, default=5)
+    parser.add_argument('--multiline', type=int, default=50,
+                        help='setiap SMS ke-N punya body multi-baris (0 = tidak ada)')
+    parser.add_argument('--variant', choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        return jalankan_varian(args.variant, args.rows, args.limit)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = os.path.join(tmp, 'inbox.txt')
+        env_file = os.path.join(tmp, 'bench.env')
+        buat_dump(inbox, args.rows, args.multiline)
+        with open(env_file, 'w') as f:
+            f.write(f"ADB_BIN={FAKE_ADB}\nLOG_FILE=none\nTIMEOUT_ADB=120\n")
+
+        env = dict(os.environ, FAKE_ADB_INBOX=inbox, AUTO_EDU_ENV=env_file,
+                   PYTHONPATH=str(ROOT_DIR))
+
+        print(f"Inbox sintetis: {args.rows} baris ({os.path.getsize(inbox) / 1e6:.1f} MB), limit={args.limit}")
+        print(f"{'variant':<14}{'sms':>8}{'waktu (s)':>12}{'peak RSS (KB)':>16}{'RSS naik (KB)':>16}")
+        for variant in VARIANTS:
+            out = subprocess.run(
+                [sys.executable, __file__, '--variant', variant,
+                 '--rows', str(args.rows), '--limit', str(args.limit)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            hasil = json.loads(out)
+            print(f"{variant:<14}{hasil['sms']:>8}{hasil['detik']:>12.4f}"
+                  f"{hasil['peak_rss_kb']:>16}{hasil['rss_naik_kb']:>16}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark Logger: open/append/close per baris vs handle ber-buffer
+
+Mensimulasikan sejumlah tick daemon (default 200 tick x 30 baris, satu
+WARN per tick) dan mengukur untuk setiap varian:
+
+- baris/detik
+- syscall write per tick (syscw dari /proc/self/io)
+- open() per tick
+
+Varian:
+- legacy    : Logger lama (open 'a' + write + close setiap baris)
+- buffered  : Logger sekarang (satu handle, flush saat WARN/ERROR & akhir tick)
+- json      : Logger sekarang dengan LOG_FORMAT=json (JSON-lines + index)
+
+stdout dialihkan ke memori supaya yang terukur hanya I/O file log.
+
+Usage:
+    python3 benchmarks/bench_logger.py [--ticks 200] [--lines 30]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import builtins
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+class LoggerLegacy:
+    """Salinan Logger sebelum buffering (untuk pembanding)"""
+
+    def __init__(self, log_file=None):
+        self.log_file = log_file
+
+    def log(self, level, message):
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        log_msg = f"[{timestamp}] [{level}] {message}"
+
+        print(log_msg)
+
+        if self.log_file:
+            try:
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(log_msg + '\n')
+            except Exception as e:
+                print(f"Warning: Gagal write log: {e}")
+
+    def flush(self):
+        pass
+
+    def tutup(self):
+        pass
+
+
+def jalankan(logger, ticks, lines):
+    """Simulasi tick: (detik, write/tick, open/tick)"""
+    asli_open = builtins.open
+    jumlah_open = [0]
+
+    def open_dihitung(*args, **kwargs):
+        jumlah_open[0] += 1
+        return asli_open(*args, **kwargs)
+
+    asli_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    builtins.open = open_dihitung
+    try:
+        w0 = syscw(asli_open)
+        mulai = time.perf_counter()
+        for t in range(ticks):
+            for i in range(lines - 1):
+                logger.log('INFO', f"Tick {t} baris {i}: Membaca 3 SMS terbaru... status OK")
+            logger.log('WARN', f"Tick {t}: kuota rendah terdeteksi")
+            logger.flush()
+            sys.stdout.seek(0)
+            sys.stdout.truncate()
+        logger.tutup()
+        detik = time.perf_counter() - mulai
+        w1 = syscw(asli_open)
+    finally:
+        builtins.open = asli_open
+        sys.stdout = asli_stdout
+    return detik, (w1 - w0) / ticks, jumlah_open[0] / ticks
+
+
+def syscw(open_fn=open):
+    """Jumlah syscall write proses ini sejauh ini (/proc/self/io)"""
+    with open_fn('/proc/self/io') as f:
+        for baris in f:
+            if baris.startswith('syscw:'):
+                return int(baris.split()[1])
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--lines', type=int, default=30, help='baris log per tick')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = Path(tmp) / 'bench.env'
+        env.write_text('LOG_FILE=none\nMAX_LOG_SIZE=1000000000\n')
+        os.environ['AUTO_EDU_ENV'] = str(env)
+        sys.path.insert(0, str(ROOT_DIR))
+        import auto_edu
+
+        varian = {
+            'legacy': lambda path: LoggerLegacy(path),
+            'buffered': lambda path: auto_edu.Logger(path),
+            'json': lambda path: auto_edu.Logger(path, format_log='json'),
+        }
+
+        total = args.ticks * args.lines
+        print(f"{args.ticks} tick x {args.lines} baris = {total} baris")
+        print(f"{'variant':<10}{'baris/s':>12}{'write/tick':>12}{'open/tick':>11}")
+        for nama, buat in varian.items():
+            path = str(Path(tmp) / f'{nama}.log')
+            detik, write_tick, open_tick = jalankan(buat(path), args.ticks, args.lines)
+            print(f"{nama:<10}{total / detik:>12.0f}{write_tick:>12.1f}{open_tick:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark overhead metrik OpenMetrics per tick
+
+Mensimulasikan pencatatan satu tick (default: 6 perintah adb, 1 SMS
+diklasifikasi, 1 request Telegram, counter cek + histogram durasi tick +
+gauge) lalu simpan() ke textfile, dan mengukur:
+
+- catat  : waktu semua pemanggilan tambah/amati/set dalam satu tick
+- simpan : gabung delta ke <file>.json (flock) + tulis textfile
+- teks   : render exposition (yang dipanggil endpoint HTTP /metrics)
+
+Hasil dibandingkan dengan durasi tick (--tick-ms, ambil p50 tick dari
+bench_suite.py) sebagai persen overhead.
+
+Usage:
+    python3 benchmarks/bench_metrik.py [--ticks 2000] [--tick-ms 200] [--perangkat 1]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+PERINTAH_ADB = ('devices', 'content', 'content', 'am', 'dumpsys', 'input')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=2000)
+    parser.add_argument('--tick-ms', type=float, default=200,
+                        help='durasi tick pembanding dalam ms (p50 dari bench_suite.py)')
+    parser.add_argument('--perangkat', type=int, default=1, help='jumlah label perangkat')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = Path(tmp) / 'bench.env'
+        env.write_text(f'LOG_FILE=none\nMETRIK_FILE={tmp}/bench.prom\n')
+        os.environ['AUTO_EDU_ENV'] = str(env)
+        os.environ['AUTO_EDU_ENV_CACHE'] = 'none'
+        sys.path.insert(0, str(ROOT_DIR))
+        import auto_edu
+
+        m = auto_edu.RegistriMetrik(f'{tmp}/bench.prom')
+        nama = [f'hp{i}' for i in range(args.perangkat)]
+        catat = simpan = 0.0
+        for t in range(args.ticks):
+            perangkat = nama[t % len(nama)]
+            mulai = time.perf_counter()
+            for perintah in PERINTAH_ADB:
+                m.amati('autoedu_adb_command_seconds', 0.08, perangkat=perangkat, perintah=perintah)
+            m.tambah('autoedu_sms_classified', perangkat=perangkat, jenis='lain')
+            m.amati('autoedu_telegram_request_seconds', 0.3, perangkat=perangkat, method='sendMessage')
+            m.tambah('autoedu_checks', perangkat=perangkat, hasil='ok')
+            m.amati('autoedu_tick_seconds', 0.2, perangkat=perangkat, mode='EFFICIENT')
+            m.set('autoedu_last_tick_timestamp_seconds', int(time.time()), perangkat=perangkat)
+            tengah = time.perf_counter()
+            m.simpan()
+            catat += tengah - mulai
+            simpan += time.perf_counter() - tengah
+
+        mulai = time.perf_counter()
+        for _ in range(200):
+            teks = m.teks()
+        render = (time.perf_counter() - mulai) / 200
+
+    catat_us = catat / args.ticks * 1e6
+    simpan_us = simpan / args.ticks * 1e6
+    total_ms = (catat + simpan) / args.ticks * 1000
+    print(f"{args.ticks} tick, {args.perangkat} perangkat, textfile {len(teks)} byte")
+    print(f"catat  : {catat_us:8.1f} us/tick")
+    print(f"simpan : {simpan_us:8.1f} us/tick")
+    print(f"teks   : {render * 1e6:8.1f} us/scrape")
+    print(f"overhead: {total_ms:.3f} ms/tick = {100 * total_ms / args.tick_ms:.2f}% "
+          f"dari tick {args.tick_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
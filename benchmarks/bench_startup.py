@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark cold start: waktu & RSS dari exec sampai panggilan ADB pertama
+
+Setiap run adalah proses python3 baru seperti tick cron. ADB_BACKEND=socket
+diarahkan ke server palsu di benchmark ini, jadi "panggilan ADB pertama"
+adalah saat koneksi ke server itu diterima. Pada saat itu diukur:
+
+- wall : detik sejak sebelum exec sampai koneksi ADB masuk
+- rss  : VmHWM proses (puncak RSS) dari /proc/<pid>/status
+
+lalu proses dihentikan (yang diukur hanya jalur start).
+
+Varian:
+- python    : `python3 -c pass` (batas bawah interpreter)
+- script    : python3 auto_edu.py (source di-compile setiap run)
+- bundle    : python3 auto_edu.pyz (hasil `auto_edu.py bundle`)
+- baseline  : python3 <file> dari --baseline, mis. versi lama:
+              git show HEAD~1:auto_edu.py > /tmp/auto_edu_lama.py
+
+Usage:
+    python3 benchmarks/bench_startup.py [--runs 20] [--baseline FILE]
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def vmhwm(pid):
+    """Puncak RSS proses dalam KB"""
+    with open(f'/proc/{pid}/status') as f:
+        for baris in f:
+            if baris.startswith('VmHWM:'):
+                return int(baris.split()[1])
+    return 0
+
+
+def satu_run(cmd, env, server):
+    """(detik sampai koneksi ADB pertama, puncak RSS KB)"""
+    mulai = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        conn, _ = server.accept()
+        detik = time.perf_counter() - mulai
+        rss = vmhwm(proc.pid)
+        conn.close()
+    finally:
+        proc.kill()
+        proc.wait()
+    return detik, rss
+
+
+def run_python(env):
+    """Batas bawah: interpreter saja (tanpa ADB, ukur sampai proses selesai)"""
+    mulai = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', 'pass'], env=env)
+    _, _, rusage = os.wait4(proc.pid, 0)
+    return time.perf_counter() - mulai, rusage.ru_maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--baseline', default=None, help='auto_edu.py versi lain sebagai pembanding')
+    args = parser.parse_args()
+
+    server = socket.socket()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('127.0.0.1', 0))
+    server.listen(8)
+    server.settimeout(30)
+    port = server.getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env_file = Path(tmp) / 'bench.env'
+        env_file.write_text(
+            'BOT_TOKEN=123:abc\nCHAT_ID=1\nNOTIF_STARTUP=false\n'
+            f'LOG_FILE={tmp}/bench.log\nDB_FILE=none\n'
+            f'STATUS_FILE={tmp}/status.json\nTELEGRAM_OUTBOX_FILE={tmp}/outbox.jsonl\n'
+            'ADB_BACKEND=socket\nADB_SERVER_HOST=127.0.0.1\n'
+            f'ADB_SERVER_PORT={port}\n'
+        )
+        env = dict(os.environ, AUTO_EDU_ENV=str(env_file),
+                   AUTO_EDU_ENV_CACHE=f'{tmp}/env.cache')
+
+        bundle = Path(tmp) / 'auto_edu.pyz'
+        subprocess.run(
+            [sys.executable, str(ROOT_DIR / 'auto_edu.py'), 'bundle', '--output', str(bundle)],
+            env=env, check=True, stdout=subprocess.DEVNULL
+        )
+
+        varian = {
+            'script': [sys.executable, str(ROOT_DIR / 'auto_edu.py')],
+            'bundle': [sys.executable, str(bundle)],
+        }
+        if args.baseline:
+            varian['baseline'] = [sys.executable, args.baseline]
+
+        hasil = {nama: [] for nama in ['python', *varian]}
+        # Selang-seling antar varian supaya cache halaman/CPU adil
+        for _ in range(args.runs):
+            hasil['python'].append(run_python(env))
+            for nama, cmd in varian.items():
+                hasil[nama].append(satu_run(cmd, env, server))
+
+    print(f"{args.runs} run per varian (sampai panggilan ADB pertama)")
+    print(f"{'variant':<10}{'p50 ms':>9}{'min ms':>9}{'max ms':>9}{'RSS KB':>9}")
+    for nama, data in hasil.items():
+        wall = sorted(d for d, _ in data)
+        rss = statistics.median(r for _, r in data)
+        print(f"{nama:<10}{statistics.median(wall) * 1000:>9.1f}{wall[0] * 1000:>9.1f}"
+              f"{wall[-1] * 1000:>9.1f}{rss:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
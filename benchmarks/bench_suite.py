@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark suite: baca SMS, tick cek kuota (EFFICIENT/AGGRESSIVE), renewal
+
+Tanpa HP & internet: fake_adb.py (inbox sintetis, latency per perintah,
+delay respon USSD, SMS konfirmasi aktivasi) dan fake_telegram.py sebagai
+pengganti api.telegram.org. Setiap skenario jalan di proses python3 baru
+(1 iterasi pemanasan + N iterasi) dan diukur:
+
+- p50 / p95 : latency per iterasi (ms)
+- cpu       : CPU user+sys per iterasi (ms), termasuk proses fake adb
+- rss       : puncak RSS proses skenario (KB)
+
+Skenario:
+- baca_sms        : ADBManager.baca_sms() dari inbox --inbox SMS (--limit)
+- tick_efficient  : cek_kuota_dan_proses() mode EFFICIENT, kuota aman
+- tick_aggressive : idem mode AGGRESSIVE
+- renewal         : proses_renewal() end to end (unreg, beli, tunggu SMS
+                    konfirmasi); termasuk jeda tetap 1 detik setelah
+                    setiap USSD, jadi iterasinya dibatasi --n-renewal
+
+State, cache klasifikasi dan inbox dikembalikan sebelum setiap iterasi
+sehingga setiap tick benar-benar membaca & mengklasifikasi SMS.
+
+Baseline:
+    python3 benchmarks/bench_suite.py --simpan /root/bench_baseline.json
+    (ubah kode)
+    python3 benchmarks/bench_suite.py --baseline /root/bench_baseline.json
+
+Dengan --baseline ditampilkan selisih tiap metrik; exit code 1 jika ada
+metrik yang naik lebih dari --toleransi persen (regresi). Overhead metrik
+OpenMetrics: simpan baseline dengan --tanpa-metrik lalu bandingkan.
+
+Usage:
+    python3 benchmarks/bench_suite.py [--n 20] [--n-renewal 5] [--inbox 200]
+        [--latency 0.005] [--ussd-delay 0.3] [--skenario NAMA ...]
+        [--tanpa-metrik] [--simpan FILE] [--baseline FILE] [--toleransi 15]
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import argparse
+import resource
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCH_DIR.parent
+FAKE_ADB = BENCH_DIR / 'fake_adb.py'
+
+SKENARIO = ('baca_sms', 'tick_efficient', 'tick_aggressive', 'renewal')
+METRIK = ('p50', 'p95', 'cpu_ms', 'rss_kb')
+
+# SMS terbaru di inbox tick: kuota masih aman (tidak memicu renewal)
+SMS_KUOTA_AMAN = "Sisa kuota Edu anda 12GB. Cek info paket di *808#"
+SMS_KUOTA_RENDAH = "Kuota Edu anda kurang dari 3GB. Segera perpanjang paket."
+
+
+def persentil(data, p):
+    """Nearest-rank: nilai ke-ceil(p/100 * n) dari data terurut"""
+    data = sorted(data)
+    return data[max(0, math.ceil(p / 100 * len(data)) - 1)]
+
+
+def cpu_detik():
+    """CPU user+sys proses ini + child yang sudah selesai"""
+    total = 0.0
+    for siapa in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        r = resource.getrusage(siapa)
+        total += r.ru_utime + r.ru_stime
+    return total
+
+
+def jalankan_skenario(nama, n, limit, hasil_file):
+    """Dijalankan di proses child: N iterasi skenario, tulis hasil JSON"""
+    sys.path.insert(0, str(ROOT_DIR))
+    import auto_edu
+
+    logger = auto_edu.Logger(None)
+    adb = auto_edu.ADBManager(logger)
+    telegram = auto_edu.TelegramBot(auto_edu.BOT_TOKEN, auto_edu.CHAT_ID, logger)
+    perangkat = auto_edu.perangkat_aktif()
+    inbox = os.environ['FAKE_ADB_INBOX']
+
+    def reset():
+        shutil.copyfile(inbox + '.asli', inbox)
+        for path in (perangkat.state_file, perangkat.sms_cache_file, perangkat.status_file):
+            if os.path.exists(path):
+                os.unlink(path)
+        perangkat.cache = None
+        perangkat.snapshot = None
+        adb.sms_id_terakhir = 0
+
+    def satu_iterasi():
+        if nama == 'baca_sms':
+            adb.baca_sms(limit=limit)
+        elif nama == 'renewal':
+            auto_edu.proses_renewal(adb, telegram, logger)
+        else:
+            auto_edu.cek_kuota_dan_proses(adb, telegram, logger)
+
+    latency = []
+    cpu_awal = None
+    for i in range(n + 1):
+        reset()
+        if i == 1:
+            # Iterasi 0 = pemanasan (buka sesi adb, koneksi Telegram, import)
+            cpu_awal = cpu_detik()
+        mulai = time.perf_counter()
+        satu_iterasi()
+        if i:
+            latency.append(time.perf_counter() - mulai)
+    # Tutup sesi adb supaya CPU-nya ikut terhitung (RUSAGE_CHILDREN)
+    adb.tutup()
+    telegram.tutup()
+    cpu = cpu_detik() - cpu_awal
+
+    with open(hasil_file, 'w') as f:
+        json.dump({
+            'latency': latency,
+            'cpu_ms': cpu / n * 1000,
+            'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }, f)
+    return 0
+
+
+def siapkan_inbox(path, jumlah, sms_terbaru):
+    sys.path.insert(0, str(BENCH_DIR))
+    from fake_adb import buat_dump
+    buat_dump(path + '.asli', jumlah)
+    with open(path + '.asli', 'r', encoding='utf-8') as f:
+        isi = f.read()
+    with open(path + '.asli', 'w', encoding='utf-8') as f:
+        f.write(isi.replace(SMS_KUOTA_RENDAH, sms_terbaru, 1))
+
+
+def ukur(nama, args, tmp, telegram_url):
+    """Jalankan skenario di proses baru, return dict metrik"""
+    mode = 'AGGRESSIVE' if nama == 'tick_aggressive' else 'EFFICIENT'
+    inbox = os.path.join(tmp, f'{nama}.inbox')
+    siapkan_inbox(inbox, args.inbox, SMS_KUOTA_RENDAH if nama == 'renewal' else SMS_KUOTA_AMAN)
+
+    env_file = os.path.join(tmp, f'{nama}.env')
+    with open(env_file, 'w') as f:
+        f.write(
+            f"BOT_TOKEN=123:abc\nCHAT_ID=1\nMONITORING_MODE={mode}\n"
+            f"ADB_BIN={FAKE_ADB}\nTELEGRAM_API_URL={telegram_url}\n"
+            f"TELEGRAM_ASYNC=false\nNOTIF_STARTUP=false\n"
+            f"LOG_FILE=none\nLOG_STDOUT=false\nDB_FILE=none\n"
+            f"STATE_FILE={tmp}/{nama}_state.json\nSMS_CACHE_FILE={tmp}/{nama}_cache.json\n"
+            f"STATUS_FILE={tmp}/{nama}_status.json\n"
+            f"JEDA_USSD=10\nKONFIRMASI_TIMEOUT=30\n"
+            f"METRIK_FILE={'none' if args.tanpa_metrik else f'{tmp}/{nama}.prom'}\n"
+        )
+    env = dict(
+        os.environ, AUTO_EDU_ENV=env_file, AUTO_EDU_ENV_CACHE=f'{tmp}/{nama}.envcache',
+        FAKE_ADB_INBOX=inbox, FAKE_ADB_LATENCY=str(args.latency),
+        FAKE_ADB_USSD_DELAY=str(args.ussd_delay), FAKE_ADB_KONFIRMASI='*808*4',
+    )
+
+    n = args.n_renewal if nama == 'renewal' else args.n
+    hasil_file = os.path.join(tmp, f'{nama}.json')
+    subprocess.run(
+        [sys.executable, __file__, '--jalankan', nama, '--n', str(n),
+         '--limit', str(args.limit), '--hasil', hasil_file],
+        env=env, check=True, stdout=subprocess.DEVNULL
+    )
+    with open(hasil_file) as f:
+        data = json.load(f)
+    return {
+        'n': n,
+        'p50': persentil(data['latency'], 50) * 1000,
+        'p95': persentil(data['latency'], 95) * 1000,
+        'cpu_ms': data['cpu_ms'],
+        'rss_kb': data['rss_kb'],
+    }
+
+
+def selisih(baru, lama):
+    return (baru - lama) / lama * 100 if lama else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=20, help='iterasi per skenario')
+    parser.add_argument('--n-renewal', type=int, default=5, help='iterasi skenario renewal')
+    parser.add_argument('--inbox', type=int, default=200, help='jumlah SMS di inbox sintetis')
+    parser.add_argument('--limit', type=int, default=5, help='limit baca_sms')
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='FAKE_ADB_LATENCY per proses adb (detik)')
+    parser.add_argument('--ussd-delay', type=float, default=0.3,
+                        help='detik sampai dialog respon USSD tampil')
+    parser.add_argument('--tg-latency', type=float, default=0.02,
+                        help='latency fake Bot API per request (detik)')
+    parser.add_argument('--tanpa-metrik', action='store_true',
+                        help='METRIK_FILE=none (ukur overhead metrik OpenMetrics)')
+    parser.add_argument('--skenario', nargs='+', choices=SKENARIO, default=list(SKENARIO))
+    parser.add_argument('--simpan', metavar='FILE', help='simpan hasil sebagai baseline JSON')
+    parser.add_argument('--baseline', metavar='FILE', help='bandingkan dengan baseline JSON')
+    parser.add_argument('--toleransi', type=float, default=15,
+                        help='persen kenaikan metrik yang dianggap regresi (default: 15)')
+    parser.add_argument('--jalankan', choices=SKENARIO, help=argparse.SUPPRESS)
+    parser.add_argument('--hasil', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.jalankan:
+        return jalankan_skenario(args.jalankan, args.n, args.limit, args.hasil)
+
+    sys.path.insert(0, str(BENCH_DIR))
+    import fake_telegram
+    server = fake_telegram.mulai_di_thread(latency=args.tg_latency)
+
+    meta = {
+        'n': args.n, 'n_renewal': args.n_renewal, 'inbox': args.inbox, 'limit': args.limit,
+        'latency': args.latency, 'ussd_delay': args.ussd_delay, 'tg_latency': args.tg_latency,
+        'metrik': not args.tanpa_metrik,
+    }
+    hasil = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for nama in args.skenario:
+            hasil[nama] = ukur(nama, args, tmp, server.url)
+    server.shutdown()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        beda = {k: (baseline['meta'].get(k), v) for k, v in meta.items()
+                if baseline['meta'].get(k) != v}
+        if beda:
+            print(f"Peringatan: parameter berbeda dari baseline: {beda}")
+
+    print(f"adb latency {args.latency * 1000:.0f} ms, USSD {args.ussd_delay}s, "
+          f"Bot API {args.tg_latency * 1000:.0f} ms, inbox {args.inbox} SMS")
+    judul = f"{'skenario':<17}{'n':>4}{'p50 ms':>10}{'p95 ms':>10}{'cpu ms':>9}{'RSS KB':>9}"
+    if baseline:
+        judul += f"{'Δp50':>9}{'Δp95':>9}{'Δcpu':>9}{'ΔRSS':>9}"
+    print(judul)
+
+    regresi = []
+    for nama, h in hasil.items():
+        baris = (f"{nama:<17}{h['n']:>4}{h['p50']:>10.1f}{h['p95']:>10.1f}"
+                 f"{h['cpu_ms']:>9.1f}{h['rss_kb']:>9}")
+        lama = (baseline or {}).get('hasil', {}).get(nama)
+        if lama:
+            for metrik in METRIK:
+                persen = selisih(h[metrik], lama[metrik])
+                tanda = '!' if persen > args.toleransi else ' '
+                if tanda == '!':
+                    regresi.append(f"{nama}.{metrik} {persen:+.0f}%")
+                baris += f"{persen:>+7.0f}%{tanda}"
+        print(baris)
+
+    if args.simpan:
+        with open(args.simpan, 'w') as f:
+            json.dump({
+                'meta': meta, 'hasil': hasil,
+                'python': platform.python_version(), 'waktu': int(time.time()),
+            }, f, indent=2)
+        print(f"Baseline disimpan ke {args.simpan}")
+
+    if regresi:
+        print(f"REGRESI (> {args.toleransi:.0f}%): {', '.join(regresi)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
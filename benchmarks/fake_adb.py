@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fake adb untuk testing & benchmark Auto Edu tanpa HP
+
+Pakai dengan mengisi ADB_BIN di file .env:
+    ADB_BIN=/root/Auto-Edu/benchmarks/fake_adb.py
+
+`adb shell` tanpa argumen membuka sh lokal (mode sesi interaktif); perintah
+device seperti content/am/input diarahkan kembali ke script ini.
+
+Environment:
+- FAKE_ADB_INBOX   : file dump output `content query` (baris Row: ...)
+                     untuk query inbox SMS; --where (dievaluasi SQLite
+                     terhadap _id/address/date seperti content provider)
+                     dan --projection _id ditiru, selain itu dikirim apa adanya
+- FAKE_ADB_LATENCY : delay per perintah dalam detik (default 0)
+- FAKE_ADB_LOGCAT  : script event untuk `logcat`, satu baris per event
+                     dengan format "<jeda detik><TAB><baris log>"; setelah
+                     script habis logcat menunggu terus seperti aslinya
+- FAKE_ADB_USSD_DELAY    : detik dari `am start ... tel:` sampai dialog
+                           respon USSD tampil (kosong = tidak ada dialog)
+- FAKE_ADB_USSD_RESPONSE : teks respon USSD yang ditampilkan dialog
+- FAKE_ADB_KONFIRMASI    : potongan kode USSD (mis. *808*4); saat kode itu
+                           dikirim, SMS konfirmasi aktivasi ditambahkan ke
+                           atas FAKE_ADB_INBOX (_id baru)
+- FAKE_ADB_DEVICES : serial yang terhubung, dipisah koma (default FAKE0001)
+- FAKE_ADB_OFFLINE : path file; selama file itu ada device dianggap dicabut
+                     (devices kosong, shell/reconnect gagal, wait-for-device
+                     menunggu sampai file dihapus)
+
+Multi device: `-s <serial>` memilih device; FAKE_ADB_INBOX, FAKE_ADB_LATENCY
+dan FAKE_ADB_USSD_* bisa di-override per device dengan akhiran _<SERIAL>,
+mis. FAKE_ADB_INBOX_HP2=/tmp/inbox_hp2. Status dialog USSD juga per device.
+"""
+
+import os
+import re
+import sys
+import time
+import shlex
+import tempfile
+from xml.sax.saxutils import escape
+
+# Perintah device yang ditiru di mode sesi interaktif
+PERINTAH_DEVICE = ('content', 'am', 'input', 'logcat', 'dumpsys', 'uiautomator')
+
+
+def ambil_env(nama, default=None, serial=None):
+    """Environment per device (<nama>_<SERIAL>), fallback ke <nama>"""
+    serial = serial or os.environ.get('FAKE_ADB_SERIAL')
+    if serial:
+        nilai = os.environ.get(f"{nama}_{serial}")
+        if nilai is not None:
+            return nilai
+    return os.environ.get(nama, default)
+
+
+def file_ussd():
+    """Waktu `am start ... tel:` terakhir (dialog USSD "terbuka" sampai keyevent)"""
+    serial = re.sub(r'\W', '_', os.environ.get('FAKE_ADB_SERIAL', ''))
+    return os.path.join(tempfile.gettempdir(), f"fake_adb_ussd_{os.getuid()}{'_' + serial if serial else ''}")
+
+
+def buat_dump(path, jumlah, multiline_setiap=0, mulai_ms=None):
+    """Tulis dump inbox sintetis (urut date DESC) ke file
+
+    multiline_setiap > 0 membuat setiap SMS ke-N punya body multi-baris.
+    """
+    if mulai_ms is None:
+        mulai_ms = int(time.time() * 1000)
+    
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(jumlah):
+            sms_id = jumlah - i
+            date_ms = mulai_ms - i * 60000
+            if i == 0:
+                body = "Kuota Edu anda kurang dari 3GB. Segera perpanjang paket."
+            elif multiline_setiap and i % multiline_setiap == 0:
+                body = f"Info promo #{sms_id}\nBaris kedua promo\nBaris ketiga, dengan koma"
+            else:
+                body = f"Pesan biasa nomor {sms_id}, dari teman"
+            f.write(f"Row: {i} _id={sms_id}, address=+62812{sms_id:07d}, date={date_ms}, body={body}\n")
+
+
+def offline(serial=None):
+    """True jika device (default: device terpilih -s) sedang dicabut"""
+    path = ambil_env('FAKE_ADB_OFFLINE', serial=serial)
+    return bool(path) and os.path.exists(path)
+
+
+def tambah_sms_konfirmasi(path):
+    """Sisipkan SMS konfirmasi aktivasi sebagai SMS terbaru di dump inbox"""
+    if not path or not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        isi = f.read()
+    m = re.match(r'Row: \d+ _id=(\d+),', isi)
+    sms_id = int(m.group(1)) + 1 if m else 1
+    baris = (f"Row: 0 _id={sms_id}, address=TELKOMSEL, date={int(time.time() * 1000)}, "
+             f"body=Paket Edu 30GB sudah aktif s.d. 30 hari.\n")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(baris + isi)
+
+
+def cmd_devices():
+    print("List of devices attached")
+    for serial in os.environ.get('FAKE_ADB_DEVICES', 'FAKE0001').split(','):
+        if serial.strip() and not offline(serial.strip()):
+            print(f"{serial.strip()}\tdevice")
+    print()
+    return 0
+
+
+def cocok_where(where):
+    """Fungsi (id, address, date) -> bool yang mengevaluasi klausa --where"""
+    import sqlite3
+    conn = sqlite3.connect(':memory:')
+    sql = f"SELECT 1 FROM (SELECT ? AS _id, ? AS address, ? AS date) WHERE {where}"
+    return lambda sms_id, alamat, tanggal: conn.execute(sql, (sms_id, alamat, tanggal)).fetchone() is not None
+
+
+def cmd_shell(args):
+    perintah = " ".join(args)
+    if perintah.startswith('content query'):
+        inbox = ambil_env('FAKE_ADB_INBOX')
+        if not inbox or not os.path.exists(inbox):
+            print("No result found.")
+            return 0
+        out = sys.stdout.buffer
+        where = args[args.index('--where') + 1] if '--where' in args else None
+        hanya_id = re.search(r"--projection _id(\s|$)", perintah)
+        if not where and not hanya_id:
+            with open(inbox, 'rb') as f:
+                while True:
+                    chunk = f.read(65536)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+            out.flush()
+            return 0
+        
+        # Filter --where dan projection _id saja
+        cocok = cocok_where(where) if where else None
+        ikut = False
+        nomor = 0
+        with open(inbox, 'rb') as f:
+            for baris in f:
+                if baris.startswith(b'Row: '):
+                    m = re.match(rb'Row: \d+ _id=(\d+), address=(.*?), date=(\d+),', baris)
+                    ikut = m is not None and (not cocok or cocok(
+                        int(m.group(1)), m.group(2).decode('utf-8', 'replace'), int(m.group(3))
+                    ))
+                    if not ikut:
+                        continue
+                    # Nomor Row dihitung ulang seperti hasil query asli
+                    baris = b'Row: %d ' % nomor + baris.split(b' ', 2)[2]
+                    nomor += 1
+                    if hanya_id:
+                        out.write(baris.split(b', address=', 1)[0] + b'\n')
+                        continue
+                if ikut and not hanya_id:
+                    out.write(baris)
+        out.flush()
+        return 0
+    
+    if perintah.startswith('logcat'):
+        return cmd_logcat()
+    if perintah.startswith('am start') and 'tel:' in perintah:
+        with open(file_ussd(), 'w') as f:
+            f.write(str(time.time()))
+        kode = ambil_env('FAKE_ADB_KONFIRMASI')
+        if kode and kode in perintah.replace('%23', '#'):
+            tambah_sms_konfirmasi(ambil_env('FAKE_ADB_INBOX'))
+        return 0
+    if perintah.startswith('input keyevent'):
+        if os.path.exists(file_ussd()):
+            os.unlink(file_ussd())
+        return 0
+    if perintah.startswith('dumpsys window'):
+        return cmd_dumpsys_window()
+    if perintah.startswith('uiautomator dump'):
+        return cmd_uiautomator_dump()
+    
+    # lainnya: sukses tanpa output
+    return 0
+
+
+def status_ussd():
+    """None (tidak ada dialog), 'running' atau 'respon'"""
+    delay = ambil_env('FAKE_ADB_USSD_DELAY')
+    if not delay or not os.path.exists(file_ussd()):
+        return None
+    with open(file_ussd()) as f:
+        dikirim = float(f.read() or 0)
+    return 'respon' if time.time() - dikirim >= float(delay) else 'running'
+
+
+def cmd_dumpsys_window():
+    if status_ussd():
+        print("  mCurrentFocus=Window{1a2b3c u0 com.android.phone/com.android.phone.MMIDialogActivity}")
+    else:
+        print("  mCurrentFocus=Window{4d5e6f u0 com.android.launcher3/com.android.launcher3.Launcher}")
+    return 0
+
+
+def cmd_uiautomator_dump():
+    if status_ussd() == 'respon':
+        teks = ambil_env('FAKE_ADB_USSD_RESPONSE', 'Paket Edu 30GB berhasil dibeli. Terima kasih')
+        isi = (
+            f'<node index="0" text="{escape(teks, {chr(34): "&quot;"})}" resource-id="android:id/message" '
+            f'class="android.widget.TextView" package="com.android.phone" />'
+            f'<node index="1" text="OK" resource-id="android:id/button1" '
+            f'class="android.widget.Button" package="com.android.phone" />'
+        )
+    else:
+        isi = (
+            '<node index="0" text="" class="android.widget.ProgressBar" package="com.android.phone" />'
+            '<node index="1" text="Kode USSD berjalan..." class="android.widget.TextView" package="com.android.phone" />'
+        )
+    print(f"<?xml version='1.0' encoding='UTF-8' standalone='yes' ?><hierarchy rotation=\"0\">"
+          f"<node index=\"0\" text=\"\" class=\"android.widget.FrameLayout\" package=\"com.android.phone\">"
+          f"{isi}</node></hierarchy>UI hierchary dumped to: /dev/tty")
+    return 0
+
+
+def cmd_logcat():
+    """Putar script FAKE_ADB_LOGCAT, lalu blok sampai di-kill atau device dicabut"""
+    # Seperti logcat asli: header buffer langsung tampil
+    print("--------- beginning of main", flush=True)
+    script = os.environ.get('FAKE_ADB_LOGCAT')
+    if script and os.path.exists(script):
+        with open(script, 'r', encoding='utf-8') as f:
+            for baris in f:
+                jeda, _, log = baris.rstrip('\n').partition('\t')
+                time.sleep(float(jeda or 0))
+                print(log, flush=True)
+    while not offline():
+        time.sleep(0.5)
+    return 1
+
+
+def siapkan_bin_perangkat():
+    """Buat wrapper content/am/input yang memanggil script ini, return dir-nya"""
+    bin_dir = os.path.join(tempfile.gettempdir(), f"fake_adb_bin_{os.getuid()}")
+    os.makedirs(bin_dir, exist_ok=True)
+    script = os.path.abspath(__file__)
+    for nama in PERINTAH_DEVICE:
+        path = os.path.join(bin_dir, nama)
+        isi = f'#!/bin/sh\nexec "{sys.executable}" "{script}" shell {nama} "$@"\n'
+        if not os.path.exists(path) or open(path).read() != isi:
+            with open(path, 'w') as f:
+                f.write(isi)
+            os.chmod(path, 0o755)
+    return bin_dir
+
+
+def env_perangkat():
+    """Environment untuk sh 'di device': PATH diawali wrapper perintah device"""
+    bin_dir = siapkan_bin_perangkat()
+    env = dict(os.environ, PATH=bin_dir + os.pathsep + os.environ.get('PATH', ''))
+    # Latency sudah dibayar sekali saat sesi dibuka
+    for nama in list(env):
+        if nama.startswith('FAKE_ADB_LATENCY'):
+            del env[nama]
+    return env
+
+
+def sesi_interaktif():
+    """Ganti proses dengan sh lokal (mode sesi `adb shell` tanpa argumen)
+
+    Dengan FAKE_ADB_OFFLINE sh jalan sebagai child yang di-kill saat device
+    dicabut, seperti sesi adb asli yang putus.
+    """
+    if not ambil_env('FAKE_ADB_OFFLINE'):
+        os.execvpe('sh', ['sh'], env_perangkat())
+    import subprocess
+    proc = subprocess.Popen(['sh'], env=env_perangkat())
+    while proc.poll() is None:
+        if offline():
+            proc.kill()
+            proc.wait()
+            return 1
+        time.sleep(0.2)
+    return proc.returncode
+
+
+def main(argv):
+    # -s <serial>: diteruskan lewat environment ke sesi sh & wrapper perintah
+    while len(argv) >= 2 and argv[0] == '-s':
+        os.environ['FAKE_ADB_SERIAL'] = argv[1]
+        argv = argv[2:]
+    
+    time.sleep(float(ambil_env('FAKE_ADB_LATENCY', '0')))
+    
+    if not argv:
+        return 1
+    if argv[0] == 'devices':
+        return cmd_devices()
+    if argv[0] == 'connect':
+        if offline():
+            print(f"failed to connect to {argv[1]}")
+            return 1
+        print(f"connected to {argv[1]}")
+        return 0
+    if argv[0] == 'wait-for-device':
+        while offline():
+            time.sleep(0.2)
+        return 0
+    if offline():
+        print("error: no devices/emulators found", file=sys.stderr)
+        return 1
+    if argv[0] == 'reconnect':
+        print("reconnecting")
+        return 0
+    if argv[0] == 'shell':
+        if len(argv) == 1:
+            return sesi_interaktif()
+        # Satu argumen (adb shell "<perintah>") diurai seperti sh di device;
+        # dari wrapper sesi argumen sudah terurai
+        return cmd_shell(shlex.split(argv[1]) if len(argv) == 2 else argv[1:])
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main(sys.argv[1:]))
+    except BrokenPipeError:
+        # Pembaca menutup pipe lebih awal (early termination)
+        sys.exit(0)
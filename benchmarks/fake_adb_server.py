@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fake adb server (pengganti server adb di port 5037) untuk ADB_BACKEND=socket
+
+Melayani subset protokol adb server yang dipakai ADBSocketTransport:
+- host:devices
+- host:transport-any / host:transport:<serial>
+- shell:<perintah>  (dijalankan di sh lokal dengan content/am/input palsu)
+
+Usage:
+    python3 benchmarks/fake_adb_server.py [--port 5037] [--serial FAKE0001]
+
+Port 0 = pilih port bebas; port yang dipakai dicetak ke stdout.
+"""
+
+import os
+import sys
+import signal
+import select
+import argparse
+import threading
+import subprocess
+import socketserver
+
+import fake_adb
+
+
+class FakeADBHandler(socketserver.BaseRequestHandler):
+    """Satu koneksi client adb"""
+
+    def _baca_pas(self, n):
+        data = b''
+        while len(data) < n:
+            chunk = self.request.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+
+    def _baca_request(self):
+        panjang = int(self._baca_pas(4), 16)
+        return self._baca_pas(panjang).decode('utf-8', 'replace')
+
+    def _okay(self, data=None):
+        self.request.sendall(b'OKAY')
+        if data is not None:
+            data = data.encode()
+            self.request.sendall(b'%04x' % len(data) + data)
+
+    def _fail(self, pesan):
+        data = pesan.encode()
+        self.request.sendall(b'FAIL' + b'%04x' % len(data) + data)
+
+    def handle(self):
+        server = self.server
+        try:
+            while True:
+                req = self._baca_request()
+                if req == 'host:devices':
+                    self._okay(f"{server.serial}\t{server.state}\n")
+                    return
+                if req == 'host:transport-any' or req == f'host:transport:{server.serial}':
+                    if server.state != 'device':
+                        self._fail(f"device '{server.serial}' {server.state}")
+                        return
+                    self._okay()
+                    continue
+                if req.startswith('host:transport:'):
+                    self._fail(f"device '{req.split(':', 2)[2]}' not found")
+                    return
+                if req.startswith('shell:'):
+                    self._okay()
+                    self._shell(req[len('shell:'):])
+                    return
+                self._fail(f"unknown host service: {req}")
+                return
+        except (ConnectionError, ValueError):
+            return
+
+    def _shell(self, perintah):
+        proc = subprocess.Popen(
+            ['sh', '-c', perintah],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=self.server.env,
+            start_new_session=True
+        )
+        try:
+            while True:
+                siap, _, _ = select.select([proc.stdout, self.request], [], [])
+                if self.request in siap and not self.request.recv(4096):
+                    # Client menutup socket (perintah tanpa output, mis. logcat)
+                    raise ConnectionError
+                if proc.stdout in siap:
+                    chunk = proc.stdout.read1(65536)
+                    if not chunk:
+                        break
+                    self.request.sendall(chunk)
+        except OSError:
+            # Client menutup socket lebih awal: hentikan seluruh proses grup
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        finally:
+            proc.stdout.close()
+            proc.wait()
+
+
+class FakeADBServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, alamat, serial='FAKE0001', state='device'):
+        super().__init__(alamat, FakeADBHandler)
+        self.serial = serial
+        self.state = state
+        self.env = fake_adb.env_perangkat()
+
+
+def mulai_di_thread(port=0, serial='FAKE0001'):
+    """Jalankan server di background thread, return (server, port)"""
+    server = FakeADBServer(('127.0.0.1', port), serial=serial)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=5037)
+    parser.add_argument('--serial', default='FAKE0001')
+    parser.add_argument('--state', default='device',
+                        help='status device: device / offline / unauthorized')
+    args = parser.parse_args()
+
+    server = FakeADBServer(('127.0.0.1', args.port), serial=args.serial, state=args.state)
+    print(server.server_address[1], flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
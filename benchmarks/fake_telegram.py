@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fake Telegram Bot API (pengganti api.telegram.org) untuk testing & benchmark
+
+Pakai dengan mengisi TELEGRAM_API_URL di file .env:
+    TELEGRAM_API_URL=http://127.0.0.1:8081
+
+Mendukung HTTP/1.1 keep-alive dan mencatat setiap request (method, params,
+nomor koneksi) supaya pemakaian ulang koneksi bisa diverifikasi. Pesan yang
+dikirim disimpan di .pesan (message_id -> teks): editMessageText untuk pesan
+yang tidak ada (mis. dihapus lewat .pesan.pop()) dibalas 400 seperti aslinya.
+
+Usage:
+    python3 benchmarks/fake_telegram.py [--port 8081] [--latency 0.05] [--fail-429 N]
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.jumlah_koneksi += 1
+            self.koneksi_id = self.server.jumlah_koneksi
+
+    def _balas(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        panjang = int(self.headers.get('Content-Length', 0))
+        params = dict(urllib.parse.parse_qsl(self.rfile.read(panjang).decode()))
+        # Path: /bot<token>/<method>
+        method = self.path.rsplit('/', 1)[-1]
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        with server.lock:
+            server.requests.append({
+                'method': method,
+                'params': params,
+                'koneksi': self.koneksi_id,
+                'waktu': time.time(),
+            })
+            if server.sisa_429 > 0:
+                server.sisa_429 -= 1
+                return self._balas(429, {
+                    'ok': False, 'error_code': 429,
+                    'description': 'Too Many Requests: retry after 1',
+                    'parameters': {'retry_after': 1},
+                })
+            server.message_id += 1
+            message_id = server.message_id
+
+            if method == 'editMessageText':
+                message_id = int(params.get('message_id', 0))
+                if message_id not in server.pesan:
+                    return self._balas(400, {
+                        'ok': False, 'error_code': 400,
+                        'description': 'Bad Request: message to edit not found',
+                    })
+                if server.pesan[message_id] == params.get('text', ''):
+                    return self._balas(400, {
+                        'ok': False, 'error_code': 400,
+                        'description': 'Bad Request: message is not modified',
+                    })
+            if method in ('sendMessage', 'editMessageText'):
+                server.pesan[message_id] = params.get('text', '')
+
+        if method in ('sendMessage', 'editMessageText'):
+            hasil = {
+                'message_id': message_id,
+                'chat': {'id': params.get('chat_id')},
+                'date': int(time.time()),
+                'text': params.get('text', ''),
+            }
+        else:
+            hasil = True
+        self._balas(200, {'ok': True, 'result': hasil})
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, alamat, latency=0.0, fail_429=0):
+        super().__init__(alamat, FakeTelegramHandler)
+        self.latency = latency
+        self.sisa_429 = fail_429
+        self.requests = []
+        self.jumlah_koneksi = 0
+        self.message_id = 1000
+        self.pesan = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def mulai_di_thread(port=0, **kwargs):
+    """Jalankan server di background thread, return server (lihat .url)"""
+    server = FakeTelegramServer(('127.0.0.1', port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--fail-429', type=int, default=0,
+                        help='balas N request pertama dengan HTTP 429')
+    args = parser.parse_args()
+
+    server = FakeTelegramServer(('127.0.0.1', args.port), args.latency, args.fail_429)
+    print(server.url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
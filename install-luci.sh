@@ -42,7 +42,7 @@ fi
 # Step 1: Dependencies
 echo "▶ STEP 1/7: Installing Dependencies"
 opkg update > /dev/null 2>&1
-for pkg in python3 python3-urllib python3-json adb curl; do
+for pkg in python3 python3-urllib python3-json python3-sqlite3 adb curl; do
     opkg list-installed 2>/dev/null | grep -q "^$pkg " && print_success "$pkg OK" || {
         print_info "Installing $pkg..."
         opkg install $pkg > /dev/null 2>&1 && print_success "$pkg installed"
@@ -60,6 +60,8 @@ for pkg in python3 curl; do
         opkg install $pkg > /dev/null 2>&1 && print_success "$pkg installed" || { print_error "Failed $pkg"; exit 1; }
     }
 done
+# Optional: run/renewal history database (auto_edu.db)
+opkg install python3-sqlite3 > /dev/null 2>&1 && print_success "python3-sqlite3 OK" || print_warning "python3-sqlite3 not installed (history DB disabled)"
 command -v adb > /dev/null 2>&1 && print_success "ADB: $(command -v adb)" || print_warning "ADB not found"
 echo ""
 
@@ -202,7 +204,12 @@ echo ""
 echo "▶ STEP 6/8: Setup Cron"
 if [ -n "$CRON_INTERVAL" ]; then
     crontab -l 2>/dev/null | grep -v "auto_edu.py" | crontab - 2>/dev/null || true
-    (crontab -l 2>/dev/null; echo "$CRON_INTERVAL AUTO_EDU_ENV=$ENV_FILE python3 $SCRIPT_FILE") | crontab -
+    # Bytecode bundle (auto_edu.pyz): no compile of the script on every tick
+    RUN_FILE="$SCRIPT_FILE"
+    if AUTO_EDU_ENV="$ENV_FILE" python3 "$SCRIPT_FILE" bundle > /dev/null 2>&1; then
+        RUN_FILE="$INSTALL_DIR/auto_edu.pyz"
+    fi
+    (crontab -l 2>/dev/null; echo "$CRON_INTERVAL AUTO_EDU_ENV=$ENV_FILE python3 $RUN_FILE") | crontab -
     /etc/init.d/cron restart > /dev/null 2>&1 || true
     print_success "Cron: $CRON_INTERVAL"
 fi
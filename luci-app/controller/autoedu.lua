@@ -60,210 +60,195 @@ function index()
 		call("api_test")).leaf = true
 end
 
--- Update statistics from log file
-function update_stats()
-	local log_file = uci:get("autoedu", "config", "log_file") or "/tmp/auto_edu.log"
-	
-	if not nixio.fs.access(log_file) then
-		return
+local function read_json(path)
+	local content = nixio.fs.readfile(path)
+	local data = content and json.parse(content)
+	return type(data) == "table" and data or nil
+end
+
+-- Read the status snapshots written by auto_edu.py (file reads, no subprocess).
+-- The first device writes status_file, the others <status_file>.<name>.json
+local function read_snapshots()
+	local path = uci:get("autoedu", "config", "status_file") or "/tmp/auto_edu_status.json"
+	local snaps = {}
+	local snap = read_json(path)
+	if snap then
+		snaps[#snaps + 1] = snap
 	end
-	
-	-- Count script runs (total checks)
-	local checks = tonumber(sys.exec("grep -c 'AUTO EDU - DUAL MODE' " .. log_file .. " 2>/dev/null") or "0")
-	
-	-- Count renewals
-	local renewals = tonumber(sys.exec("grep -c 'MEMULAI PROSES RENEWAL' " .. log_file .. " 2>/dev/null") or "0")
-	
-	-- Update UCI stats
-	if checks > 0 then
-		uci:set("autoedu", "stats", "total_checks", tostring(checks))
+	local files = nixio.fs.glob((path:gsub("%.json$", "")) .. ".*.json")
+	for file in files or function() end do
+		snap = read_json(file)
+		if snap then
+			snaps[#snaps + 1] = snap
+		end
 	end
-	
-	if renewals > 0 then
-		uci:set("autoedu", "stats", "total_renewals", tostring(renewals))
+	return snaps
+end
+
+local function daemon_alive(snap)
+	return snap.run_mode == "daemon" and snap.pid ~= nil
+		and snap.fase ~= "berhenti" and nixio.fs.access("/proc/" .. snap.pid) ~= nil
+end
+
+local function latest(a, b)
+	if not a or (b and (b.waktu or 0) > (a.waktu or 0)) then
+		return b
 	end
-	
-	-- Calculate success rate
-	if checks > 0 then
-		local success_rate = math.floor((checks - renewals) / checks * 100)
-		uci:set("autoedu", "stats", "success_rate", tostring(success_rate))
+	return a
+end
+
+-- One view over all devices: first device's fields, newest last check and
+-- renewal, earliest next check, counters summed, plus a per-device list
+local function read_snapshot()
+	local snaps = read_snapshots()
+	local merged = {}
+	for k, v in pairs(snaps[1] or {}) do
+		merged[k] = v
+	end
+	if #snaps < 2 then
+		merged.daemon_active = snaps[1] ~= nil and daemon_alive(snaps[1])
+		return merged
 	end
 	
-	uci:commit("autoedu")
+	local counters = {checks = 0, renewals = 0, checks_24h = 0, renewals_24h = 0}
+	local ok_24h = 0
+	merged.devices = {}
+	merged.daemon_active = false
+	for _, snap in ipairs(snaps) do
+		local c = snap.counters or {}
+		for name in pairs(counters) do
+			counters[name] = counters[name] + (c[name] or 0)
+		end
+		ok_24h = ok_24h + (c.renewals_24h or 0) * (c.success_rate or 100) / 100
+		merged.last_check = latest(merged.last_check, snap.last_check)
+		merged.last_renewal = latest(merged.last_renewal, snap.last_renewal)
+		if snap.next_check and (not merged.next_check or snap.next_check < merged.next_check) then
+			merged.next_check = snap.next_check
+		end
+		merged.daemon_active = merged.daemon_active or daemon_alive(snap)
+		local adb = snap.adb or {}
+		table.insert(merged.devices, {
+			name = snap.perangkat or "default",
+			adb_connected = (adb.terhubung == true),
+			adb_device = adb.device,
+			phase = snap.fase,
+			last_check = snap.last_check,
+		})
+	end
+	counters.success_rate = counters.renewals_24h > 0
+		and math.floor(100 * ok_24h / counters.renewals_24h + 0.5) or 100
+	merged.counters = counters
+	return merged
+end
+
+local function format_time(ts)
+	return os.date("%d/%m/%Y %H:%M:%S", ts)
+end
+
+local function format_ago(ts)
+	local mins_ago = math.floor((os.time() - ts) / 60)
+	if mins_ago < 1 then
+		return "just now"
+	elseif mins_ago < 60 then
+		return mins_ago .. " min ago"
+	elseif mins_ago < 1440 then
+		return math.floor(mins_ago / 60) .. " hour(s) ago"
+	end
+	return math.floor(mins_ago / 1440) .. " day(s) ago"
 end
 
 -- API: Get service status
 function api_status()
-	-- Update stats first
-	update_stats()
-	
+	local snap = read_snapshot()
 	local status = {}
 	
 	-- Check if enabled in UCI
 	status.enabled = (uci:get("autoedu", "config", "enabled") == "1")
+	status.mode = uci:get("autoedu", "config", "mode") or snap.mode or "EFFICIENT"
+	local run_mode = uci:get("autoedu", "config", "run_mode") or "cron"
 	
-	-- Check if cron is active
-	local cron_check = sys.exec("crontab -l 2>/dev/null | grep auto_edu.py")
-	status.cron_active = (cron_check ~= "")
-	
-	-- Service is running if enabled AND cron active
-	status.running = status.enabled and status.cron_active
+	-- Daemon is alive if a PID that wrote a snapshot still exists
+	status.daemon_active = snap.daemon_active
+	status.cron_active = (status.enabled and run_mode == "cron")
 	
-	-- Get mode from UCI
-	status.mode = uci:get("autoedu", "config", "mode") or "EFFICIENT"
+	-- Service is running if enabled AND (cron OR daemon) active
+	status.running = status.enabled and (status.cron_active or status.daemon_active)
 	
-	-- Get cron schedule
 	if status.cron_active then
-		local interval = cron_check:match("^([^%s]+%s+[^%s]+%s+[^%s]+%s+[^%s]+%s+[^%s]+)")
-		if interval then
-			status.cron_schedule = interval
-			-- Translate cron to readable
-			if interval:match("%*/1") then
-				status.cron_readable = "Every 1 minute"
-			elseif interval:match("%*/3") then
-				status.cron_readable = "Every 3 minutes"
-			elseif interval:match("%*/5") then
-				status.cron_readable = "Every 5 minutes"
-			else
-				status.cron_readable = interval
-			end
+		if status.mode == "AUTO" then
+			status.cron_schedule = "*/1 * * * *"
+			status.cron_readable = "Adaptive (cron every minute)"
+		elseif status.mode == "AGGRESSIVE" then
+			status.cron_schedule = "*/1 * * * *"
+			status.cron_readable = "Every 1 minute"
 		else
-			status.cron_schedule = "Active"
-			status.cron_readable = "Active"
+			status.cron_schedule = "*/3 * * * *"
+			status.cron_readable = "Every 3 minutes"
+		end
+	elseif status.daemon_active then
+		status.cron_schedule = "Daemon"
+		if status.mode == "AUTO" then
+			status.cron_readable = "Daemon (adaptive interval)"
+		else
+			status.cron_readable = "Daemon (every " .. (snap.interval or "?") .. " sec)"
 		end
 	else
 		status.cron_schedule = "Not configured"
 		status.cron_readable = "Not configured"
 	end
 	
-	-- Get last check time from log
-	local log_file = uci:get("autoedu", "config", "log_file") or "/tmp/auto_edu.log"
-	if nixio.fs.access(log_file) then
-		-- Get last "Script Started" or "SELESAI" line
-		local last_check_line = sys.exec("grep -E 'Script Started|SELESAI' " .. log_file .. " | tail -1")
-		
-		if last_check_line and last_check_line ~= "" then
-			-- Try to extract timestamp [DD/MM/YYYY HH:MM:SS]
-			local timestamp = last_check_line:match("%[([^%]]+)%]")
-			if timestamp then
-				status.last_check = timestamp
-				
-				-- Calculate time ago
-				local pattern = "(%d+)/(%d+)/(%d+) (%d+):(%d+):(%d+)"
-				local d, m, y, h, min, s = timestamp:match(pattern)
-				if d and m and y then
-					local log_time = os.time({year=y, month=m, day=d, hour=h, min=min, sec=s})
-					local diff = os.time() - log_time
-					local mins_ago = math.floor(diff / 60)
-					
-					if mins_ago < 1 then
-						status.last_check_ago = "just now"
-					elseif mins_ago < 60 then
-						status.last_check_ago = mins_ago .. " min ago"
-					else
-						local hours = math.floor(mins_ago / 60)
-						status.last_check_ago = hours .. " hour(s) ago"
-					end
-				end
-			else
-				status.last_check = "Unknown"
-				status.last_check_ago = "unknown"
-			end
-		else
-			status.last_check = "Not running yet"
-			status.last_check_ago = ""
-		end
+	-- Last check / renewal / next check (epoch seconds in the snapshot)
+	local last_check = snap.last_check or {}
+	if last_check.waktu then
+		status.last_check = format_time(last_check.waktu)
+		status.last_check_ago = format_ago(last_check.waktu)
+		status.last_check_status = last_check.status
 	else
-		status.last_check = "No logs yet"
+		status.last_check = "Not running yet"
 		status.last_check_ago = ""
 	end
 	
-	-- Get last renewal time
-	local renewal_file = "/tmp/auto_edu_last_renewal"
-	if nixio.fs.access(renewal_file) then
-		local f = io.open(renewal_file, "r")
-		if f then
-			local timestamp_str = f:read("*all")
-			f:close()
-			
-			-- Remove whitespace/newlines
-			timestamp_str = timestamp_str:match("^%s*(.-)%s*$")
-			
-			local timestamp = tonumber(timestamp_str)
-			if timestamp and timestamp > 0 then
-				status.last_renewal = os.date("%d/%m/%Y %H:%M:%S", timestamp)
-				
-				-- Calculate time ago
-				local diff = os.time() - timestamp
-				local mins_ago = math.floor(diff / 60)
-				
-				if mins_ago < 60 then
-					status.last_renewal_ago = mins_ago .. " min ago"
-				elseif mins_ago < 1440 then
-					local hours = math.floor(mins_ago / 60)
-					status.last_renewal_ago = hours .. " hour(s) ago"
-				else
-					local days = math.floor(mins_ago / 1440)
-					status.last_renewal_ago = days .. " day(s) ago"
-				end
-			else
-				status.last_renewal = "Never"
-				status.last_renewal_ago = ""
-			end
-		else
-			status.last_renewal = "Never"
-			status.last_renewal_ago = ""
-		end
+	local last_renewal = snap.last_renewal or {}
+	if last_renewal.waktu then
+		status.last_renewal = format_time(last_renewal.waktu)
+		status.last_renewal_ago = format_ago(last_renewal.waktu)
+		status.last_renewal_status = last_renewal.status
 	else
 		status.last_renewal = "Never"
 		status.last_renewal_ago = ""
 	end
 	
-	-- Get next check time (based on cron and last check)
-	if status.cron_active and status.last_check ~= "No logs yet" and status.last_check ~= "Unknown" then
-		-- Parse last check time
-		local pattern = "(%d+)/(%d+)/(%d+) (%d+):(%d+):(%d+)"
-		local d, m, y, h, min, s = status.last_check:match(pattern)
-		
-		if d and m and y then
-			local last_time = os.time({year=y, month=m, day=d, hour=h, min=min, sec=s})
-			
-			-- Determine interval in seconds
-			local interval_secs = 180 -- default 3 minutes
-			if status.mode == "AGGRESSIVE" then
-				interval_secs = 60 -- 1 minute
-			end
-			
-			local next_time = last_time + interval_secs
-			local diff = next_time - os.time()
-			
-			if diff > 0 then
-				local mins = math.floor(diff / 60)
-				local secs = diff % 60
-				if mins > 0 then
-					status.next_check = "in " .. mins .. " min " .. secs .. " sec"
-				else
-					status.next_check = "in " .. secs .. " sec"
-				end
+	if snap.next_check and (status.cron_active or status.daemon_active) then
+		local diff = snap.next_check - os.time()
+		if diff > 0 then
+			local mins = math.floor(diff / 60)
+			local secs = diff % 60
+			if mins > 0 then
+				status.next_check = "in " .. mins .. " min " .. secs .. " sec"
 			else
-				status.next_check = "now"
+				status.next_check = "in " .. secs .. " sec"
 			end
 		else
-			status.next_check = "unknown"
+			status.next_check = "now"
 		end
 	else
 		status.next_check = "unknown"
 	end
 	
-	-- Get ADB status
-	status.adb_connected = (sys.call("adb devices 2>/dev/null | grep -q 'device$'") == 0)
+	-- ADB state as seen by the last check
+	local adb = snap.adb or {}
+	status.adb_connected = (adb.terhubung == true)
 	if status.adb_connected then
-		-- Get device name
-		local device_line = sys.exec("adb devices 2>/dev/null | grep -v 'List' | grep device")
-		local device_id = device_line:match("^([^%s]+)")
-		status.adb_device = device_id or "Connected"
+		status.adb_device = adb.device or "Connected"
 	end
 	
+	status.devices = snap.devices
+	
+	status.phase = snap.fase
+	status.classification = snap.klasifikasi_terakhir
+	status.forecast = snap.prediksi
+	status.counters = snap.counters
+	
 	-- Get Telegram config status
 	local bot_token = uci:get("autoedu", "config", "bot_token") or ""
 	local chat_id = uci:get("autoedu", "config", "chat_id") or ""
@@ -275,27 +260,14 @@ end
 
 -- API: Get statistics
 function api_stats()
-	local stats = {}
-	
-	-- Read from UCI stats
-	stats.total_checks = tonumber(uci:get("autoedu", "stats", "total_checks") or 0)
-	stats.total_renewals = tonumber(uci:get("autoedu", "stats", "total_renewals") or 0)
-	stats.success_rate = tonumber(uci:get("autoedu", "stats", "success_rate") or 100)
-	
-	-- Calculate from logs if available
-	local log_file = uci:get("autoedu", "config", "log_file") or "/tmp/auto_edu.log"
-	if nixio.fs.access(log_file) then
-		-- Count checks in last 24h
-		local checks_24h = sys.exec("grep -c 'Script Started' " .. log_file .. " 2>/dev/null || echo 0")
-		stats.checks_24h = tonumber(checks_24h) or 0
-		
-		-- Count renewals in last 24h
-		local renewals_24h = sys.exec("grep -c 'PROSES RENEWAL SELESAI' " .. log_file .. " 2>/dev/null || echo 0")
-		stats.renewals_24h = tonumber(renewals_24h) or 0
-	else
-		stats.checks_24h = 0
-		stats.renewals_24h = 0
-	end
+	local counters = read_snapshot().counters or {}
+	local stats = {
+		total_checks = counters.checks or 0,
+		total_renewals = counters.renewals or 0,
+		checks_24h = counters.checks_24h or 0,
+		renewals_24h = counters.renewals_24h or 0,
+		success_rate = counters.success_rate or 100,
+	}
 	
 	http.prepare_content("application/json")
 	http.write_json(stats)
@@ -323,7 +295,8 @@ function api_logs()
 	
 	-- Filter by level if not "all"
 	if level ~= "all" then
-		cmd = cmd .. " | grep -i '\\[" .. level:upper() .. "\\]'"
+		-- Cocok untuk format text ([LEVEL]) maupun json ("level":"LEVEL")
+		cmd = cmd .. " | grep -iE '\\[" .. level:upper() .. "\\]|\"level\":\"" .. level:upper() .. "\"'"
 	end
 	
 	local log_content = sys.exec(cmd)
@@ -375,16 +348,22 @@ function api_action()
 		result.message = "Service restarted"
 		
 	elseif action == "run_now" then
-		-- Run script immediately
-		local script = "/usr/share/autoedu/auto_edu.py"
-		local env_file = "/root/Auto-Edu/auto_edu.env"
-		sys.call("AUTO_EDU_ENV=" .. env_file .. " /usr/bin/python3 " .. script .. " &")
-		result.success = true
-		result.message = "Script executed"
+		-- Daemon running: SIGUSR1 triggers an immediate check
+		if sys.call("pkill -USR1 -f 'auto_edu.py --daemon' >/dev/null 2>&1") == 0 then
+			result.success = true
+			result.message = "Check triggered on running daemon"
+		else
+			-- Run script immediately
+			local script = "/usr/share/autoedu/auto_edu.py"
+			local env_file = "/root/Auto-Edu/auto_edu.env"
+			sys.call("AUTO_EDU_ENV=" .. env_file .. " /usr/bin/python3 " .. script .. " --force &")
+			result.success = true
+			result.message = "Script executed"
+		end
 		
 	elseif action == "clear_logs" then
 		local log_file = uci:get("autoedu", "config", "log_file") or "/tmp/auto_edu.log"
-		sys.call("echo '' > " .. log_file)
+		sys.call("echo '' > " .. log_file .. "; rm -f " .. log_file .. ".idx")
 		result.success = true
 		result.message = "Logs cleared"
 		
@@ -17,6 +17,20 @@ enabled = s:option(Flag, "enabled", translate("Enable Service"),
 enabled.rmempty = false
 enabled.default = "0"
 
+run_mode = s:option(ListValue, "run_mode", translate("Run Mode"),
+	translate("Cron starts a new process every interval. Daemon (opt-in) keeps one process alive under procd (lowest CPU); switching removes the cron entry."))
+run_mode:value("cron", translate("Cron (default)"))
+run_mode:value("daemon", translate("Daemon"))
+run_mode.default = "cron"
+run_mode.rmempty = false
+
+check_interval = s:option(Value, "check_interval", translate("Check Interval (seconds)"),
+	translate("Daemon mode only. Leave empty to follow the monitoring mode (AGGRESSIVE: 60, EFFICIENT: 180)."))
+check_interval.datatype = "range(5,3600)"
+check_interval.rmempty = true
+check_interval.placeholder = "60 / 180"
+check_interval:depends("run_mode", "daemon")
+
 -- Telegram Settings Section
 telegram = m:section(TypedSection, "autoedu", translate("Telegram Settings"))
 telegram.anonymous = true
@@ -132,6 +146,24 @@ threshold.datatype = "range(1,30)"
 threshold.default = "3"
 threshold.rmempty = false
 
+kuota_paket = quota:option(Value, "kuota_paket", translate("Package Size (GB)"),
+	translate("Quota right after renewal, used to forecast when it runs out"))
+kuota_paket.datatype = "range(1,500)"
+kuota_paket.default = "30"
+kuota_paket.rmempty = false
+
+prediksi_renewal = quota:option(Flag, "prediksi_renewal", translate("Pre-emptive Renewal"),
+	translate("Renew before the forecast exhaustion time instead of waiting for the low-quota SMS"))
+prediksi_renewal.default = "0"
+prediksi_renewal.rmempty = false
+
+prediksi_margin = quota:option(Value, "prediksi_margin", translate("Safety Margin (seconds)"),
+	translate("How long before the forecast exhaustion time to renew"))
+prediksi_margin.datatype = "range(10,3600)"
+prediksi_margin.default = "120"
+prediksi_margin.rmempty = false
+prediksi_margin:depends("prediksi_renewal", "1")
+
 -- Notification Settings Section
 notif = m:section(TypedSection, "autoedu", translate("Notification Settings"))
 notif.anonymous = true
@@ -152,6 +184,11 @@ notif_detail = notif:option(Flag, "notif_detail", translate("Detailed Notificati
 notif_detail.default = "1"
 notif_detail.rmempty = false
 
+live_status = notif:option(Flag, "live_status", translate("Live Status Message"),
+	translate("Edit one pinned status message instead of sending a new message per event (failures still send a new message)"))
+live_status.default = "0"
+live_status.rmempty = false
+
 o = notif:option(DummyValue, "_info", " ")
 o.rawhtml = true
 o.default = [[
@@ -186,22 +223,53 @@ advanced.anonymous = true
 advanced.addremove = false
 
 jeda_ussd = advanced:option(Value, "jeda_ussd", translate("USSD Delay (seconds)"),
-	translate("Delay between USSD commands"))
+	translate("Maximum wait for the USSD response. With response detection the script continues as soon as the reply dialog appears."))
 jeda_ussd.datatype = "range(5,30)"
 jeda_ussd.default = "10"
 jeda_ussd.rmempty = false
 
+ussd_detect = advanced:option(Flag, "ussd_detect", translate("USSD Response Detection"),
+	translate("Read the USSD reply dialog on the phone (uiautomator) and continue as soon as it appears"))
+ussd_detect.default = "1"
+ussd_detect.rmempty = false
+
 timeout_adb = advanced:option(Value, "timeout_adb", translate("ADB Timeout (seconds)"),
 	translate("Timeout for ADB operations"))
 timeout_adb.datatype = "range(10,60)"
 timeout_adb.default = "15"
 timeout_adb.rmempty = false
 
+konfirmasi_timeout = advanced:option(Value, "konfirmasi_timeout", translate("Activation Confirmation Timeout (seconds)"),
+	translate("After buying the package, wait up to this long for the operator's activation SMS"))
+konfirmasi_timeout.datatype = "range(10,600)"
+konfirmasi_timeout.default = "90"
+konfirmasi_timeout.rmempty = false
+
+adb_backend = advanced:option(ListValue, "adb_backend", translate("ADB Backend"),
+	translate("How commands reach the phone. Socket talks to the adb server (port 5037) directly without running the adb binary."))
+adb_backend:value("session", translate("Persistent adb shell (recommended)"))
+adb_backend:value("socket", translate("adb server socket (no adb exec)"))
+adb_backend:value("exec", translate("One adb process per command (legacy)"))
+adb_backend.default = "session"
+adb_backend.rmempty = false
+
+sms_event_watch = advanced:option(Flag, "sms_event_watch", translate("Instant SMS Detection"),
+	translate("Daemon mode: watch logcat for incoming SMS and check within a second. Interval polling stays as fallback."))
+sms_event_watch.default = "1"
+sms_event_watch.rmempty = false
+
 log_file = advanced:option(Value, "log_file", translate("Log File Path"),
 	translate("Path to log file"))
 log_file.default = "/tmp/auto_edu.log"
 log_file.rmempty = false
 
+log_format = advanced:option(ListValue, "log_format", translate("Log Format"),
+	translate("JSON lines are easier to parse by other tools. Both are indexed for 'auto_edu.py logs'."))
+log_format:value("text", translate("Text"))
+log_format:value("json", translate("JSON lines"))
+log_format.default = "text"
+log_format.rmempty = false
+
 max_log_size = advanced:option(Value, "max_log_size", translate("Max Log Size (bytes)"),
 	translate("Maximum log file size before rotation"))
 max_log_size.datatype = "uinteger"
@@ -17,6 +17,8 @@ function current.cfgvalue(self, section)
 	local mode = self.map:get(section, self.option) or "EFFICIENT"
 	if mode == "AGGRESSIVE" then
 		return "🔴 AGGRESSIVE (Extreme Usage)"
+	elseif mode == "AUTO" then
+		return "🟡 AUTO (Adaptive Interval)"
 	else
 		return "🟢 EFFICIENT (Recommended)"
 	end
@@ -27,6 +29,7 @@ mode = s:option(ListValue, "mode", translate("Select Mode"),
 	translate("Choose monitoring mode based on your usage pattern"))
 mode:value("EFFICIENT", "🟢 EFFICIENT - Recommended (Every 3 minutes)")
 mode:value("AGGRESSIVE", "🔴 AGGRESSIVE - Extreme Usage (Every 1 minute)")
+mode:value("AUTO", "🟡 AUTO - Adaptive (30 seconds to 5 minutes)")
 mode.default = "EFFICIENT"
 mode.rmempty = false
 
@@ -92,6 +95,10 @@ comparison.default = [[
 	color: #ef4444;
 	font-weight: 700;
 }
+.mode-auto {
+	color: #eab308;
+	font-weight: 700;
+}
 
 /* Note */
 .cbi-value-description {
@@ -135,22 +142,36 @@ comparison.default = [[
 		</ul>
 	</div>
 
+	<div class="mode-desc" style="border-color: rgba(234,179,8,0.9);">
+		<h4>🟡 AUTO Mode (Adaptive)</h4>
+		<ul>
+			<li><strong>Best for:</strong> Usage that changes during the day</li>
+			<li><strong>Interval:</strong> 30 seconds right after a renewal or during heavy use, up to 5 minutes when idle</li>
+			<li><strong>SMS Check:</strong> 3–5 messages (follows the interval)</li>
+			<li><strong>Max Age:</strong> 5–15 minutes (follows the interval)</li>
+			<li><strong>Logic:</strong> Priority (kuota → konfirmasi)</li>
+			<li><strong>Signals:</strong> time since last renewal, recent quota SMS, quota forecast</li>
+			<li>⚖️ AGGRESSIVE detection when it matters, EFFICIENT cost when idle</li>
+		</ul>
+	</div>
+
 	<table class="mode-table">
 		<thead>
 			<tr>
 				<th>Feature</th>
 				<th class="mode-efficient">EFFICIENT</th>
 				<th class="mode-aggressive">AGGRESSIVE</th>
+				<th class="mode-auto">AUTO</th>
 			</tr>
 		</thead>
 		<tbody>
-			<tr><td>Cron Interval</td><td>Every 3 minutes</td><td>Every 1 minute</td></tr>
-			<tr><td>SMS Check</td><td>3 messages</td><td>5 messages</td></tr>
-			<tr><td>Max SMS Age</td><td>15 minutes</td><td>5 minutes</td></tr>
-			<tr><td>Detection Time</td><td>0–3 minutes</td><td>0–1 minute</td></tr>
-			<tr><td>CPU Usage</td><td>~1%</td><td>~3%</td></tr>
-			<tr><td>Handle Speed</td><td>30GB/30+ min</td><td>30GB/5–10 min</td></tr>
-			<tr><td>Best For</td><td>95% users</td><td>5% extreme users</td></tr>
+			<tr><td>Cron Interval</td><td>Every 3 minutes</td><td>Every 1 minute</td><td>30 sec – 5 min (cron: 1–5 min)</td></tr>
+			<tr><td>SMS Check</td><td>3 messages</td><td>5 messages</td><td>3–5 messages</td></tr>
+			<tr><td>Max SMS Age</td><td>15 minutes</td><td>5 minutes</td><td>5–15 minutes</td></tr>
+			<tr><td>Detection Time</td><td>0–3 minutes</td><td>0–1 minute</td><td>0–1 minute when busy</td></tr>
+			<tr><td>CPU Usage</td><td>~1%</td><td>~3%</td><td>~1% idle</td></tr>
+			<tr><td>Handle Speed</td><td>30GB/30+ min</td><td>30GB/5–10 min</td><td>Both</td></tr>
+			<tr><td>Best For</td><td>95% users</td><td>5% extreme users</td><td>Mixed usage</td></tr>
 		</tbody>
 	</table>
 
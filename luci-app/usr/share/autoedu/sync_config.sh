@@ -26,18 +26,29 @@ get_config() {
 # Read current values
 ENABLED=$(get_config enabled 0)
 MODE=$(get_config mode 'EFFICIENT')
+CHECK_INTERVAL=$(get_config check_interval '')
 BOT_TOKEN=$(get_config bot_token '')
 CHAT_ID=$(get_config chat_id '')
 KODE_UNREG=$(get_config kode_unreg '*808*5*2*1*1#')
 KODE_BELI=$(get_config kode_beli '*808*4*1*1*1*1#')
 THRESHOLD=$(get_config threshold '3')
+KUOTA_PAKET=$(get_config kuota_paket '30')
+PREDIKSI_RENEWAL=$(get_config prediksi_renewal '0')
+PREDIKSI_MARGIN=$(get_config prediksi_margin '120')
 JEDA_USSD=$(get_config jeda_ussd '10')
+USSD_DETECT=$(get_config ussd_detect '1')
 TIMEOUT_ADB=$(get_config timeout_adb '15')
+KONFIRMASI_TIMEOUT=$(get_config konfirmasi_timeout '90')
+ADB_BACKEND=$(get_config adb_backend 'session')
+SMS_EVENT_WATCH=$(get_config sms_event_watch '1')
 NOTIF_STARTUP=$(get_config notif_startup '0')
 NOTIF_SAFE=$(get_config notif_safe '0')
 NOTIF_DETAIL=$(get_config notif_detail '1')
+LIVE_STATUS=$(get_config live_status '0')
 LOG_FILE=$(get_config log_file '/tmp/auto_edu.log')
 MAX_LOG_SIZE=$(get_config max_log_size '102400')
+LOG_FORMAT=$(get_config log_format 'text')
+STATUS_FILE=$(get_config status_file '/tmp/auto_edu_status.json')
 
 # Convert 0/1 to false/true for Python
 convert_bool() {
@@ -51,6 +62,10 @@ convert_bool() {
 NOTIF_STARTUP_BOOL=$(convert_bool "$NOTIF_STARTUP")
 NOTIF_SAFE_BOOL=$(convert_bool "$NOTIF_SAFE")
 NOTIF_DETAIL_BOOL=$(convert_bool "$NOTIF_DETAIL")
+LIVE_STATUS_BOOL=$(convert_bool "$LIVE_STATUS")
+SMS_EVENT_WATCH_BOOL=$(convert_bool "$SMS_EVENT_WATCH")
+USSD_DETECT_BOOL=$(convert_bool "$USSD_DETECT")
+PREDIKSI_RENEWAL_BOOL=$(convert_bool "$PREDIKSI_RENEWAL")
 
 # Write .env file
 cat > "$ENV_FILE" << EOF
@@ -74,11 +89,16 @@ KODE_BELI=$KODE_BELI
 # QUOTA SETTINGS
 # ============================================================================
 THRESHOLD_KUOTA_GB=$THRESHOLD
+# Package size, starting point of the consumption-rate forecast
+KUOTA_PAKET_GB=$KUOTA_PAKET
+# Renew PREDIKSI_MARGIN seconds before the forecast runs out
+PREDIKSI_RENEWAL=$PREDIKSI_RENEWAL_BOOL
+PREDIKSI_MARGIN=$PREDIKSI_MARGIN
 
 # ============================================================================
 # MONITORING MODE CONFIGURATION
 # ============================================================================
-# Mode: EFFICIENT (default) atau AGGRESSIVE (extreme)
+# Mode: EFFICIENT (default), AGGRESSIVE (extreme) atau AUTO (adaptive interval)
 MONITORING_MODE=$MODE
 
 # EFFICIENT Mode Settings (auto-applied when mode=EFFICIENT)
@@ -89,11 +109,26 @@ SMS_MAX_AGE_MINUTES=15
 JUMLAH_SMS_CEK_AGGRESSIVE=5
 SMS_MAX_AGE_AGGRESSIVE=5
 
+# Daemon check interval in seconds (empty = follow mode: 60 / 180)
+CHECK_INTERVAL=$CHECK_INTERVAL
+
 # ============================================================================
 # TIMING SETTINGS (seconds)
 # ============================================================================
 JEDA_USSD=$JEDA_USSD
+# Continue as soon as the USSD reply dialog appears (JEDA_USSD = max wait)
+USSD_DETEKSI=$USSD_DETECT_BOOL
 TIMEOUT_ADB=$TIMEOUT_ADB
+# Max wait for the activation confirmation SMS after buying
+KONFIRMASI_TIMEOUT=$KONFIRMASI_TIMEOUT
+
+# ============================================================================
+# ADB BACKEND
+# ============================================================================
+# session (persistent adb shell), exec (adb per command), socket (adb server protocol)
+ADB_BACKEND=$ADB_BACKEND
+# Daemon: watch logcat for incoming SMS and check immediately (polling stays as fallback)
+SMS_EVENT_WATCH=$SMS_EVENT_WATCH_BOOL
 
 # ============================================================================
 # NOTIFICATION SETTINGS
@@ -101,12 +136,20 @@ TIMEOUT_ADB=$TIMEOUT_ADB
 NOTIF_KUOTA_AMAN=$NOTIF_SAFE_BOOL
 NOTIF_STARTUP=$NOTIF_STARTUP_BOOL
 NOTIF_DETAIL=$NOTIF_DETAIL_BOOL
+# Queue notifications in a persistent outbox, sent by a background thread
+TELEGRAM_ASYNC=true
+# Edit one pinned status message instead of posting a new message per event
+TELEGRAM_LIVE_STATUS=$LIVE_STATUS_BOOL
 
 # ============================================================================
 # LOGGING
 # ============================================================================
 LOG_FILE=$LOG_FILE
 MAX_LOG_SIZE=$MAX_LOG_SIZE
+LOG_FORMAT=$LOG_FORMAT
+
+# Status snapshot read by the LuCI dashboard (extra devices: .<name> suffix)
+STATUS_FILE=$STATUS_FILE
 EOF
 
 # Set permissions
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fixture bersama test Auto Edu
+
+Config auto_edu dibaca saat modul di-import, jadi .env test (tanpa log,
+DB, metrik; ADB = benchmarks/fake_adb.py backend exec) dipasang di sini
+sebelum modul test mana pun meng-import auto_edu.
+
+Test end to end memakai fixture `jalankan`: auto_edu.py dijalankan sebagai
+proses baru (seperti satu tick cron) dengan .env sendiri, fake adb dan
+fake Bot API lokal (benchmarks/fake_telegram.py).
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = ROOT_DIR / 'benchmarks'
+FAKE_ADB = BENCH_DIR / 'fake_adb.py'
+SCRIPT = ROOT_DIR / 'auto_edu.py'
+
+_TMP = tempfile.mkdtemp(prefix='auto_edu_test_')
+_ENV = Path(_TMP) / 'test.env'
+_ENV.write_text(
+    "BOT_TOKEN=123:abc\nCHAT_ID=1\n"
+    f"ADB_BIN={FAKE_ADB}\nADB_BACKEND=exec\n"
+    "LOG_FILE=none\nLOG_STDOUT=false\nDB_FILE=none\nMETRIK_FILE=none\n"
+    f"STATE_FILE={_TMP}/state.json\nSMS_CACHE_FILE={_TMP}/cache.json\n"
+    f"STATUS_FILE={_TMP}/status.json\n"
+    "THRESHOLD_KUOTA_GB=3\nTIMEOUT_ADB=10\n"
+)
+os.environ['AUTO_EDU_ENV'] = str(_ENV)
+os.environ['AUTO_EDU_ENV_CACHE'] = 'none'
+sys.path[:0] = [str(ROOT_DIR), str(BENCH_DIR)]
+
+SMS_KUOTA_AMAN = "Sisa kuota Edu anda 12GB. Cek info paket di *808#"
+SMS_KUOTA_RENDAH = "Kuota Edu anda kurang dari 3GB. Segera perpanjang paket."
+
+
+def baris_inbox(rows):
+    """Dump `content query` untuk rows (_id, address, date_ms, body), terbaru dulu"""
+    return ''.join(
+        f"Row: {i} _id={sms_id}, address={address}, date={date_ms}, body={body}\n"
+        for i, (sms_id, address, date_ms, body) in enumerate(rows)
+    )
+
+
+def sms_baru(*isi, pengirim='TELKOMSEL', mulai_id=1):
+    """Rows inbox dengan SMS terbaru dulu, bertanggal menit-menit terakhir"""
+    sekarang = int(time.time() * 1000)
+    jumlah = len(isi)
+    return [
+        (mulai_id + jumlah - 1 - i, pengirim, sekarang - i * 60000, teks)
+        for i, teks in enumerate(isi)
+    ]
+
+
+@pytest.fixture
+def logger():
+    import auto_edu
+    return auto_edu.Logger(None)
+
+
+@pytest.fixture
+def inbox(tmp_path, monkeypatch):
+    """Tulis dump inbox untuk fake_adb (FAKE_ADB_INBOX ikut ke proses anak)"""
+    path = tmp_path / 'inbox'
+
+    def tulis(rows):
+        path.write_text(baris_inbox(rows), encoding='utf-8')
+        return path
+
+    monkeypatch.setenv('FAKE_ADB_INBOX', str(path))
+    return tulis
+
+
+@pytest.fixture
+def telegram():
+    import fake_telegram
+    server = fake_telegram.mulai_di_thread()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def jalankan(tmp_path, telegram):
+    """Jalankan auto_edu.py di proses baru: jalankan(*args, timeout=60, **config)
+
+    Config default: semua file di tmp_path, log teks di tmp_path/auto_edu.log,
+    fake adb backend exec, Telegram ke fake Bot API. Return CompletedProcess.
+    """
+    def run(*args, timeout=60, env=None, **config):
+        nilai = {
+            'BOT_TOKEN': '123:abc', 'CHAT_ID': '1',
+            'ADB_BIN': FAKE_ADB, 'ADB_BACKEND': 'exec',
+            'TELEGRAM_API_URL': telegram.url, 'NOTIF_STARTUP': 'false',
+            'LOG_FILE': tmp_path / 'auto_edu.log', 'LOG_STDOUT': 'false',
+            'DB_FILE': 'none', 'METRIK_FILE': 'none',
+            'STATE_FILE': tmp_path / 'state.json',
+            'SMS_CACHE_FILE': tmp_path / 'cache.json',
+            'STATUS_FILE': tmp_path / 'status.json',
+            'TELEGRAM_OUTBOX_FILE': tmp_path / 'outbox.jsonl',
+            'TELEGRAM_LIVE_FILE': tmp_path / 'live.json',
+            'JEDA_USSD': '5', 'KONFIRMASI_TIMEOUT': '5',
+        }
+        nilai.update(config)
+        env_file = tmp_path / 'auto_edu.env'
+        env_file.write_text(''.join(f"{k}={v}\n" for k, v in nilai.items()))
+        return subprocess.run(
+            [sys.executable, str(SCRIPT), *args],
+            env=dict(os.environ, AUTO_EDU_ENV=str(env_file), **(env or {})),
+            capture_output=True, text=True, timeout=timeout,
+        )
+
+    return run
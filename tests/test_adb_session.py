@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import json
+import subprocess
+
+import pytest
+
+from auto_edu import ADBShellSession
+from conftest import FAKE_ADB, SMS_KUOTA_AMAN, sms_baru
+
+
+@pytest.fixture
+def sesi(logger):
+    sesi = ADBShellSession(logger, adb_bin=str(FAKE_ADB))
+    yield sesi
+    sesi.tutup()
+
+
+def test_framing_sentinel(sesi):
+    assert sesi.jalankan('echo satu; printf dua') == (0, 'satu\ndua\n')
+    pid = sesi.proc.pid
+    # Exit code ikut terbawa, stderr digabung, sesi tetap dipakai ulang
+    assert sesi.jalankan('echo galat >&2; false') == (1, 'galat\n')
+    assert sesi.jalankan('echo __AUTOEDU_palsu__ 7') == (0, '__AUTOEDU_palsu__ 7\n')
+    assert sesi.proc.pid == pid
+
+
+def test_stdin_perintah_tidak_memakan_frame(sesi):
+    assert sesi.jalankan('cat; echo lanjut') == (0, 'lanjut\n')
+    assert sesi.jalankan('echo ok') == (0, 'ok\n')
+
+
+def test_berhenti_awal_sisa_dibuang(sesi):
+    stream = sesi.stream('seq 1 1000')
+    assert [next(stream) for _ in range(3)] == [b'1\n', b'2\n', b'3\n']
+    pid = sesi.proc.pid
+    stream.close()
+    # Sisa kecil di-drain sampai sentinel: sesi sama tetap sinkron
+    assert sesi.jalankan('echo ok') == (0, 'ok\n')
+    assert sesi.proc.pid == pid
+
+
+def test_sisa_besar_sesi_ditutup(sesi):
+    stream = sesi.stream('seq 1 200000')
+    next(stream)
+    pid = sesi.proc.pid
+    stream.close()
+    assert not sesi.aktif
+    assert sesi.jalankan('echo ok') == (0, 'ok\n')
+    assert sesi.proc.pid != pid
+
+
+def test_timeout_lalu_sesi_baru(sesi):
+    sesi.jalankan('echo siap')
+    pid = sesi.proc.pid
+    with pytest.raises(subprocess.TimeoutExpired):
+        sesi.jalankan('sleep 5', timeout=0.5)
+    assert not sesi.aktif
+    assert sesi.jalankan('echo ok') == (0, 'ok\n')
+    assert sesi.proc.pid != pid
+
+
+def test_drain_habis_waktu(sesi):
+    """Pembaca berhenti, sisa output tidak datang sebelum deadline: sesi dibuang"""
+    stream = sesi.stream('echo awal; sleep 5; echo akhir', timeout=1)
+    assert next(stream) == b'awal\n'
+    stream.close()
+    assert not sesi.aktif
+    assert sesi.jalankan('echo ok') == (0, 'ok\n')
+
+
+def test_tick_backend_session(jalankan, inbox, tmp_path):
+    inbox(sms_baru(SMS_KUOTA_AMAN))
+    assert jalankan('--force', ADB_BACKEND='session').returncode == 0
+    assert 'Sesi adb shell dibuka' in (tmp_path / 'auto_edu.log').read_text()
+    assert json.loads((tmp_path / 'state.json').read_text())['sms_last_id'] == 1
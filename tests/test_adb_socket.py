@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import json
+import subprocess
+
+import pytest
+
+import fake_adb_server
+from auto_edu import ADBManager, ADBSocketTransport
+from conftest import SMS_KUOTA_AMAN, sms_baru
+
+
+@pytest.fixture
+def server(inbox):
+    """Fake adb server; dibuat setelah FAKE_ADB_INBOX dipasang (env ikut ke shell)"""
+    servers = []
+
+    def mulai(**kwargs):
+        srv, port = fake_adb_server.mulai_di_thread(**kwargs)
+        servers.append(srv)
+        return srv, port
+
+    yield mulai
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_host_devices(server):
+    _, port = server()
+    transport = ADBSocketTransport(port=port, serial='')
+    assert transport.devices() == [('FAKE0001', 'device')]
+    assert transport.cek_device()
+    assert not ADBSocketTransport(port=port, serial='LAIN').cek_device()
+
+
+def test_transport_serial_tidak_ada(server):
+    _, port = server()
+    with pytest.raises(ConnectionError, match="device 'LAIN' not found"):
+        ADBSocketTransport(port=port, serial='LAIN').jalankan('echo ok')
+
+
+def test_device_offline(server):
+    srv, port = server()
+    srv.state = 'offline'
+    transport = ADBSocketTransport(port=port, serial='FAKE0001')
+    assert not transport.cek_device()
+    with pytest.raises(ConnectionError, match='offline'):
+        transport.jalankan('echo ok')
+
+
+def test_shell_exit_code_dan_output(server):
+    _, port = server()
+    transport = ADBSocketTransport(port=port, serial='FAKE0001')
+    assert transport.jalankan('echo satu; printf dua') == (0, 'satu\ndua\n')
+    assert transport.jalankan('echo galat >&2; (exit 3)') == (3, 'galat\n')
+
+
+def test_shell_timeout(server):
+    _, port = server()
+    transport = ADBSocketTransport(port=port, serial='FAKE0001')
+    with pytest.raises(subprocess.TimeoutExpired):
+        transport.jalankan('sleep 5', timeout=0.5)
+    assert transport.jalankan('echo ok') == (0, 'ok\n')
+
+
+def test_baca_sms_lewat_socket(server, inbox, logger):
+    path = inbox(sms_baru(SMS_KUOTA_AMAN, "Pesan kedua"))
+    assert path.exists()
+    _, port = server()
+    adb = ADBManager(logger, transport=ADBSocketTransport(port=port, serial='FAKE0001'))
+    sms_list, _ = adb.baca_sms(limit=1)
+    assert [sms.id for sms in sms_list] == [2]
+    assert adb.cek_sms_baru(since_id=1) == 2
+
+
+def test_tick_backend_socket(server, jalankan, inbox, tmp_path):
+    inbox(sms_baru(SMS_KUOTA_AMAN))
+    _, port = server()
+    hasil = jalankan('--force', ADB_BACKEND='socket', ADB_SERVER_PORT=port, ADB_BIN='/nonexistent')
+    assert hasil.returncode == 0
+    assert json.loads((tmp_path / 'state.json').read_text())['sms_last_id'] == 1
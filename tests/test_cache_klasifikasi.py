@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import auto_edu
+from auto_edu import SMS, CacheKlasifikasi, LABEL_KUOTA_RENDAH, LABEL_LAIN
+from conftest import SMS_KUOTA_AMAN, SMS_KUOTA_RENDAH, sms_baru
+
+
+def sms(sms_id, isi="Pesan biasa"):
+    return SMS(sms_id, 'TELKOMSEL', 1_700_000_000_000 + sms_id, isi)
+
+
+def test_lru_buang_yang_paling_lama_tidak_dipakai(tmp_path):
+    cache = CacheKlasifikasi(tmp_path / 'cache.json', ukuran=3, threshold_gb=3)
+    for i in (1, 2, 3):
+        cache.klasifikasi(sms(i))
+    # Akses ulang SMS 1: sekarang SMS 2 yang paling lama tidak dipakai
+    cache.aksi(sms(1))
+    cache.klasifikasi(sms(4))
+    assert list(cache._data) == [CacheKlasifikasi.kunci(sms(i)) for i in (3, 1, 4)]
+
+
+def test_hasil_dan_aksi_tersimpan(tmp_path):
+    path = tmp_path / 'cache.json'
+    cache = CacheKlasifikasi(path, ukuran=10, threshold_gb=3)
+    assert cache.klasifikasi(sms(1, SMS_KUOTA_RENDAH)) == (LABEL_KUOTA_RENDAH, 3)
+    cache.tandai(sms(1, SMS_KUOTA_RENDAH), auto_edu.AKSI_RENEWAL)
+    cache.simpan()
+
+    cache = CacheKlasifikasi(path, ukuran=10, threshold_gb=3)
+    assert cache.aksi(sms(1)) == auto_edu.AKSI_RENEWAL
+    # Dari cache: isi tidak diklasifikasi ulang
+    assert cache.klasifikasi(sms(1, "teks lain")) == (LABEL_KUOTA_RENDAH, 3)
+
+
+def test_threshold_berubah_cache_dibuang(tmp_path):
+    path = tmp_path / 'cache.json'
+    cache = CacheKlasifikasi(path, ukuran=10, threshold_gb=3)
+    cache.klasifikasi(sms(1, SMS_KUOTA_RENDAH))
+    cache.simpan()
+    cache = CacheKlasifikasi(path, ukuran=10, threshold_gb=2)
+    assert cache.klasifikasi(sms(1, SMS_KUOTA_RENDAH)) == (LABEL_LAIN, 3)
+
+
+def test_tick_ukuran_cache_dibatasi(jalankan, inbox, tmp_path):
+    inbox(sms_baru(SMS_KUOTA_AMAN, "Pesan kedua", "Pesan ketiga"))
+    assert jalankan('--force', SMS_CACHE_SIZE='2').returncode == 0
+    isi = json.loads((tmp_path / 'cache.json').read_text())
+    assert len(isi['entries']) == 2
+
+
+def test_tick_sms_lama_tidak_dievaluasi_ulang(jalankan, inbox, tmp_path):
+    inbox(sms_baru(SMS_KUOTA_AMAN, "Pesan kedua"))
+    assert jalankan('--force').returncode == 0
+    # High-water mark hilang (state terhapus): SMS yang sama terbaca lagi
+    (tmp_path / 'state.json').unlink()
+    assert jalankan('--force').returncode == 0
+    assert '2 SMS sudah dievaluasi sebelumnya' in (tmp_path / 'auto_edu.log').read_text()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from conftest import SMS_KUOTA_AMAN, baris_inbox, sms_baru
+
+
+def test_mark_maju_dan_tersimpan(jalankan, inbox, tmp_path):
+    path = inbox(sms_baru(SMS_KUOTA_AMAN, "Pesan lain dari operator"))
+    state_file = tmp_path / 'state.json'
+    log = tmp_path / 'auto_edu.log'
+
+    assert jalankan('--force').returncode == 0
+    state = json.loads(state_file.read_text())
+    assert state['sms_last_id'] == 2
+    tanggal = state['sms_last_date']
+
+    # Proses baru, inbox sama: probe _id>2 kosong, tick berhenti sebelum baca SMS
+    assert jalankan('--force').returncode == 0
+    assert 'Tidak ada SMS baru (sejak _id 2)' in log.read_text()
+    assert log.read_text().count('Membaca ') == 1
+
+    path.write_text(baris_inbox(sms_baru(SMS_KUOTA_AMAN, mulai_id=3)) + path.read_text())
+    assert jalankan('--force').returncode == 0
+    state = json.loads(state_file.read_text())
+    assert state['sms_last_id'] == 3
+    assert state['sms_last_date'] > tanggal
+    assert log.read_text().count('Berhasil baca 1 SMS') == 1
+
+
+def test_inbox_besar_hanya_sms_baru(jalankan, inbox, tmp_path):
+    rows = sms_baru(*(f"Pesan biasa nomor {i}" for i in range(3000)))
+    path = inbox(rows)
+    state_file = tmp_path / 'state.json'
+    state_file.write_text(json.dumps({'sms_last_id': 3000, 'sms_last_date': rows[0][2]}))
+
+    path.write_text(baris_inbox(sms_baru(SMS_KUOTA_AMAN, mulai_id=3001)) + path.read_text())
+    assert jalankan('--force').returncode == 0
+    assert 'Berhasil baca 1 SMS' in (tmp_path / 'auto_edu.log').read_text()
+    assert json.loads(state_file.read_text())['sms_last_id'] == 3001
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+import auto_edu
+from conftest import SMS_KUOTA_AMAN, SMS_KUOTA_RENDAH, sms_baru
+from auto_edu import LABEL_AKTIVASI, LABEL_KUOTA_RENDAH, LABEL_LAIN, klasifikasi_sms
+
+
+@pytest.mark.parametrize('isi, kuota_gb', [
+    ("Kuota Edu anda kurang dari 3GB. Segera perpanjang paket.", 3),
+    ("Sisa kuota Edu kamu 1,5 GB berlaku s.d. 20/10.", 1.5),
+    ("Kuota tersisa 500MB, beli paket tambahan di *808#", 500 / 1024),
+    ("Kuota kamu tinggal 2GB lagi.", 2),
+    ("Info: kuota tinggal 0.5 GB", 0.5),
+])
+def test_kuota_rendah(isi, kuota_gb):
+    label, gb = klasifikasi_sms(isi, threshold_gb=3)
+    assert label == LABEL_KUOTA_RENDAH
+    assert gb == pytest.approx(kuota_gb)
+
+
+@pytest.mark.parametrize('isi', [
+    "Nikmati kuota 2GB hanya Rp10rb! Aktifkan di *808#",
+    "Bonus kuota 500MB untuk pembelian paket berikutnya",
+    "Promo! Kuota 1GB cuma Rp5.000, tinggal ketik *123#",
+    "Pesan biasa nomor 12, dari teman",
+])
+def test_promo_bukan_kuota_rendah(isi):
+    assert klasifikasi_sms(isi, threshold_gb=3)[0] == LABEL_LAIN
+
+
+def test_sisa_di_atas_threshold():
+    assert klasifikasi_sms("Sisa kuota Edu kamu 12GB", threshold_gb=3) == (LABEL_LAIN, 12)
+
+
+def test_aktivasi():
+    label, _ = klasifikasi_sms("Paket Edu 30GB sudah aktif s.d. 30 hari.", threshold_gb=3)
+    assert label == LABEL_AKTIVASI
+    assert auto_edu.is_sms_konfirmasi("Paket Edu 30GB sudah aktif s.d. 30 hari.")
+
+
+def test_angka_terkecil_dipakai():
+    # Ukuran paket (30GB) lebih besar dari sisa: sisa yang dibandingkan
+    isi = "Sisa kuota paket 30GB kamu kurang dari 2GB"
+    assert klasifikasi_sms(isi, threshold_gb=3) == (LABEL_KUOTA_RENDAH, 2)
+
+
+def test_tick_promo_tidak_renewal(jalankan, inbox, tmp_path):
+    inbox(sms_baru("Nikmati kuota 2GB hanya Rp10rb! Aktifkan di *808#", SMS_KUOTA_AMAN))
+    hasil = jalankan('--force')
+    assert hasil.returncode == 0
+    state = json.loads((tmp_path / 'state.json').read_text())
+    assert 'renewal' not in state
+    assert 'MEMULAI PROSES RENEWAL' not in (tmp_path / 'auto_edu.log').read_text()
+
+
+def test_tick_kuota_rendah_renewal(jalankan, inbox, tmp_path, telegram):
+    inbox(sms_baru(SMS_KUOTA_RENDAH))
+    hasil = jalankan('--force', env={'FAKE_ADB_USSD_DELAY': '0.1', 'FAKE_ADB_KONFIRMASI': '*808*4'})
+    assert hasil.returncode == 0
+    state = json.loads((tmp_path / 'state.json').read_text())
+    assert state['renewal']['status'] == 'confirmed'
+    assert any('Renewal' in r['params'].get('text', '') for r in telegram.requests)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import os
+
+from auto_edu import Logger
+from conftest import SMS_KUOTA_AMAN, sms_baru
+
+
+def test_buffer_ditulis_saat_warn(tmp_path):
+    path = tmp_path / 'auto.log'
+    log = Logger(str(path), max_size=10**6, format_log='text')
+    log.info("satu")
+    log.info("dua")
+    assert not path.exists() or path.read_text() == ''
+    log.warning("tiga")
+    assert [b.split('] ', 2)[2] for b in path.read_text().splitlines()] == ["satu", "dua", "tiga"]
+    log.info("empat")
+    log.tutup()
+    assert path.read_text().splitlines()[-1].endswith("[INFO] empat")
+
+
+def test_rotasi_generasi_gzip(tmp_path):
+    path = tmp_path / 'auto.log'
+    log = Logger(str(path), max_size=2000, generasi=2, format_log='text')
+    for i in range(301):
+        log.warning(f"baris {i:04d} " + "x" * 40)
+    log.tutup()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == \
+        ['auto.log', 'auto.log.1.gz', 'auto.log.2.gz', 'auto.log.idx']
+    lama = gzip.decompress((tmp_path / 'auto.log.2.gz').read_bytes()).decode()
+    baru = gzip.decompress((tmp_path / 'auto.log.1.gz').read_bytes()).decode()
+    sekarang = path.read_text()
+    # Generasi berurutan tanpa baris hilang di antaranya
+    nomor = [int(b.split('baris ')[1][:4]) for b in (lama + baru + sekarang).splitlines()]
+    assert nomor == list(range(nomor[0], 301))
+    assert os.path.getsize(path) <= 2000
+    # Index hanya untuk file sekarang
+    assert os.path.getsize(tmp_path / 'auto.log.idx') == \
+        len(sekarang.splitlines()) * Logger.INDEX_SIZE
+
+
+def test_log_di_clear_dari_luar(tmp_path):
+    path = tmp_path / 'auto.log'
+    log = Logger(str(path), max_size=10**6, format_log='text')
+    log.warning("sebelum clear")
+    path.write_text('')
+    log._check_log_size()
+    log.warning("sesudah clear")
+    log.tutup()
+    assert os.path.getsize(tmp_path / 'auto.log.idx') == Logger.INDEX_SIZE
+    assert path.read_text().endswith("sesudah clear\n")
+
+
+def test_tick_rotasi_menyimpan_riwayat(jalankan, inbox, tmp_path):
+    inbox(sms_baru(SMS_KUOTA_AMAN))
+    for _ in range(6):
+        assert jalankan('--force', MAX_LOG_SIZE='1500', LOG_GENERASI='2').returncode == 0
+    nama = sorted(p.name for p in tmp_path.glob('auto_edu.log*'))
+    assert nama == ['auto_edu.log', 'auto_edu.log.1.gz', 'auto_edu.log.2.gz', 'auto_edu.log.idx']
+    # Baris tick pertama tidak dibuang begitu saja: ada di generasi lama
+    semua = b''.join(
+        gzip.decompress((tmp_path / f'auto_edu.log.{i}.gz').read_bytes()) for i in (2, 1)
+    ).decode() + (tmp_path / 'auto_edu.log').read_text()
+    assert semua.count('Tidak ada SMS baru') >= 3
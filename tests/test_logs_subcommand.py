@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import json
+import struct
+import time
+
+import pytest
+
+import auto_edu
+from auto_edu import Logger, cari_index_log
+from conftest import SMS_KUOTA_AMAN, sms_baru
+
+T0 = 1_700_000_000
+
+
+@pytest.fixture
+def log_terjadwal(tmp_path, monkeypatch):
+    """Log teks di tmp_path/auto_edu.log: satu baris per menit mulai T0"""
+    path = tmp_path / 'auto_edu.log'
+    log = Logger(str(path), max_size=10**6, format_log='text')
+    jam = iter(range(T0, T0 + 3600, 60))
+    monkeypatch.setattr(auto_edu.time, 'time', lambda: next(jam))
+    for i in range(60):
+        if i % 10 == 0:
+            log.warning(f"pesan {i}", event='adb_error')
+        else:
+            log.info(f"pesan {i}", event='sms_kosong')
+    log.tutup()
+    monkeypatch.undo()
+    return path
+
+
+def waktu_lokal(epoch):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(epoch))
+
+
+def test_binary_search_index(log_terjadwal):
+    data = (log_terjadwal.parent / 'auto_edu.log.idx').read_bytes()
+    assert len(data) == 60 * Logger.INDEX_SIZE
+    assert cari_index_log(data, 0) == 0
+    assert cari_index_log(data, T0 + 30 * 60) == 30
+    assert cari_index_log(data, T0 + 30 * 60 + 1) == 31
+    assert cari_index_log(data, T0 + 10**6) == 60
+    waktu = [struct.unpack_from('<d', data, i * Logger.INDEX_SIZE)[0] for i in range(60)]
+    assert waktu == sorted(waktu)
+
+
+def baris_output(hasil):
+    assert hasil.returncode == 0, hasil.stderr
+    return [b.split('] ', 2)[2] for b in hasil.stdout.splitlines()]
+
+
+def test_logs_since_until(jalankan, log_terjadwal):
+    hasil = jalankan('logs', '--since', waktu_lokal(T0 + 50 * 60), '--until', str(T0 + 52 * 60))
+    assert baris_output(hasil) == ["pesan 50", "pesan 51", "pesan 52"]
+
+
+def test_logs_level_event_limit(jalankan, log_terjadwal):
+    assert baris_output(jalankan('logs', '--level', 'warn')) == \
+        [f"pesan {i}" for i in range(0, 60, 10)]
+    assert baris_output(jalankan('logs', '--event', 'adb_error', '--limit', '2')) == \
+        ["pesan 40", "pesan 50"]
+    assert baris_output(jalankan('logs', '--event', 'sms_kosong', '--limit', '0'))[-1] == \
+        "pesan 59"
+
+
+def test_logs_format_waktu_salah(jalankan, log_terjadwal):
+    hasil = jalankan('logs', '--since', 'kemarin')
+    assert hasil.returncode == 2
+    assert "format waktu tidak dikenal" in hasil.stderr
+
+
+def test_tick_json_lines_dan_query_event(jalankan, inbox, tmp_path):
+    inbox(sms_baru(SMS_KUOTA_AMAN))
+    for _ in range(2):
+        assert jalankan('--force', LOG_FORMAT='json').returncode == 0
+    baris = [json.loads(b) for b in (tmp_path / 'auto_edu.log').read_text().splitlines()]
+    assert {'t', 'ts', 'level', 'event', 'msg'} <= set(baris[0])
+    kosong = [b for b in baris if b['event'] == 'sms_kosong']
+    assert len(kosong) == 1
+
+    hasil = jalankan('logs', '--event', 'sms_kosong', LOG_FORMAT='json')
+    assert hasil.returncode == 0
+    assert [json.loads(b) for b in hasil.stdout.splitlines()] == kosong
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import re
+import urllib.request
+
+import pytest
+
+import auto_edu
+from auto_edu import RegistriMetrik
+from conftest import SMS_KUOTA_AMAN, SMS_KUOTA_RENDAH, baris_inbox, sms_baru
+
+_RE_SAMPEL = re.compile(r'^([a-zA-Z_:][\w:]*)(?:\{(.*)\})? (\S+)$')
+_RE_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_openmetrics(teks):
+    """{(nama sampel, frozenset label): nilai}; cek struktur exposition sambil jalan"""
+    assert teks.endswith('# EOF\n')
+    sampel = {}
+    tipe = {}
+    keluarga = None
+    for baris in teks.splitlines()[:-1]:
+        if baris.startswith('# TYPE '):
+            keluarga, jenis = baris[7:].split(' ')
+            assert keluarga not in tipe, f"keluarga {keluarga} muncul dua kali"
+            tipe[keluarga] = jenis
+            continue
+        if baris.startswith('# HELP '):
+            assert baris[7:].split(' ')[0] == keluarga
+            continue
+        m = _RE_SAMPEL.match(baris)
+        assert m, baris
+        nama, label, nilai = m.groups()
+        akhiran = {'counter': ('_total',), 'gauge': ('',),
+                   'histogram': ('_bucket', '_sum', '_count')}[tipe[keluarga]]
+        assert nama in {keluarga + a for a in akhiran}, baris
+        label = frozenset(_RE_LABEL.findall(label or ''))
+        sampel[(nama, label)] = float(nilai)
+    return sampel
+
+
+def histogram(sampel, nama, **label):
+    """[(le, kumulatif)...], _count, _sum untuk satu seri histogram"""
+    label = set(label.items())
+    bucket = sorted(
+        (float(dict(lbl)['le']), nilai) for (n, lbl), nilai in sampel.items()
+        if n == f"{nama}_bucket" and label <= lbl
+    )
+    jumlah = [nilai for (n, lbl), nilai in sampel.items() if n == f"{nama}_count" and label <= lbl]
+    total = [nilai for (n, lbl), nilai in sampel.items() if n == f"{nama}_sum" and label <= lbl]
+    return bucket, jumlah[0], total[0]
+
+
+def test_exposition_format():
+    reg = RegistriMetrik()
+    reg.tambah('autoedu_checks', perangkat='hp1', hasil='ok')
+    reg.tambah('autoedu_checks', perangkat='hp1', hasil='ok')
+    reg.tambah('autoedu_sms_classified', perangkat='a"b\\c\nd', jenis='lain')
+    reg.set('autoedu_last_tick_timestamp_seconds', 1700000000, perangkat='hp1')
+    for detik in (0.01, 0.3, 100):
+        reg.amati('autoedu_tick_seconds', detik, perangkat='hp1', mode='AUTO')
+    sampel = parse_openmetrics(reg.teks())
+
+    assert sampel[('autoedu_checks_total', frozenset({('hasil', 'ok'), ('perangkat', 'hp1')}))] == 2
+    assert sampel[('autoedu_last_tick_timestamp_seconds', frozenset({('perangkat', 'hp1')}))] == 1.7e9
+    assert ('autoedu_sms_classified_total',
+            frozenset({('jenis', 'lain'), ('perangkat', 'a\\"b\\\\c\\nd')})) in sampel
+
+    bucket, jumlah, total = histogram(sampel, 'autoedu_tick_seconds', mode='AUTO')
+    assert [le for le, _ in bucket] == sorted(auto_edu.BUCKET_TICK) + [float('inf')]
+    kumulatif = [n for _, n in bucket]
+    assert kumulatif == sorted(kumulatif)
+    assert kumulatif[-1] == jumlah == 3
+    assert total == pytest.approx(100.31)
+
+
+def test_simpan_menggabungkan_antar_run(tmp_path):
+    path = str(tmp_path / 'auto.prom')
+    for _ in range(2):
+        reg = RegistriMetrik(path)
+        reg.tambah('autoedu_checks', perangkat='hp1', hasil='ok')
+        reg.set('autoedu_last_tick_timestamp_seconds', 5, perangkat='hp1')
+        reg.amati('autoedu_tick_seconds', 0.2, perangkat='hp1', mode='AUTO')
+        reg.simpan()
+    sampel = parse_openmetrics((tmp_path / 'auto.prom').read_text())
+    assert sampel[('autoedu_checks_total', frozenset({('hasil', 'ok'), ('perangkat', 'hp1')}))] == 2
+    assert sampel[('autoedu_last_tick_timestamp_seconds', frozenset({('perangkat', 'hp1')}))] == 5
+    assert histogram(sampel, 'autoedu_tick_seconds')[1] == 2
+
+
+def test_endpoint_http(logger, monkeypatch):
+    reg = RegistriMetrik()
+    reg.tambah('autoedu_checks', perangkat='hp1', hasil='ok')
+    monkeypatch.setattr(auto_edu, '_metrik', reg)
+    server = auto_edu.mulai_server_metrik(logger, port=0, alamat='127.0.0.1')
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            assert resp.headers['Content-Type'].startswith('application/openmetrics-text')
+            sampel = parse_openmetrics(resp.read().decode())
+        assert ('autoedu_checks_total', frozenset({('hasil', 'ok'), ('perangkat', 'hp1')})) in sampel
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_tick_textfile(jalankan, inbox, tmp_path):
+    path = inbox(sms_baru(SMS_KUOTA_AMAN))
+    prom = tmp_path / 'auto_edu.prom'
+    assert jalankan('--force', METRIK_FILE=prom).returncode == 0
+    path.write_text(baris_inbox(sms_baru(SMS_KUOTA_RENDAH, mulai_id=2)) + path.read_text())
+    env = {'FAKE_ADB_USSD_DELAY': '0.1', 'FAKE_ADB_KONFIRMASI': '*808*4'}
+    assert jalankan('--force', env=env, METRIK_FILE=prom).returncode == 0
+
+    sampel = parse_openmetrics(prom.read_text())
+    default = ('perangkat', 'default')
+    assert sampel[('autoedu_checks_total', frozenset({('hasil', 'ok'), default}))] == 2
+    assert sampel[('autoedu_renewals_total', frozenset({('hasil', 'confirmed'), default}))] == 1
+    assert sampel[('autoedu_sms_classified_total', frozenset({('jenis', 'kuota_rendah'), default}))] >= 1
+    assert histogram(sampel, 'autoedu_tick_seconds')[1] == 2
+    assert histogram(sampel, 'autoedu_ussd_roundtrip_seconds')[1] >= 1
+    assert histogram(sampel, 'autoedu_telegram_request_seconds')[1] >= 1
+    adb = {dict(lbl)['perintah'] for (n, lbl) in sampel if n == 'autoedu_adb_command_seconds_count'}
+    assert 'content' in adb
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+import time
+
+import auto_edu
+from auto_edu import Perangkat, jalankan_paralel, perangkat_aktif
+from conftest import SMS_KUOTA_AMAN, SMS_KUOTA_RENDAH, baris_inbox, sms_baru
+
+
+def test_config_dan_file_per_device():
+    utama = Perangkat('HP1', {'KODE_BELI': '*808*4#'}, utama=True, label=True)
+    kedua = Perangkat('192.168.1.5:5555', {'CHAT_ID': '2'}, utama=False, label=True)
+    assert utama.serial == 'HP1'
+    assert utama.kode_beli == '*808*4#'
+    assert utama.chat_id == auto_edu.CHAT_ID
+    assert kedua.chat_id == '2'
+    assert utama.state_file == auto_edu.STATE_FILE
+    assert kedua.state_file.endswith('.192.168.1.5_5555.json')
+    assert len({utama.lock_file, kedua.lock_file}) == 2
+
+
+def test_paralel_terisolasi(logger):
+    daftar = [Perangkat(f'HP{i}', {}, utama=(i == 1), label=True) for i in (1, 2, 3)]
+    mulai = threading.Barrier(3, timeout=5)
+
+    def cek(perangkat):
+        # Ketiga device harus jalan bersamaan untuk bisa lewat barrier
+        mulai.wait()
+        assert perangkat_aktif() is perangkat
+        if perangkat.nama == 'HP2':
+            raise RuntimeError("device error")
+        time.sleep(0.1)
+        return perangkat_aktif().nama
+
+    assert jalankan_paralel(daftar, cek, logger) == ['HP1', None, 'HP3']
+
+
+def test_tick_dua_device(jalankan, tmp_path, telegram):
+    """Renewal HP1 (dengan jeda USSD) tidak menahan cek HP2; state & chat terpisah"""
+    (tmp_path / 'inbox_HP1').write_text(baris_inbox(sms_baru(SMS_KUOTA_RENDAH)))
+    (tmp_path / 'inbox_HP2').write_text(baris_inbox(sms_baru(SMS_KUOTA_AMAN, mulai_id=7)))
+    env = {
+        'FAKE_ADB_DEVICES': 'HP1,HP2',
+        'FAKE_ADB_INBOX_HP1': str(tmp_path / 'inbox_HP1'),
+        'FAKE_ADB_INBOX_HP2': str(tmp_path / 'inbox_HP2'),
+        'FAKE_ADB_USSD_DELAY': '0.1', 'FAKE_ADB_KONFIRMASI': '*808*4',
+    }
+    config = {'DEVICES': 'HP1,HP2', 'HP2.CHAT_ID': '2', 'LOG_FORMAT': 'json',
+              'NOTIF_STARTUP': 'true'}
+    assert jalankan('--force', env=env, **config).returncode == 0
+
+    hp1 = json.loads((tmp_path / 'state.json').read_text())
+    hp2 = json.loads((tmp_path / 'state.HP2.json').read_text())
+    assert hp1['renewal']['status'] == 'confirmed'
+    assert 'renewal' not in hp2
+    assert hp2['sms_last_id'] == 7
+
+    baris = [json.loads(b) for b in (tmp_path / 'auto_edu.log').read_text().splitlines()]
+    selesai_hp2 = max(b['t'] for b in baris if b['msg'].startswith('[HP2]'))
+    renewal_hp1 = [b['t'] for b in baris
+                   if b['msg'].startswith('[HP1]') and b['event'] == 'renewal_selesai']
+    assert renewal_hp1 and selesai_hp2 < renewal_hp1[0]
+
+    chat = {r['params']['chat_id'] for r in telegram.requests if r['method'] == 'sendMessage'}
+    assert chat == {'1', '2'}
+    assert not any('Renewal' in r['params']['text'] for r in telegram.requests
+                   if r['params'].get('chat_id') == '2')
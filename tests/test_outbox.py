@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import socket
+
+import pytest
+
+import fake_telegram
+from auto_edu import TelegramBot
+
+
+def url_mati():
+    """URL Bot API yang menolak koneksi (WAN mati)"""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def mulai(**kwargs):
+        srv = fake_telegram.mulai_di_thread(**kwargs)
+        servers.append(srv)
+        return srv
+
+    yield mulai
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
+
+
+def teks(srv):
+    return [r['params']['text'] for r in srv.requests]
+
+
+def test_urutan_tetap_setelah_restart(logger, server, tmp_path):
+    path = tmp_path / 'outbox.jsonl'
+    bot = TelegramBot('123:abc', '1', logger, api_url=url_mati())
+    bot.mulai_outbox(path)
+    for i in range(3):
+        assert bot.kirim_pesan(f"pesan {i}")
+    bot.tutup(flush_timeout=0.2)
+    assert len(path.read_text().splitlines()) == 3
+
+    # Run berikutnya: antrian lama dikirim dulu, urutan sama
+    srv = server()
+    bot = TelegramBot('123:abc', '1', logger, api_url=srv.url)
+    outbox = bot.mulai_outbox(path)
+    bot.kirim_pesan("pesan 3")
+    assert outbox.flush(10)
+    bot.tutup()
+    assert teks(srv) == [f"pesan {i}" for i in range(4)]
+    assert path.read_text() == ''
+
+
+def test_429_diulang_tanpa_mengubah_urutan(logger, server, tmp_path):
+    srv = server(fail_429=2)
+    bot = TelegramBot('123:abc', '1', logger, api_url=srv.url)
+    outbox = bot.mulai_outbox(tmp_path / 'outbox.jsonl')
+    bot.kirim_pesan("pertama")
+    bot.kirim_pesan("kedua")
+    assert outbox.flush(15)
+    bot.tutup()
+    assert teks(srv) == ["pertama"] * 3 + ["kedua"]
+
+
+def test_tutup_tidak_memotong_request_berjalan(logger, server, tmp_path):
+    """Flush timeout habis saat request masih jalan: koneksi ditutup thread pengirim"""
+    srv = server(latency=2)
+    bot = TelegramBot('123:abc', '1', logger, api_url=srv.url)
+    outbox = bot.mulai_outbox(tmp_path / 'outbox.jsonl')
+    bot.kirim_pesan("lambat")
+    thread = outbox._thread
+
+    bot.tutup(flush_timeout=0.1)
+    assert thread.is_alive()
+    assert bot._conn is not None
+
+    thread.join(10)
+    assert not thread.is_alive()
+    assert bot._conn is None
+    assert teks(srv) == ["lambat"]
+    assert (tmp_path / 'outbox.jsonl').read_text() == ''
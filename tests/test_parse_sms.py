@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import io
+
+import pytest
+
+from auto_edu import ADBManager, SMS, parse_sms_stream
+from fake_adb import buat_dump
+
+
+def stream(teks):
+    return io.BytesIO(teks.encode('utf-8'))
+
+
+def test_body_multi_baris():
+    dump = (
+        "Row: 0 _id=3, address=TELKOMSEL, date=3000, body=Baris satu\n"
+        "Baris dua, address=palsu\n"
+        "\n"
+        "Baris empat\n"
+        "Row: 1 _id=2, address=+62812, date=2000, body=Satu baris\r\n"
+    )
+    sms_list, berhenti = parse_sms_stream(stream(dump))
+    assert not berhenti
+    assert [(s.id, s.pengirim, s.date_ms) for s in sms_list] == \
+        [(3, 'TELKOMSEL', 3000), (2, '+62812', 2000)]
+    assert sms_list[0].isi == "Baris satu\nBaris dua, address=palsu\n\nBaris empat"
+    assert sms_list[1].isi == "Satu baris"
+
+
+def test_berhenti_setelah_limit():
+    dibaca = []
+
+    def baris_dump():
+        for i in range(1000):
+            baris = f"Row: {i} _id={1000 - i}, address=A, date={i}, body=isi {i}\n".encode()
+            dibaca.append(baris)
+            yield baris
+
+    sms_list, berhenti = parse_sms_stream(baris_dump(), limit=3)
+    assert berhenti
+    assert [s.id for s in sms_list] == [1000, 999, 998]
+    # Baris Row ke-(limit + 1) menutup SMS terakhir, sisanya tidak dibaca
+    assert len(dibaca) == 4
+
+
+def test_record_ringkas():
+    sms = SMS(1, 'TELKOMSEL', 1_700_000_000_000, 'isi')
+    assert not hasattr(sms, '__dict__')
+    assert sms.timestamp == 1_700_000_000
+    assert sms.tanggal.count('/') == 2
+
+
+@pytest.fixture
+def adb(logger):
+    adb = ADBManager(logger)
+    yield adb
+    adb.tutup()
+
+
+def test_baca_sms_multi_baris_lewat_fake_adb(adb, tmp_path, monkeypatch):
+    path = tmp_path / 'inbox'
+    buat_dump(path, 20000, multiline_setiap=2)
+    monkeypatch.setenv('FAKE_ADB_INBOX', str(path))
+
+    sms_list, _ = adb.baca_sms(limit=5)
+    assert [s.id for s in sms_list] == [20000, 19999, 19998, 19997, 19996]
+    assert sms_list[0].isi.startswith("Kuota Edu anda kurang dari 3GB")
+    assert sms_list[2].isi == \
+        "Info promo #19998\nBaris kedua promo\nBaris ketiga, dengan koma"
+    assert adb.sms_id_terakhir == 20000
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import auto_edu
+from auto_edu import PemutusADB
+from conftest import SMS_KUOTA_AMAN, sms_baru
+
+T0 = 1_700_000_000
+
+
+def test_closed_ke_open_dan_backoff():
+    p = PemutusADB()
+    assert p.boleh_coba(T0)
+    assert p.putus(T0) is True
+    assert p.status == PemutusADB.BUKA
+    assert p.coba_berikutnya == T0 + auto_edu.ADB_BACKOFF_MIN
+    assert not p.boleh_coba(T0 + 1)
+    # Gagal lagi bukan "baru putus": tidak ada notifikasi kedua
+    assert p.boleh_coba(T0 + auto_edu.ADB_BACKOFF_MIN)
+    assert p.status == PemutusADB.SETENGAH
+    assert p.putus(T0 + auto_edu.ADB_BACKOFF_MIN) is False
+    assert p.backoff() == 2 * auto_edu.ADB_BACKOFF_MIN
+    assert p.sejak == T0
+
+
+def test_half_open_ke_closed():
+    p = PemutusADB()
+    p.putus(T0)
+    assert p.boleh_coba(T0 + 1, paksa=True)
+    assert p.status == PemutusADB.SETENGAH
+    assert p.sukses(T0 + 2) is True
+    assert p.status == PemutusADB.TUTUP
+    assert p.gagal == 0
+    assert p.sukses(T0 + 3) is False
+
+
+def test_backoff_maksimum():
+    p = PemutusADB({'status': PemutusADB.BUKA, 'gagal': 50})
+    assert p.backoff() == auto_edu.ADB_BACKOFF_MAX
+
+
+def test_sehat_tercache():
+    p = PemutusADB()
+    p.sukses(T0)
+    assert p.sehat_tercache(T0 + auto_edu.ADB_HEALTH_TTL - 1)
+    assert not p.sehat_tercache(T0 + auto_edu.ADB_HEALTH_TTL)
+    p.putus(T0 + 1)
+    assert not p.sehat_tercache(T0 + 2)
+
+
+def test_state_bolak_balik():
+    p = PemutusADB()
+    p.putus(T0)
+    q = PemutusADB(p.ke_dict())
+    assert q.ke_dict() == p.ke_dict()
+    assert not q.boleh_coba(T0 + 1)
+
+
+def test_tick_device_dicabut_lalu_pulih(jalankan, inbox, tmp_path, telegram):
+    """Satu notifikasi saat putus, tick berikutnya dilewati, satu notifikasi saat pulih"""
+    inbox(sms_baru(SMS_KUOTA_AMAN))
+    dicabut = tmp_path / 'offline'
+    dicabut.touch()
+    env = {'FAKE_ADB_OFFLINE': str(dicabut)}
+    state_file = tmp_path / 'state.json'
+
+    def judul():
+        return [r['params']['text'].split('\n')[0] for r in telegram.requests]
+
+    jalankan('--force', env=env, ADB_RECONNECT_TIMEOUT='1')
+    assert json.loads(state_file.read_text())['adb']['status'] == PemutusADB.BUKA
+    assert sum('ADB Error' in j for j in judul()) == 1
+
+    jalankan('--force', env=env, ADB_RECONNECT_TIMEOUT='1')
+    assert 'ADB masih putus - skip' in (tmp_path / 'auto_edu.log').read_text()
+    assert sum('ADB Error' in j for j in judul()) == 1
+
+    # Device dicolok lagi dan backoff sudah habis
+    dicabut.unlink()
+    state = json.loads(state_file.read_text())
+    state['adb']['coba_berikutnya'] = 0
+    state_file.write_text(json.dumps(state))
+    assert jalankan('--force', env=env, ADB_RECONNECT_TIMEOUT='1').returncode == 0
+    assert json.loads(state_file.read_text())['adb']['status'] == PemutusADB.TUTUP
+    assert sum('Terhubung Kembali' in j for j in judul()) == 1
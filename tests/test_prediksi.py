@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+import auto_edu
+from auto_edu import (
+    amati_kuota, backoff_prediksi, perlu_renewal_prediktif, prediksi_habis, reset_prediksi,
+)
+
+T0 = 1_700_000_000
+
+
+def state_hampir_habis():
+    """Dua SMS sisa kuota 10 menit terpisah (1GB/10 menit), tersisa 1GB"""
+    state = {}
+    amati_kuota(state, T0, 3.0)
+    amati_kuota(state, T0 + 600, 2.0)
+    amati_kuota(state, T0 + 1200, 1.0)
+    return state
+
+
+def test_laju_dari_sms():
+    state = state_hampir_habis()
+    habis, _ = prediksi_habis(state)
+    assert state['prediksi']['n'] == 2
+    assert habis == T0 + 1800
+
+
+def test_perlu_renewal_dalam_margin():
+    state = state_hampir_habis()
+    sekarang = T0 + 1800 - auto_edu.PREDIKSI_MARGIN
+    assert not perlu_renewal_prediktif(state, sekarang - 1)
+    assert perlu_renewal_prediktif(state, sekarang)
+
+
+def test_tidak_renewal_lagi_tanpa_sms_baru():
+    state = state_hampir_habis()
+    waktu_renewal = T0 + 1700
+    state['renewal'] = {'waktu': waktu_renewal}
+    reset_prediksi(state, waktu_renewal, 30)
+    # Laju lama dibuang: tidak ada prediksi sampai ada SMS sisa kuota baru
+    assert prediksi_habis(state) is None
+    for menit in (5, 60, 600):
+        assert not perlu_renewal_prediktif(state, waktu_renewal + menit * 60)
+
+
+def test_sms_lama_tidak_memicu_setelah_renewal():
+    state = state_hampir_habis()
+    state['renewal'] = {'waktu': T0 + 5000}
+    # Model masih dari SMS sebelum renewal (mis. state lama tanpa reset)
+    assert not perlu_renewal_prediktif(state, T0 + 9000)
+
+
+def test_backoff_setelah_gagal():
+    state = state_hampir_habis()
+    sekarang = T0 + 1800
+    assert backoff_prediksi(state) == 0
+    state['prediksi_gagal'] = {'waktu': sekarang, 'n': 1}
+    assert backoff_prediksi(state) == auto_edu.PREDIKSI_BACKOFF_MIN
+    assert not perlu_renewal_prediktif(state, sekarang + 10)
+    assert perlu_renewal_prediktif(state, sekarang + auto_edu.PREDIKSI_BACKOFF_MIN)
+    state['prediksi_gagal']['n'] = 20
+    assert backoff_prediksi(state) == auto_edu.PREDIKSI_BACKOFF_MAX
+
+
+def test_tick_renewal_prediktif_sekali(jalankan, inbox, tmp_path):
+    """Renewal prediktif jalan sekali; tick berikutnya tanpa SMS baru tidak beli lagi"""
+    sekarang = int(time.time())
+    state_file = tmp_path / 'state.json'
+    state_file.write_text(json.dumps({'prediksi': {
+        't': sekarang - 1200, 'gb': 1.0, 'laju': 1 / 600, 'n': 2, 't_sms': sekarang - 1200,
+    }}))
+    inbox([])
+    env = {'FAKE_ADB_USSD_DELAY': '0.1', 'FAKE_ADB_KONFIRMASI': '*808*4'}
+    assert jalankan('--force', env=env, PREDIKSI_RENEWAL='true').returncode == 0
+    state = json.loads(state_file.read_text())
+    assert state['renewal']['status'] == 'confirmed'
+    assert 'laju' not in state['prediksi']
+
+    # Dua jam kemudian (jeda minimal lewat), belum ada SMS sisa kuota baru
+    state['renewal']['waktu'] -= 7200
+    state['prediksi']['t'] -= 7200
+    state_file.write_text(json.dumps(state))
+    assert jalankan('--force', env=env, PREDIKSI_RENEWAL='true').returncode == 0
+    assert (tmp_path / 'auto_edu.log').read_text().count('renewal lebih awal') == 1
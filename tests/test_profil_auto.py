@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+import auto_edu
+from auto_edu import profil_auto
+from conftest import SMS_KUOTA_AMAN, sms_baru
+
+T0 = 1_700_000_000
+
+
+def test_idle_paling_lambat():
+    assert profil_auto({}, T0) == (auto_edu.AUTO_INTERVAL_MAX, 3, 15)
+
+
+def test_cepat_setelah_renewal():
+    state = {'renewal': {'waktu': T0 - 60}}
+    assert profil_auto(state, T0) == (auto_edu.AUTO_INTERVAL_MIN, 5, 5)
+    # Makin lama sejak renewal makin lambat, sampai batas atas
+    assert profil_auto(state, T0 + 600)[0] == (600 + 60) // 4
+    assert profil_auto(state, T0 + 86400)[0] == auto_edu.AUTO_INTERVAL_MAX
+
+
+def test_pemakaian_berat_dari_sms_sisa_kuota():
+    state = {'kuota_sms': [T0 - 3000, T0 - 600, T0 - 300, T0 - 60]}
+    # Hanya 3 SMS di dalam jendela 30 menit
+    assert profil_auto(state, T0) == (auto_edu.AUTO_INTERVAL_MAX // 4, 5, 5)
+
+
+def test_prediksi_habis_mempercepat():
+    state = {'prediksi': {'t': T0, 'gb': 1.0, 'laju': 1 / 1200, 'n': 2, 't_sms': T0}}
+    assert profil_auto(state, T0)[0] == 120
+
+
+def test_tick_cron_auto(jalankan, inbox, tmp_path):
+    inbox(sms_baru(SMS_KUOTA_AMAN))
+    state_file = tmp_path / 'state.json'
+    log = tmp_path / 'auto_edu.log'
+
+    assert jalankan(MONITORING_MODE='AUTO').returncode == 0
+    assert f"Mode AUTO: interval {auto_edu.AUTO_INTERVAL_MAX}s, 3 SMS, max age 15 menit" \
+        in log.read_text()
+    # SMS sisa kuota yang baru terbaca ikut menentukan jadwal berikutnya
+    state = json.loads(state_file.read_text())
+    assert len(state['kuota_sms']) == 1
+    assert f"cek berikutnya dalam {auto_edu.AUTO_INTERVAL_MAX // 2} detik" in log.read_text()
+    assert state['auto_berikutnya'] - time.time() > auto_edu.AUTO_INTERVAL_MAX // 2 - 30
+
+    # Cron menit berikutnya: belum jatuh tempo, keluar tanpa cek
+    assert jalankan(MONITORING_MODE='AUTO').returncode == 0
+    assert log.read_text().count('Mode AUTO: interval') == 1
+
+    # Baru saja renewal: profil tercepat dan jadwal berikutnya dekat
+    state['renewal'] = {'waktu': int(time.time()) - 60, 'status': 'confirmed'}
+    state['auto_berikutnya'] = 0
+    state_file.write_text(json.dumps(state))
+    assert jalankan(MONITORING_MODE='AUTO').returncode == 0
+    assert f"Mode AUTO: interval {auto_edu.AUTO_INTERVAL_MIN}s, 5 SMS, max age 5 menit" \
+        in log.read_text()
+    state = json.loads(state_file.read_text())
+    assert state['auto_berikutnya'] - time.time() <= auto_edu.AUTO_INTERVAL_MIN
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from conftest import SMS_KUOTA_AMAN, SMS_KUOTA_RENDAH, baris_inbox, sms_baru
+
+
+def jumlah(path, tabel, tmp_path):
+    """COUNT(*) dari salinan DB (membuka arsip langsung bisa membuat -shm di sebelahnya)"""
+    salinan = tmp_path / 'baca.db'
+    shutil.copyfile(path, salinan)
+    conn = sqlite3.connect(salinan)
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM {tabel}').fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Arsip DB di folder 'flash', salinan kerja di luar folder itu"""
+    flash = tmp_path / 'flash'
+    flash.mkdir()
+    return {'DB_FILE': flash / 'auto_edu.db', 'DB_KERJA': tmp_path / 'kerja.db'}
+
+
+def test_tick_tanpa_sms_baru_tidak_menyentuh_flash(jalankan, inbox, tmp_path, db):
+    inbox(sms_baru(SMS_KUOTA_AMAN))
+    assert jalankan('--force', **db).returncode == 0
+    # SMS baru tercatat: arsip pertama dibuat
+    arsip = db['DB_FILE']
+    assert jumlah(arsip, 'sms_seen', tmp_path) == 1
+    sebelum = os.stat(arsip)
+    isi_flash = sorted(os.listdir(arsip.parent))
+
+    for _ in range(2):
+        assert jalankan('--force', **db).returncode == 0
+    assert 'Tidak ada SMS baru' in (tmp_path / 'auto_edu.log').read_text()
+
+    sesudah = os.stat(arsip)
+    assert (sesudah.st_mtime_ns, sesudah.st_ino, sesudah.st_size) == \
+        (sebelum.st_mtime_ns, sebelum.st_ino, sebelum.st_size)
+    assert sorted(os.listdir(arsip.parent)) == isi_flash
+    # Riwayat run tetap ada di salinan kerja
+    assert jumlah(db['DB_KERJA'], 'runs', tmp_path) == 3
+
+
+def test_renewal_langsung_ke_flash(jalankan, inbox, tmp_path, db):
+    path = inbox(sms_baru(SMS_KUOTA_AMAN))
+    assert jalankan('--force', **db).returncode == 0
+    # SMS kuota rendah masuk dalam DB_COMMIT_INTERVAL yang sama
+    path.write_text(baris_inbox(sms_baru(SMS_KUOTA_RENDAH, mulai_id=2)) + path.read_text())
+    env = {'FAKE_ADB_USSD_DELAY': '0.1', 'FAKE_ADB_KONFIRMASI': '*808*4'}
+    assert jalankan('--force', env=env, **db).returncode == 0
+    assert jumlah(db['DB_FILE'], 'renewals', tmp_path) == 1
+
+
+def test_salinan_kerja_dipulihkan_dari_arsip(jalankan, inbox, tmp_path, db):
+    inbox(sms_baru(SMS_KUOTA_AMAN))
+    assert jalankan('--force', **db).returncode == 0
+    # Reboot: tmpfs kosong
+    os.unlink(db['DB_KERJA'])
+    assert jalankan('--force', **db).returncode == 0
+    assert jumlah(db['DB_KERJA'], 'sms_seen', tmp_path) == 1
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+import fake_telegram
+from auto_edu import TelegramBot
+from conftest import SMS_KUOTA_RENDAH, sms_baru
+
+
+@pytest.fixture
+def bot(logger, telegram, tmp_path):
+    bot = TelegramBot('123:abc', '1', logger, api_url=telegram.url, perangkat='hp1')
+    bot.live_status = True
+    bot.live_file = str(tmp_path / 'live.json')
+    yield bot
+    bot.tutup()
+
+
+def methods(srv):
+    return [r['method'] for r in srv.requests]
+
+
+def test_kirim_pin_lalu_edit(bot, telegram, tmp_path):
+    assert bot.kirim_pesan_format("🔍", "Cek", "fase 1", live=True)
+    assert bot.kirim_pesan_format("🛒", "Renewal", "fase 2", live=True)
+    assert methods(telegram) == ['sendMessage', 'pinChatMessage', 'editMessageText']
+    message_id = json.loads((tmp_path / 'live.json').read_text())['1:hp1']
+    assert telegram.requests[1]['params']['message_id'] == str(message_id)
+    assert telegram.requests[2]['params']['message_id'] == str(message_id)
+    assert 'fase 2' in telegram.pesan[message_id]
+
+
+def test_pesan_dihapus_kirim_dan_pin_baru(bot, telegram, tmp_path):
+    bot.kirim_pesan_format("🔍", "Cek", "fase 1", live=True)
+    lama = json.loads((tmp_path / 'live.json').read_text())['1:hp1']
+    telegram.pesan.pop(lama)
+
+    assert bot.kirim_pesan_format("🛒", "Renewal", "fase 2", live=True)
+    assert methods(telegram)[2:] == ['editMessageText', 'sendMessage', 'pinChatMessage']
+    baru = json.loads((tmp_path / 'live.json').read_text())['1:hp1']
+    assert baru != lama
+    assert telegram.requests[-1]['params']['message_id'] == str(baru)
+
+
+def test_edit_429_diulang_tanpa_pesan_baru(logger, tmp_path):
+    srv = fake_telegram.mulai_di_thread()
+    try:
+        bot = TelegramBot('123:abc', '1', logger, api_url=srv.url, perangkat='hp1')
+        bot.live_status = True
+        bot.live_file = str(tmp_path / 'live.json')
+        outbox = bot.mulai_outbox(tmp_path / 'outbox.jsonl')
+        bot.kirim_pesan_format("🔍", "Cek", "fase 1", live=True)
+        assert outbox.flush(10)
+
+        srv.sisa_429 = 1
+        bot.kirim_pesan_format("🛒", "Renewal", "fase 2", live=True)
+        assert outbox.flush(10)
+        bot.tutup()
+        assert methods(srv) == [
+            'sendMessage', 'pinChatMessage', 'editMessageText', 'editMessageText'
+        ]
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_tick_renewal_satu_pesan_status(jalankan, inbox, tmp_path, telegram):
+    """Satu tick renewal: semua fase meng-edit satu pesan yang di-pin"""
+    inbox(sms_baru(SMS_KUOTA_RENDAH))
+    env = {'FAKE_ADB_USSD_DELAY': '0.1', 'FAKE_ADB_KONFIRMASI': '*808*4'}
+    assert jalankan('--force', env=env, TELEGRAM_LIVE_STATUS='true').returncode == 0
+    live = json.loads((tmp_path / 'live.json').read_text())
+    pin = [r for r in telegram.requests if r['method'] == 'pinChatMessage']
+    assert len(pin) == 1
+    assert list(live.values()) == [int(pin[0]['params']['message_id'])]
+    assert methods(telegram).count('editMessageText') >= 1
+    status = [r for r in telegram.requests if r['method'] in ('sendMessage', 'editMessageText')]
+    assert 'Renewal' in status[-1]['params']['text']
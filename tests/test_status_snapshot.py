@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+from auto_edu import StatusSnapshot
+from conftest import SMS_KUOTA_AMAN, SMS_KUOTA_RENDAH, baris_inbox, sms_baru
+
+
+def test_counter_dibawa_antar_run(tmp_path):
+    path = tmp_path / 'status.json'
+    snap = StatusSnapshot(path)
+    snap.hitung('checks')
+    snap.hitung('renewals')
+    snap.hitung('renewals_ok')
+    snap.perbarui(fase='idle')
+
+    # Run cron berikutnya: counter lama digabung, kolom lain tetap ada
+    snap = StatusSnapshot(path)
+    snap.hitung('checks')
+    snap.hitung('renewals')
+    snap.tulis()
+    data = json.loads(path.read_text())
+    assert data['fase'] == 'idle'
+    assert data['counters']['checks'] == 2
+    assert data['counters']['renewals_24h'] == 2
+    assert data['counters']['success_rate'] == 50
+    assert not (tmp_path / 'status.json.tmp').exists()
+
+
+def test_bucket_lebih_dari_24_jam_dibuang(tmp_path):
+    path = tmp_path / 'status.json'
+    jam_lama = str(int(time.time() // 3600) - 30)
+    path.write_text(json.dumps({
+        'counters': {'checks': 10, 'renewals': 0, 'renewals_ok': 0},
+        'per_jam': {jam_lama: {'checks': 10}},
+    }))
+    snap = StatusSnapshot(path)
+    snap.hitung('checks')
+    snap.tulis()
+    data = json.loads(path.read_text())
+    assert list(data['per_jam']) == [str(int(time.time() // 3600))]
+    assert data['counters']['checks'] == 11
+    assert data['counters']['checks_24h'] == 1
+
+
+def test_tick_menulis_snapshot(jalankan, inbox, tmp_path):
+    path = inbox(sms_baru(SMS_KUOTA_AMAN))
+    status = tmp_path / 'status.json'
+    assert jalankan('--force').returncode == 0
+    assert jalankan('--force').returncode == 0
+    data = json.loads(status.read_text())
+    assert data['fase'] == 'idle'
+    assert data['counters']['checks'] == 2
+    assert data['adb']['terhubung'] is True
+    assert data['klasifikasi_terakhir']['kuota_gb'] == 12
+    assert data['last_check']['status'] == 'ok'
+    assert data['next_check'] > time.time()
+    assert 'last_renewal' not in data
+
+    path.write_text(baris_inbox(sms_baru(SMS_KUOTA_RENDAH, mulai_id=2)) + path.read_text())
+    env = {'FAKE_ADB_USSD_DELAY': '0.1', 'FAKE_ADB_KONFIRMASI': '*808*4'}
+    assert jalankan('--force', env=env).returncode == 0
+    data = json.loads(status.read_text())
+    assert data['counters']['renewals'] == data['counters']['renewals_ok'] == 1
+    assert data['last_renewal']['status'] == 'confirmed'
+    assert data['klasifikasi_terakhir']['sms_id'] == 2
+    assert data['klasifikasi_terakhir']['label'] == 'kuota_rendah'
+
+
+def test_tick_multi_device_snapshot_terpisah(jalankan, tmp_path):
+    """File per device sesuai pola yang digabung controller LuCI (<status>.*.json)"""
+    for serial in ('HP1', 'HP2'):
+        (tmp_path / f'inbox_{serial}').write_text(baris_inbox(sms_baru(SMS_KUOTA_AMAN)))
+    env = {
+        'FAKE_ADB_DEVICES': 'HP1,HP2',
+        'FAKE_ADB_INBOX_HP1': str(tmp_path / 'inbox_HP1'),
+        'FAKE_ADB_INBOX_HP2': str(tmp_path / 'inbox_HP2'),
+    }
+    assert jalankan('--force', env=env, DEVICES='HP1,HP2').returncode == 0
+    utama = json.loads((tmp_path / 'status.json').read_text())
+    kedua = json.loads((tmp_path / 'status.HP2.json').read_text())
+    assert (utama['perangkat'], kedua['perangkat']) == ('HP1', 'HP2')
+    assert utama['counters']['checks'] == kedua['counters']['checks'] == 1
+    assert sorted(p.name for p in tmp_path.glob('status.*.json')) == ['status.HP2.json']
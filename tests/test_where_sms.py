@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+import pytest
+
+import auto_edu
+from auto_edu import ADBManager
+from conftest import SMS_KUOTA_RENDAH, sms_baru
+from fake_adb import cocok_where
+
+where_sms_baru = ADBManager._where_sms_baru
+
+
+def test_tanpa_filter():
+    assert where_sms_baru() == ''
+    assert where_sms_baru(since_id=5) == '_id>5'
+    assert where_sms_baru(since_id=5, since_date=1000) == '_id>5 OR date>1000'
+
+
+def test_allowlist_saja():
+    assert where_sms_baru(pengirim=('TELKOMSEL',)) == "address COLLATE NOCASE IN ('TELKOMSEL')"
+
+
+def test_allowlist_dengan_high_water_mark():
+    where = where_sms_baru(since_id=5, since_date=1000, pengirim=('TELKOMSEL', '3636'))
+    cocok = cocok_where(where)
+    assert cocok(6, 'Telkomsel', 0)
+    assert cocok(1, '3636', 2000)
+    assert not cocok(6, '+628123', 2000)
+    assert not cocok(5, 'TELKOMSEL', 1000)
+
+
+def test_allowlist_kutip():
+    where = where_sms_baru(pengirim=("O'Brien",))
+    assert cocok_where(where)(1, "o'brien", 0)
+    assert not cocok_where(where)(1, "O", 0)
+
+
+@pytest.fixture
+def adb(logger):
+    adb = ADBManager(logger)
+    yield adb
+    adb.tutup()
+
+
+def test_baca_sms_lewat_fake_adb(adb, inbox):
+    sekarang = int(time.time() * 1000)
+    inbox([
+        (4, '+6281234567', sekarang, 'Nikmati kuota 2GB hanya Rp10rb'),
+        (3, 'TELKOMSEL', sekarang - 60000, 'Kuota Edu anda kurang dari 3GB.'),
+        (2, '+6289999999', sekarang - 120000, 'Pesan biasa dari teman'),
+        (1, 'Telkomsel', sekarang - 180000, 'Paket Edu 30GB sudah aktif s.d. 30 hari.'),
+    ])
+    adb.pengirim = auto_edu.daftar_pengirim('telkomsel')
+    sms_list, _ = adb.baca_sms(limit=5)
+    assert [sms.id for sms in sms_list] == [3, 1]
+    assert adb.cek_sms_baru(since_id=1) == 3
+    assert adb.cek_sms_baru(since_id=3) == 0
+
+
+def test_tick_abaikan_pengirim_lain(jalankan, inbox, tmp_path):
+    """SMS "kuota rendah" dari nomor biasa tidak memicu renewal jika ada allowlist"""
+    inbox(sms_baru(SMS_KUOTA_RENDAH, pengirim='+6281234567'))
+    assert jalankan('--force', SMS_PENGIRIM='TELKOMSEL').returncode == 0
+    assert 'renewal' not in json.loads((tmp_path / 'state.json').read_text())
+    assert 'MEMULAI PROSES RENEWAL' not in (tmp_path / 'auto_edu.log').read_text()
@@ -90,7 +90,8 @@ print_success "System files removed"
 if [ "$keep_script" = "n" ]; then
     print_info "Removing script..."
     rm -rf /root/Auto-Edu
-    rm -f /tmp/auto_edu.log
+    rm -f /tmp/auto_edu.log /tmp/auto_edu.log.idx /tmp/auto_edu.log.*.gz
+    rm -f /tmp/auto_edu_env.cache
     rm -f /tmp/auto_edu_last_renewal
     print_success "Script removed"
 fi
@@ -67,7 +67,8 @@ fi
 # Remove files
 print_info "Removing files..."
 rm -rf /root/Auto-Edu
-rm -f /tmp/auto_edu.log
+rm -f /tmp/auto_edu.log /tmp/auto_edu.log.idx /tmp/auto_edu.log.*.gz
+rm -f /tmp/auto_edu_env.cache
 rm -f /tmp/auto_edu_last_renewal
 print_success "Files removed"
 